@@ -0,0 +1,50 @@
+import asyncio
+import argparse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.database import async_engine, create_db_and_tables
+from src.db.models import Note
+from src.ai_modules.recommendation.keyword_index import index_notes
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def backfill(batch_size: int):
+    # Creates the note_keywords table on databases that predate it
+    await create_db_and_tables()
+
+    print("Indexing keywords of existing notes...")
+    last_id, total, keywords = 0, 0, 0
+    while True:
+        # Keyset pagination; each batch is re-indexed in one transaction, so
+        # the backfill can simply be re-run after an interruption
+        async with AsyncSession(async_engine) as session:
+            statement = (
+                select(Note)
+                .where(Note.id > last_id, Note.content_json.is_not(None))
+                .order_by(Note.id)
+                .limit(batch_size)
+            )
+            result = await session.exec(statement)
+            notes = result.all()
+            if not notes:
+                break
+
+            last_id = notes[-1].id
+            keywords += await index_notes(session, notes)
+            await session.commit()
+
+        total += len(notes)
+        print(f"Indexed {total} notes ({keywords} keywords)...")
+
+    print(f"✅ Keyword index backfilled: {total} notes, {keywords} keywords.")
+    logger.info(f"Keyword index backfilled: {total} notes, {keywords} keywords")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the keyword index from existing structured notes")
+    parser.add_argument("--batch-size", type=int, default=500, help="Notes indexed per batch")
+    args = parser.parse_args()
+
+    asyncio.run(backfill(args.batch_size))
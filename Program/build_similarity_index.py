@@ -0,0 +1,46 @@
+import asyncio
+import argparse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.database import async_engine
+from src.db.models import Note
+from src.ai_modules.recommendation.similarity_index import SimilarityIndex
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def build_index(batch_size: int):
+    print(f"Rebuilding similarity index in {settings.similarity_index_dir}...")
+    index = SimilarityIndex.rebuild(settings.similarity_index_dir, settings.similarity_index_dim)
+
+    last_id, total = 0, 0
+    while True:
+        # Keyset pagination keeps memory flat regardless of table size
+        async with AsyncSession(async_engine) as session:
+            statement = select(Note).where(Note.id > last_id).order_by(Note.id).limit(batch_size)
+            result = await session.exec(statement)
+            notes = result.all()
+        if not notes:
+            break
+
+        for note in notes:
+            index.add_note(note, flush=False)
+        index.flush()
+        total += len(notes)
+        last_id = notes[-1].id
+        print(f"Indexed {total} notes...")
+
+    index.flush()
+    print(f"✅ Similarity index rebuilt with {len(index)} notes.")
+    print("Restart the API server to load the new index.")
+    logger.info(f"Similarity index rebuilt with {len(index)} notes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the note similarity index from the database")
+    parser.add_argument("--batch-size", type=int, default=500, help="Notes read per batch")
+    args = parser.parse_args()
+
+    asyncio.run(build_index(args.batch_size))
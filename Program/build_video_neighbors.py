@@ -0,0 +1,104 @@
+import asyncio
+import argparse
+import time
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.database import async_engine, create_db_and_tables
+from src.db.models import Note, VideoNeighbor
+from src.ai_modules.recommendation.collaborative import build_neighbors, video_key, video_url
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INSERT_CHUNK = 5000
+
+
+async def load_pairs(batch_size: int):
+    """All (user, video) pairs plus the latest title seen for each video."""
+    pairs, titles = [], {}
+    last_id = 0
+    while True:
+        # Keyset pagination over only the columns needed
+        async with AsyncSession(async_engine) as session:
+            statement = (
+                select(Note.id, Note.user_id, Note.video_url, Note.video_title)
+                .where(Note.id > last_id)
+                .order_by(Note.id)
+                .limit(batch_size)
+            )
+            result = await session.exec(statement)
+            rows = result.all()
+        if not rows:
+            break
+
+        for _, user_id, url, title in rows:
+            key = video_key(url)
+            if key is None:
+                # Not a YouTube video: nothing to co-study
+                continue
+            pairs.append((user_id, key))
+            titles[key] = title
+        last_id = rows[-1][0]
+        print(f"Loaded {len(pairs)} notes...")
+    return pairs, titles
+
+
+async def store(neighbors, titles):
+    """Replace the whole table in one transaction (readers see old or new lists)."""
+    videos = rows_written = 0
+    async with AsyncSession(async_engine) as session:
+        await session.execute(delete(VideoNeighbor))
+        chunk = []
+        for key, ranked in neighbors:
+            videos += 1
+            for rank, (neighbor, score, support) in enumerate(ranked):
+                chunk.append(
+                    {
+                        "video_key": key,
+                        "rank": rank,
+                        "neighbor_key": neighbor,
+                        "neighbor_title": titles[neighbor][:500],
+                        "neighbor_url": video_url(neighbor),
+                        "score": score,
+                        "support": support,
+                    }
+                )
+            if len(chunk) >= INSERT_CHUNK:
+                await session.execute(VideoNeighbor.__table__.insert(), chunk)
+                rows_written += len(chunk)
+                chunk = []
+        if chunk:
+            await session.execute(VideoNeighbor.__table__.insert(), chunk)
+            rows_written += len(chunk)
+        await session.commit()
+    return videos, rows_written
+
+
+async def build(args):
+    # Creates the video_neighbors table on databases that predate it
+    await create_db_and_tables()
+
+    started = time.perf_counter()
+    pairs, titles = await load_pairs(args.batch_size)
+    users = len({user_id for user_id, _ in pairs})
+    print(f"Building co-occurrence for {len(titles)} videos studied by {users} users...")
+
+    neighbors = build_neighbors(pairs, top_n=args.top_n, min_support=args.min_support)
+    videos, rows = await store(neighbors, titles)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Stored {rows} neighbors for {videos} videos in {elapsed:.1f}s.")
+    logger.info(f"Video neighbors rebuilt: {videos} videos, {rows} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild the 'students who studied this also studied' lists (run periodically, e.g. nightly cron)"
+    )
+    parser.add_argument("--top-n", type=int, default=20, help="Neighbors stored per video")
+    parser.add_argument("--min-support", type=int, default=1, help="Minimum users who studied both videos")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Notes read per batch")
+    args = parser.parse_args()
+
+    asyncio.run(build(args))
@@ -0,0 +1,31 @@
+import argparse
+import time
+from src.ai_modules.summarization.output_index import output_index
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def index(args):
+    started = time.perf_counter()
+    if args.shard:
+        # Moves flat outputs/*_notes.md files into their shard subdirectories
+        moved = output_index.shard_flat_files()
+        print(f"Moved {moved} files into shard directories.")
+    else:
+        output_index.refresh(force=True)
+
+    _, total = output_index.list_files(limit=1)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Output manifest holds {total} files ({elapsed:.1f}s).")
+    logger.info(f"Output manifest rebuilt: {total} files in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bring the outputs/ manifest up to date (the API also does this incrementally)"
+    )
+    parser.add_argument("--shard", action="store_true", help="Move flat files in outputs/ into shard subdirectories first")
+    args = parser.parse_args()
+
+    index(args)
@@ -0,0 +1,23 @@
+import asyncio
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.database import async_engine
+from src.db.stats import rebuild_stats
+from src.db.categories import rebuild_category_counts
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def rebuild():
+    # Triggers keep the rollups current; this is only needed to repair them
+    print("Recomputing analytics rollups from notes...")
+    async with AsyncSession(async_engine) as session:
+        await rebuild_stats(session)
+        await rebuild_category_counts(session)
+        await session.commit()
+    print("✅ Analytics rollups and category counts rebuilt.")
+    logger.info("Analytics rollups rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild())
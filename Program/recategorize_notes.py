@@ -0,0 +1,204 @@
+import asyncio
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple
+from sqlalchemy import bindparam, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.database import async_engine
+from src.db.models import Note
+from src.db.categories import category_ids
+from src.ai_modules.categorization.categorizer import (
+    UNCATEGORIZED,
+    CategorizationService,
+    note_text,
+)
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_CHECKPOINT = settings.temp_dir / "recategorize_checkpoint.json"
+
+
+def load_checkpoint(path: Path) -> Tuple[int, List[int]]:
+    """Last note ID the scan passed and the IDs that failed (0, [] if starting fresh)."""
+    if not path.exists():
+        return 0, []
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data.get("last_id", 0), data.get("failed", [])
+
+
+def save_checkpoint(path: Path, last_id: int, processed: int, failed: Iterable[int]):
+    # Write-then-rename so an interruption never leaves a corrupt checkpoint
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {
+                "last_id": last_id,
+                "processed": processed,
+                "failed": sorted(failed),
+                "saved_at": datetime.utcnow().isoformat(),
+            }
+        ),
+        encoding="utf-8",
+    )
+    tmp_path.replace(path)
+
+
+async def fetch_batch(after_id: int, batch_size: int, only_category: str = None):
+    """Keyset pagination: next ``batch_size`` notes with id > after_id."""
+    async with AsyncSession(async_engine) as session:
+        statement = select(Note).where(Note.id > after_id)
+        if only_category:
+            statement = statement.where(Note.category == only_category)
+        statement = statement.order_by(Note.id).limit(batch_size)
+        result = await session.exec(statement)
+        return result.all()
+
+
+async def fetch_notes(note_ids: List[int]):
+    async with AsyncSession(async_engine) as session:
+        result = await session.exec(select(Note).where(Note.id.in_(note_ids)).order_by(Note.id))
+        return result.all()
+
+
+async def categorize_batch(categorizer, notes, concurrency: int):
+    """Categories of ``notes``; a failed categorization is its exception."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def categorize(note):
+        async with semaphore:
+            return await categorizer.categorize_text(note_text(note), raise_errors=True)
+
+    return await asyncio.gather(*(categorize(n) for n in notes), return_exceptions=True)
+
+
+async def write_batch(notes, categories, dry_run: bool):
+    now = datetime.utcnow()
+    changes = [
+        (n, c)
+        for n, c in zip(notes, categories)
+        # A too-short note must not lose a real category
+        if c != n.category and c != UNCATEGORIZED
+    ]
+    if changes and not dry_run:
+        async with AsyncSession(async_engine) as session:
+            ids = await category_ids(session, ((n.user_id, c) for n, c in changes))
+            notes_table = Note.__table__.c
+            # A note edited or categorized since it was read no longer has
+            # the version we read and keeps its newer category
+            statement = (
+                update(Note.__table__)
+                .where(notes_table.id == bindparam("note_id"), notes_table.version == bindparam("read_version"))
+                .values(
+                    category=bindparam("new_category"),
+                    category_id=bindparam("new_category_id"),
+                    version=notes_table.version + 1,
+                    updated_at=now,
+                )
+            )
+            await session.execute(
+                statement,
+                [
+                    {
+                        "note_id": n.id,
+                        "read_version": n.version,
+                        "new_category": c,
+                        "new_category_id": ids[(n.user_id, c)],
+                    }
+                    for n, c in changes
+                ],
+            )
+            await session.commit()
+    return len(changes)
+
+
+async def process(categorizer, notes, args, failed: Set[int]) -> int:
+    """Categorize and write ``notes``, updating ``failed``; returns the notes changed."""
+    categories = await categorize_batch(categorizer, notes, args.concurrency)
+    done = []
+    for note, category in zip(notes, categories):
+        if isinstance(category, Exception):
+            logger.warning(f"Categorizing note {note.id} failed: {category}")
+            failed.add(note.id)
+        else:
+            failed.discard(note.id)
+            done.append((note, category))
+    return await write_batch([n for n, _ in done], [c for _, c in done], args.dry_run)
+
+
+async def recategorize(args):
+    checkpoint = Path(args.checkpoint)
+    if args.restart and checkpoint.exists():
+        checkpoint.unlink()
+    last_id, failed_ids = load_checkpoint(checkpoint)
+    failed = set(failed_ids)
+    if last_id or failed:
+        print(f"Resuming after note ID {last_id} with {len(failed)} failed notes to retry (use --restart to start over)")
+
+    categorizer = CategorizationService()
+    if args.llm_only:
+        categorizer.local_model = None
+    if args.model:
+        categorizer.model_id = args.model
+
+    processed = changed = 0
+    while True:
+        notes = await fetch_batch(last_id, args.batch_size, args.only_category)
+        if not notes:
+            break
+
+        changed += await process(categorizer, notes, args, failed)
+        processed += len(notes)
+        last_id = notes[-1].id
+
+        # Failed notes are kept in the checkpoint, so the scan can move past them
+        if not args.dry_run:
+            save_checkpoint(checkpoint, last_id, processed, failed)
+        print(f"Processed {processed} notes ({changed} changed, {len(failed)} failed), last ID {last_id}")
+
+    for attempt in range(args.retries):
+        if not failed:
+            break
+        await asyncio.sleep(args.retry_delay * 2 ** attempt)
+        print(f"Retrying {len(failed)} failed notes (attempt {attempt + 1}/{args.retries})")
+        pending = sorted(failed)
+        for start in range(0, len(pending), args.batch_size):
+            batch = pending[start:start + args.batch_size]
+            notes = await fetch_notes(batch)
+            failed.difference_update(set(batch) - {n.id for n in notes})  # deleted meanwhile
+            changed += await process(categorizer, notes, args, failed)
+            if not args.dry_run:
+                save_checkpoint(checkpoint, last_id, processed, failed)
+
+    if failed:
+        print(f"⚠️ Done with {len(failed)} notes failing; re-run the command to retry them.")
+        logger.warning(f"Recategorized {processed} notes, {changed} changed, {len(failed)} failed")
+        return
+
+    print(f"✅ Done: {processed} notes processed, {changed} categories changed.")
+    logger.info(f"Recategorized {processed} notes, {changed} changed")
+    if not args.dry_run and checkpoint.exists():
+        checkpoint.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-categorize existing notes (e.g. after changing the categorization prompt or model)"
+    )
+    parser.add_argument("--batch-size", type=int, default=200, help="Notes read and updated per batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent categorization calls")
+    parser.add_argument("--only-category", type=str, help="Only reprocess notes with this category (e.g. Uncategorized)")
+    parser.add_argument("--model", type=str, help="Gemini model to use (default: CATEGORIZATION_MODEL)")
+    parser.add_argument("--llm-only", action="store_true", help="Skip the local classifier and always ask Gemini")
+    parser.add_argument("--retries", type=int, default=3, help="Passes over notes whose categorization failed")
+    parser.add_argument("--retry-delay", type=float, default=30.0, help="Seconds before the first retry pass (doubles each pass)")
+    parser.add_argument("--checkpoint", type=str, default=str(DEFAULT_CHECKPOINT), help="Checkpoint file for resuming")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    args = parser.parse_args()
+
+    asyncio.run(recategorize(args))
@@ -1,7 +1,7 @@
 import asyncio
 from sqlmodel import SQLModel
 from src.db.database import async_engine, create_db_and_tables
-from src.db.models import User, Note, Category  # noqa: F401
+from src.db.models import User, Note, Category, RecommendationItem  # noqa: F401
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
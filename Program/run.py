@@ -3,6 +3,7 @@ Main entry point for YouTube Study Notes AI.
 Provides CLI interface and server startup.
 """
 
+import re
 import sys
 import argparse
 from pathlib import Path
@@ -85,10 +86,13 @@ def run_cli(youtube_url: str, output_file: str = None):
 
         if output_file:
             output_path = Path(output_file)
+            output_path.write_text(final_notes, encoding="utf-8")
         else:
-            output_path = settings.output_dir / f"{video_info['title'][:50]}_notes.md"
+            from src.ai_modules.summarization.output_index import output_index
 
-        output_path.write_text(final_notes, encoding="utf-8")
+            # Stored in a shard of outputs/ and added to its manifest
+            safe_title = re.sub(r'[\\/:*?"<>|]', "_", video_info["title"][:50])
+            output_path = output_index.write(f"{safe_title}_notes.md", final_notes)
 
         logger.info(f"✅ Notes saved to: {output_path}")
         print(f"\n✅ Success! Notes saved to: {output_path}")
@@ -1,47 +1,137 @@
+import json
+import asyncio
 from google import genai
-from typing import Optional
+from typing import Dict, List, Optional
 from src.utils.logger import setup_logger
 from src.utils.config import settings
+from src.utils.rate_limiter import Priority, estimate_tokens, quota_scheduler
+from src.utils.batching import MicroBatcher
+from src.ai_modules.categorization.local_classifier import HashedTfidfNaiveBayes
+from src.ai_modules.summarization.renderer import render_note
 
 logger = setup_logger(__name__)
 
+UNCATEGORIZED = "Uncategorized"
+# Placeholder while a note waits in the enrichment queue
+PENDING_CATEGORY = "Pending"
+
+
+def note_text(note) -> str:
+    """Plain text used to categorize a ``Note`` (structured or markdown)."""
+    return render_note(note, "text")
+
 
 class CategorizationService:
     """
-    Service for automatically categorizing notes based on their content using Gemini AI.
+    Service for automatically categorizing notes based on their content.
+
+    A local classifier (trained by train_categorizer.py) answers first; Gemini
+    is only called when it is missing or its confidence is below
+    ``settings.category_confidence_threshold``.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        local_model: Optional[HashedTfidfNaiveBayes] = None,
+    ):
         self.api_key = api_key or settings.google_api_key
         # Use the newer google-genai client
         self.client = genai.Client(api_key=self.api_key)
-        self.model_id = "gemini-1.5-flash"
+        self.model_id = settings.categorization_model
+        self.local_model = local_model or HashedTfidfNaiveBayes.load_if_exists(
+            settings.category_model_path
+        )
+        self.confidence_threshold = settings.category_confidence_threshold
+        # Concurrent LLM categorizations are coalesced into one prompt
+        self.batcher = MicroBatcher(
+            self._categorize_batch,
+            max_batch_size=settings.category_batch_max_size,
+            max_delay=settings.category_batch_window_ms / 1000,
+        )
+        # How often each path answered, and how often the local guess matched Gemini
+        self.stats: Dict[str, int] = {"local": 0, "llm": 0, "llm_agreed": 0}
 
-    async def categorize_text(self, text: str) -> str:
+    async def categorize_text(self, text: str, raise_errors: bool = False) -> str:
         """
         Categorize a piece of text into a single word or short phrase category.
+
+        Texts too short to categorize are ``UNCATEGORIZED``. Gemini failures
+        also give ``UNCATEGORIZED`` unless ``raise_errors`` is set, so callers
+        that retry can tell transient errors from a final answer.
         """
         if not text or len(text) < 10:
-            return "Uncategorized"
+            return UNCATEGORIZED
 
-        prompt = (
-            "Analyze the following text and provide a single-word or short 2-word category that best describes its topic. "
-            "Examples: Education, Technology, Health, Business, Personal, Cooking, Programming.\n\n"
-            f"Text: {text[:2000]}\n\n"
-            "Category:"
+        # Scoring a long note takes milliseconds: kept off the event loop
+        local_label, confidence = (
+            await asyncio.to_thread(self.local_model.predict, text)
+            if self.local_model
+            else (None, 0.0)
         )
+        if local_label and confidence >= self.confidence_threshold:
+            self.stats["local"] += 1
+            return local_label
+
+        category = await self._categorize_with_llm(text, raise_errors)
+        if category != UNCATEGORIZED:
+            self.stats["llm"] += 1
+            self.stats["llm_agreed"] += local_label == category
+        return category
 
+    async def _categorize_with_llm(self, text: str, raise_errors: bool = False) -> str:
         try:
-            # Using the newer google-genai syntax
-            response = self.client.models.generate_content(
-                model=self.model_id, contents=prompt
-            )
-
-            category = response.text.strip().replace(".", "").title()
-            # Basic validation/cleanup
-            if len(category) > 30:
-                category = category[:27] + "..."
-            return category
+            return await self.batcher.submit(text)
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Categorization failed: {e}")
-            return "Uncategorized"
+            return UNCATEGORIZED
+
+    async def _categorize_batch(self, texts: List[str]) -> List[str]:
+        """Categorize several texts with a single Gemini request."""
+        numbered = "\n\n".join(
+            f"Text {i + 1}: {text[:2000]}" for i, text in enumerate(texts)
+        )
+        prompt = (
+            "Analyze each of the following texts and provide a single-word or short 2-word category that best describes its topic. "
+            "Examples: Education, Technology, Health, Business, Personal, Cooking, Programming.\n"
+            f"Return a JSON array with exactly {len(texts)} categories, one per text, in order.\n\n"
+            f"{numbered}"
+        )
+
+        # Interactive: a user is waiting on note creation, so don't queue long
+        await quota_scheduler.acquire_model_async(
+            self.model_id,
+            estimate_tokens(prompt),
+            Priority.INTERACTIVE,
+            max_wait=10,
+        )
+        # google-genai is synchronous; keep the event loop free
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(
+            None,
+            lambda: self.client.models.generate_content(
+                model=self.model_id,
+                contents=prompt,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": List[str],
+                },
+            ),
+        )
+
+        categories = json.loads(response.text)
+        if not isinstance(categories, list) or len(categories) != len(texts):
+            raise ValueError(f"Expected {len(texts)} categories, got: {response.text[:200]}")
+        return [self._clean_category(str(c)) for c in categories]
+
+    @staticmethod
+    def _clean_category(raw: str) -> str:
+        category = raw.strip().replace(".", "").title()
+        if not category:
+            return UNCATEGORIZED
+        # Basic validation/cleanup
+        if len(category) > 30:
+            category = category[:27] + "..."
+        return category
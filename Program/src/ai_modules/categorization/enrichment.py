@@ -0,0 +1,172 @@
+"""
+Background enrichment queue.
+
+Notes are inserted with a pending category and categorized here, off the
+request path. Rows are updated in batches; only transient failures (Gemini
+or quota errors) are retried, with exponential backoff.
+
+Every worker process re-queues the pending notes on startup, so the same
+note can be queued in several processes. A batch claims its rows in a short
+``FOR UPDATE SKIP LOCKED`` transaction that only takes notes still pending,
+calls Gemini with no transaction open, and writes the categories with an
+UPDATE that again requires the note to be pending, so a note is only ever
+categorized once (SQLite, which has no row locks, is meant for
+single-process development).
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.database import async_engine
+from src.db.models import Note
+from src.db.categories import category_ids
+from src.ai_modules.categorization.categorizer import (
+    PENDING_CATEGORY,
+    UNCATEGORIZED,
+    CategorizationService,
+    note_text,
+)
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EnrichmentQueue:
+    """
+    In-process queue of note IDs waiting for categorization.
+
+    Pending notes are re-queued on startup, so nothing is lost across restarts.
+    """
+
+    def __init__(
+        self,
+        categorizer: CategorizationService,
+        batch_size: int = 32,
+        max_attempts: int = 5,
+        retry_base_delay: float = 5.0,
+    ):
+        self.categorizer = categorizer
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def enqueue(self, note_id: int, attempt: int = 0) -> None:
+        """Schedule a note for categorization (no-op until started)."""
+        if self._queue is None:
+            logger.warning(f"Enrichment queue not running, note {note_id} stays pending")
+            return
+        self._queue.put_nowait((note_id, attempt))
+
+    async def start(self) -> None:
+        """Start the worker and re-queue notes left pending by a previous run."""
+        self._queue = asyncio.Queue()
+        async with AsyncSession(async_engine) as session:
+            result = await session.exec(
+                select(Note.id).where(Note.category == PENDING_CATEGORY)
+            )
+            pending = result.all()
+        for note_id in pending:
+            self.enqueue(note_id)
+        if pending:
+            logger.info(f"Re-queued {len(pending)} pending notes for categorization")
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._process(dict(batch))
+            except Exception as e:
+                logger.error(f"Enrichment batch failed: {e}")
+                for note_id, attempt in batch:
+                    self._retry(note_id, attempt)
+
+    async def _process(self, attempts: Dict[int, int]) -> None:
+        # Claim the batch in a short transaction: rows another worker holds
+        # are skipped, rows another worker already categorized are no longer
+        # pending. No locks or connections are held during the Gemini calls.
+        async with AsyncSession(async_engine) as session:
+            result = await session.exec(
+                select(Note)
+                .where(Note.id.in_(list(attempts)), Note.category == PENDING_CATEGORY)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = [(n.id, n.user_id, note_text(n)) for n in result.all()]
+            await session.commit()
+
+        # Concurrent calls are coalesced by the categorizer's micro-batcher
+        results = await asyncio.gather(
+            *(self.categorizer.categorize_text(text, raise_errors=True) for _, _, text in claimed),
+            return_exceptions=True,
+        )
+
+        categorized = []
+        for (note_id, user_id, _), category in zip(claimed, results):
+            if isinstance(category, Exception):
+                logger.warning(f"Categorizing note {note_id} failed: {category}")
+                if self._retry(note_id, attempts[note_id]):
+                    continue
+                category = UNCATEGORIZED
+            categorized.append((note_id, user_id, category))
+        if not categorized:
+            return
+
+        async with AsyncSession(async_engine) as session:
+            ids = await category_ids(session, ((u, c) for _, u, c in categorized))
+            # One executemany; notes categorized meanwhile (by another
+            # worker or an edit) are no longer pending and keep their category
+            notes = Note.__table__.c
+            statement = (
+                update(Note.__table__)
+                .where(notes.id == bindparam("note_id"), notes.category == PENDING_CATEGORY)
+                .values(
+                    category=bindparam("new_category"),
+                    category_id=bindparam("new_category_id"),
+                    version=notes.version + 1,
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            await session.execute(
+                statement,
+                [
+                    {
+                        "note_id": note_id,
+                        "new_category": category,
+                        "new_category_id": ids[(user_id, category)],
+                    }
+                    for note_id, user_id, category in categorized
+                ],
+            )
+            await session.commit()
+            logger.info(f"Categorized {len(categorized)} notes")
+
+    def _retry(self, note_id: int, attempt: int) -> bool:
+        """Schedule another attempt; False once the attempts are used up."""
+        if attempt + 1 >= self.max_attempts:
+            logger.error(f"Giving up on categorizing note {note_id} after {attempt + 1} attempts")
+            return False
+        delay = self.retry_base_delay * 2 ** attempt
+        asyncio.get_running_loop().call_later(delay, self.enqueue, note_id, attempt + 1)
+        return True
+
+
+# Global queue, started from the API lifespan
+enrichment_queue = EnrichmentQueue(CategorizationService())
@@ -0,0 +1,198 @@
+"""
+Local first-pass note classifier.
+
+Hashed TF-IDF features with a multinomial naive Bayes model, trained on notes
+that Gemini already categorized. Predicting a label takes a few milliseconds
+(roughly linear in note length, ~3 ms for a 600-word note), so the LLM is only
+consulted when the local model is unsure.
+"""
+
+import json
+import math
+import re
+import time
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word unigrams and bigrams."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashedTfidfNaiveBayes:
+    """
+    Multinomial naive Bayes over hashed, L2-normalized TF-IDF vectors.
+
+    Only features seen during training are stored, so the model stays small
+    even with a large hash space.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, alpha: float = 0.1):
+        self.n_features = n_features
+        self.alpha = alpha
+        self.idf: Dict[int, float] = {}
+        self.classes: List[str] = []
+        self.class_log_prior: Dict[str, float] = {}
+        self.feature_log_prob: Dict[str, Dict[int, float]] = {}
+        self.unseen_log_prob: Dict[str, float] = {}
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.classes)
+
+    def _hash_counts(self, text: str) -> Counter:
+        return Counter(zlib.crc32(tok.encode("utf-8")) % self.n_features for tok in tokenize(text))
+
+    def _vectorize(self, counts: Counter) -> Dict[int, float]:
+        vector = {
+            feature: (1.0 + math.log(count)) * self.idf[feature]
+            for feature, count in counts.items()
+            if feature in self.idf
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if norm:
+            for feature in vector:
+                vector[feature] /= norm
+        return vector
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str]) -> "HashedTfidfNaiveBayes":
+        """
+        Train the model.
+
+        Args:
+            texts: Note texts
+            labels: Category label for each text
+        """
+        all_counts = [self._hash_counts(text) for text in texts]
+
+        doc_freq: Counter = Counter()
+        for counts in all_counts:
+            doc_freq.update(counts.keys())
+        n_docs = len(all_counts)
+        self.idf = {
+            feature: math.log((1 + n_docs) / (1 + df)) + 1.0 for feature, df in doc_freq.items()
+        }
+
+        class_docs = Counter(labels)
+        class_weights: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for counts, label in zip(all_counts, labels):
+            for feature, weight in self._vectorize(counts).items():
+                class_weights[label][feature] += weight
+
+        self.classes = sorted(class_docs)
+        self.class_log_prior = {c: math.log(class_docs[c] / n_docs) for c in self.classes}
+        self.feature_log_prob = {}
+        self.unseen_log_prob = {}
+        for c in self.classes:
+            weights = class_weights[c]
+            denominator = sum(weights.values()) + self.alpha * self.n_features
+            self.feature_log_prob[c] = {
+                f: math.log((w + self.alpha) / denominator) for f, w in weights.items()
+            }
+            self.unseen_log_prob[c] = math.log(self.alpha / denominator)
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Predict the category of ``text``.
+
+        Returns:
+            Tuple of (label, posterior probability); (None, 0.0) if untrained
+        """
+        if not self.is_trained:
+            return None, 0.0
+
+        vector = self._vectorize(self._hash_counts(text))
+        scores = {}
+        for c in self.classes:
+            log_probs, unseen = self.feature_log_prob[c], self.unseen_log_prob[c]
+            scores[c] = self.class_log_prior[c] + sum(
+                w * log_probs.get(f, unseen) for f, w in vector.items()
+            )
+
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        total = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / total
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "n_features": self.n_features,
+            "alpha": self.alpha,
+            "idf": self.idf,
+            "classes": self.classes,
+            "class_log_prior": self.class_log_prior,
+            "feature_log_prob": self.feature_log_prob,
+            "unseen_log_prob": self.unseen_log_prob,
+        }
+        path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "HashedTfidfNaiveBayes":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        model = cls(n_features=data["n_features"], alpha=data["alpha"])
+        model.idf = {int(f): v for f, v in data["idf"].items()}
+        model.classes = data["classes"]
+        model.class_log_prior = data["class_log_prior"]
+        model.feature_log_prob = {
+            c: {int(f): v for f, v in probs.items()}
+            for c, probs in data["feature_log_prob"].items()
+        }
+        model.unseen_log_prob = data["unseen_log_prob"]
+        return model
+
+    @classmethod
+    def load_if_exists(cls, path: Path) -> Optional["HashedTfidfNaiveBayes"]:
+        if not Path(path).exists():
+            return None
+        try:
+            model = cls.load(path)
+            logger.info(f"Loaded local category classifier ({len(model.classes)} classes) from {path}")
+            return model
+        except Exception as e:
+            logger.error(f"Could not load local category classifier from {path}: {e}")
+            return None
+
+
+def evaluate(
+    model: HashedTfidfNaiveBayes, texts: Iterable[str], labels: Iterable[str], threshold: float
+) -> Dict[str, float]:
+    """
+    Compare local predictions with the reference (Gemini) labels.
+
+    Returns:
+        Accuracy overall and on confident predictions, coverage above the
+        threshold, and mean / p95 latency in microseconds.
+    """
+    latencies, correct, confident, confident_correct, total = [], 0, 0, 0, 0
+    for text, label in zip(texts, labels):
+        started = time.perf_counter()
+        predicted, confidence = model.predict(text)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        total += 1
+        correct += predicted == label
+        if confidence >= threshold:
+            confident += 1
+            confident_correct += predicted == label
+
+    latencies.sort()
+    return {
+        "samples": total,
+        "accuracy": correct / total if total else 0.0,
+        "coverage": confident / total if total else 0.0,
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+        "mean_latency_us": sum(latencies) / total if total else 0.0,
+        "p95_latency_us": latencies[int(0.95 * (total - 1))] if total else 0.0,
+    }
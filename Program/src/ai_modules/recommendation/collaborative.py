@@ -0,0 +1,110 @@
+"""
+Item-item collaborative filtering over all users' notes.
+
+A binary users x videos matrix is built from (user, video) pairs. Video
+co-occurrence counts are ``X.T @ X``, computed in row blocks so memory
+stays bounded however many notes there are. Neighbors are ranked by
+cosine similarity, ``co-occurrences / sqrt(users(a) * users(b))``.
+The lists are precomputed by build_video_neighbors.py and stored in the
+``video_neighbors`` table.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import VideoNeighbor
+
+VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|embed/|shorts/|/v/)([A-Za-z0-9_-]{11})")
+
+# (neighbor video key, cosine score, number of users who studied both)
+Neighbor = Tuple[str, float, int]
+
+
+def video_key(url: str) -> Optional[str]:
+    """
+    YouTube video ID of a URL, or None if it has none. Notes without a
+    video ID (other sites, malformed URLs) take no part in co-occurrence.
+    """
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def video_url(key: str) -> str:
+    return f"https://www.youtube.com/watch?v={key}"
+
+
+def build_neighbors(
+    pairs: Iterable[Tuple[int, str]],
+    top_n: int = 20,
+    min_support: int = 1,
+    block_size: int = 4096,
+) -> Iterator[Tuple[str, List[Neighbor]]]:
+    """
+    Top-N co-studied videos for every video.
+
+    Args:
+        pairs: (user_id, video_key) pairs; duplicates are ignored
+        top_n: Neighbors kept per video
+        min_support: Minimum number of users who studied both videos
+        block_size: Videos whose co-occurrence row is computed at once
+
+    Yields:
+        (video_key, neighbors best first) for videos with any neighbor
+    """
+    users: Dict[int, int] = {}
+    videos: Dict[str, int] = {}
+    rows, cols = [], []
+    for user_id, key in pairs:
+        rows.append(users.setdefault(user_id, len(users)))
+        cols.append(videos.setdefault(key, len(videos)))
+    if not videos:
+        return
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(users), len(videos)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+    by_video = matrix.T.tocsr()
+    popularity = np.diff(by_video.indptr).astype(np.float64)
+    keys = np.array(list(videos), dtype=object)
+
+    for start in range(0, len(videos), block_size):
+        co_counts = (by_video[start : start + block_size] @ matrix).tocsr()
+        for offset in range(co_counts.shape[0]):
+            video = start + offset
+            lo, hi = co_counts.indptr[offset], co_counts.indptr[offset + 1]
+            others = co_counts.indices[lo:hi]
+            support = co_counts.data[lo:hi]
+            keep = (others != video) & (support >= min_support)
+            others, support = others[keep], support[keep]
+            if not len(others):
+                continue
+
+            scores = support / np.sqrt(popularity[video] * popularity[others])
+            k = min(top_n, len(others))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.lexsort((-support[top], -scores[top]))]
+            yield keys[video], [
+                (keys[others[i]], float(scores[i]), int(support[i])) for i in top
+            ]
+
+
+async def also_studied(
+    session: AsyncSession, key: str, limit: int = 10
+) -> List[VideoNeighbor]:
+    """Precomputed neighbors of a video: one range scan on (video_key, rank)."""
+    statement = (
+        select(VideoNeighbor)
+        .where(VideoNeighbor.video_key == key)
+        .order_by(VideoNeighbor.rank)
+        .limit(limit)
+    )
+    result = await session.exec(statement)
+    return result.all()
@@ -0,0 +1,220 @@
+"""
+Materialized per-user recommendation feeds.
+
+Recommendations are computed in the background and stored in the
+``recommendation_feed`` table, so the API serves a page with one indexed
+query instead of calling YouTube on every request. A feed is refreshed
+shortly after the user creates a note, and in the background when it is read
+while older than ``settings.recommendation_feed_ttl_seconds``. Feeds of
+users who stop visiting are never refreshed, so they cost no YouTube quota.
+After a refresh that finds nothing (quota exhausted, search failure) the
+user's feed is not refreshed again for ``retry_delay`` seconds, so reads do
+not keep searching YouTube while quota is gone.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.database import async_engine
+from src.db.models import RecommendationItem
+from src.ai_modules.recommendation.recommender import RecommendationService
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+from src.utils.rate_limiter import Priority
+
+logger = setup_logger(__name__)
+
+
+def item_to_dict(item: RecommendationItem) -> Dict:
+    """API shape of a feed row (same as a live YouTube recommendation)."""
+    return {
+        "id": item.video_id,
+        "title": item.title,
+        "description": item.description,
+        "thumbnail": item.thumbnail,
+        "channelTitle": item.channel_title,
+        "url": item.url,
+        "type": "youtube_video",
+    }
+
+
+class RecommendationFeed:
+    """
+    Background scheduler that keeps users' recommendation feeds fresh.
+
+    User IDs are queued by ``schedule_refresh`` (de-duplicated while
+    waiting), after a note is created or when an expired feed is read.
+    """
+
+    def __init__(
+        self,
+        recommender: RecommendationService,
+        feed_size: int = 25,
+        ttl: float = 21600,
+        refresh_delay: float = 30,
+        retry_delay: float = 900,
+    ):
+        self.recommender = recommender
+        self.feed_size = feed_size
+        self.ttl = ttl
+        self.refresh_delay = refresh_delay
+        self.retry_delay = retry_delay
+        # User ID -> monotonic time of the last refresh that found nothing
+        self._empty_refreshes: Dict[int, float] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[int] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get_page(
+        self, session: AsyncSession, user_id: int, offset: int = 0, limit: int = 10
+    ) -> List[Dict]:
+        """
+        One page of the user's feed.
+
+        Positions are contiguous, so ``offset`` is a range condition on the
+        (user_id, position) index rather than an OFFSET scan. A user without
+        a feed yet gets one built on the spot; an expired feed is served as is
+        and refreshed in the background.
+        """
+        statement = (
+            select(RecommendationItem)
+            .where(
+                RecommendationItem.user_id == user_id,
+                RecommendationItem.position >= offset,
+            )
+            .order_by(RecommendationItem.position)
+            .limit(limit)
+        )
+        result = await session.exec(statement)
+        items = result.all()
+
+        if not items and offset == 0:
+            # Cold start: the first visit materializes the feed once
+            await self.refresh(user_id, Priority.INTERACTIVE)
+            result = await session.exec(statement)
+            items = result.all()
+        elif items and items[0].refreshed_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+            # Feeds are rewritten whole, so every row has the same refreshed_at
+            self.schedule_refresh(user_id, delay=0)
+
+        return [item_to_dict(item) for item in items]
+
+    # ------------------------------------------------------------------
+    # Refreshing
+    # ------------------------------------------------------------------
+
+    def schedule_refresh(self, user_id: int, delay: Optional[float] = None) -> None:
+        """
+        Queue a feed refresh after ``delay`` seconds (default
+        ``refresh_delay``, leaving time for a new note to be categorized).
+        """
+        if self._queue is None:
+            return
+        delay = self.refresh_delay if delay is None else delay
+        asyncio.get_running_loop().call_later(delay, self._enqueue, user_id)
+
+    async def refresh(self, user_id: int, priority: Priority = Priority.BACKGROUND) -> int:
+        """
+        Recompute a user's feed and replace it atomically.
+
+        The previous feed is kept when YouTube returns nothing (quota
+        exhausted or search failure), and the user is then skipped for
+        ``retry_delay`` seconds. Returns the number of items stored.
+        """
+        attempted = time.monotonic()
+        last_empty = self._empty_refreshes.get(user_id)
+        if last_empty is not None and attempted - last_empty < self.retry_delay:
+            return 0
+
+        async with AsyncSession(async_engine) as session:
+            videos = await self.recommender.get_recommendations_for_user(
+                session, user_id, limit=self.feed_size, priority=priority
+            )
+            if not videos:
+                logger.warning(f"No recommendations for user {user_id}, keeping previous feed")
+                self._empty_refreshes = {
+                    uid: at
+                    for uid, at in self._empty_refreshes.items()
+                    if attempted - at < self.retry_delay
+                }
+                self._empty_refreshes[user_id] = attempted
+                return 0
+            self._empty_refreshes.pop(user_id, None)
+
+            now = datetime.utcnow()
+            await session.execute(
+                delete(RecommendationItem).where(RecommendationItem.user_id == user_id)
+            )
+            session.add_all(
+                RecommendationItem(
+                    user_id=user_id,
+                    position=position,
+                    video_id=video["id"],
+                    title=video["title"],
+                    description=video["description"],
+                    thumbnail=video["thumbnail"],
+                    channel_title=video["channelTitle"],
+                    url=video["url"],
+                    refreshed_at=now,
+                )
+                for position, video in enumerate(videos)
+            )
+            await session.commit()
+
+        logger.info(f"Refreshed recommendation feed for user {user_id} ({len(videos)} items)")
+        return len(videos)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+
+    def _enqueue(self, user_id: int) -> None:
+        if self._queue is None or user_id in self._queued:
+            return
+        self._queued.add(user_id)
+        self._queue.put_nowait(user_id)
+
+    async def _run(self) -> None:
+        while True:
+            user_id = await self._queue.get()
+            self._queued.discard(user_id)
+            try:
+                await self.refresh(user_id)
+            except Exception as e:
+                logger.error(f"Recommendation feed refresh failed for user {user_id}: {e}")
+
+
+# Global scheduler, started from the API lifespan
+recommendation_feed = RecommendationFeed(
+    RecommendationService(),
+    feed_size=settings.recommendation_feed_size,
+    ttl=settings.recommendation_feed_ttl_seconds,
+    refresh_delay=settings.recommendation_feed_refresh_delay_seconds,
+    retry_delay=settings.recommendation_feed_retry_seconds,
+)
@@ -0,0 +1,155 @@
+"""
+Keyword inverted index over ``StudyNoteSchema.keywords``.
+
+Keywords are normalized and stored one row per (note, keyword) in the
+``note_keywords`` table. Related notes are ranked by the IDF-weighted
+overlap of their keywords, with document frequencies counted per user, and
+a user's most frequent keywords double as topic suggestions.
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Note, NoteKeyword
+from src.ai_modules.summarization.renderer import load_notes
+
+MAX_KEYWORD_LENGTH = 100
+
+
+def normalize_keyword(keyword: str) -> Optional[str]:
+    """Lowercase, collapse whitespace and trim punctuation; None if empty."""
+    normalized = " ".join(str(keyword).lower().split()).strip(" .,;:!?#\"'")
+    return normalized[:MAX_KEYWORD_LENGTH] or None
+
+
+def normalize_keywords(keywords: Iterable[str]) -> List[str]:
+    """Normalized, de-duplicated keywords in their original order."""
+    seen = {}
+    for keyword in keywords:
+        normalized = normalize_keyword(keyword)
+        if normalized:
+            seen.setdefault(normalized, None)
+    return list(seen)
+
+
+def note_keywords(note: Note) -> List[str]:
+    """Keywords of a structured note (notes posted as markdown have none)."""
+    if not note.content_json:
+        return []
+    try:
+        return normalize_keywords(load_notes(note.content_json).get("keywords") or [])
+    except (ValueError, TypeError):
+        return []
+
+
+def keyword_rows(notes: Iterable[Note]) -> List[Dict]:
+    """``note_keywords`` rows for bulk insertion."""
+    return [
+        {"note_id": note.id, "keyword": keyword, "user_id": note.user_id}
+        for note in notes
+        for keyword in note_keywords(note)
+    ]
+
+
+async def index_notes(session: AsyncSession, notes: List[Note]) -> int:
+    """
+    (Re)index the keywords of ``notes`` in the current transaction.
+
+    Notes must already have IDs (flush first); the caller commits.
+    Returns the number of keyword rows written.
+    """
+    await session.execute(
+        delete(NoteKeyword).where(NoteKeyword.note_id.in_([n.id for n in notes]))
+    )
+    rows = keyword_rows(notes)
+    if rows:
+        await session.execute(NoteKeyword.__table__.insert(), rows)
+    return len(rows)
+
+
+async def related_notes(
+    session: AsyncSession, note_id: int, limit: int = 5
+) -> List[Tuple[int, float]]:
+    """
+    Notes of the same user sharing keywords with ``note_id``.
+
+    Each shared keyword scores ``log(1 + N / df)``, where N is the number of
+    the user's indexed notes and df the number containing the keyword.
+
+    Returns:
+        List of (note_id, score), best first
+    """
+    result = await session.exec(
+        select(NoteKeyword.keyword, NoteKeyword.user_id).where(
+            NoteKeyword.note_id == note_id
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return []
+    keywords = [keyword for keyword, _ in rows]
+    user_id = rows[0][1]
+
+    # Postings lists for the note's keywords; their lengths are the
+    # per-user document frequencies
+    result = await session.exec(
+        select(NoteKeyword.note_id, NoteKeyword.keyword).where(
+            NoteKeyword.user_id == user_id, NoteKeyword.keyword.in_(keywords)
+        )
+    )
+    postings = result.all()
+    df = Counter(keyword for _, keyword in postings)
+
+    result = await session.exec(
+        select(func.count(func.distinct(NoteKeyword.note_id))).where(
+            NoteKeyword.user_id == user_id
+        )
+    )
+    total = result.one()
+
+    scores: Dict[int, float] = defaultdict(float)
+    for other_id, keyword in postings:
+        if other_id != note_id:
+            scores[other_id] += math.log(1 + total / df[keyword])
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return ranked[:limit]
+
+
+async def suggest_topics(
+    session: AsyncSession,
+    user_id: int,
+    limit: int = 10,
+    note_ids: Optional[List[int]] = None,
+) -> List[Tuple[str, int]]:
+    """
+    The user's keywords ranked by how many of their notes contain them.
+
+    Args:
+        user_id: Owner of the notes
+        limit: Number of topics
+        note_ids: Only consider keywords occurring in these notes
+
+    Returns:
+        List of (keyword, note count), most frequent first
+    """
+    count = func.count(NoteKeyword.note_id)
+    statement = select(NoteKeyword.keyword, count).where(NoteKeyword.user_id == user_id)
+    if note_ids is not None:
+        statement = statement.where(
+            NoteKeyword.keyword.in_(
+                select(NoteKeyword.keyword).where(NoteKeyword.note_id.in_(note_ids))
+            )
+        )
+    statement = (
+        statement.group_by(NoteKeyword.keyword)
+        .order_by(count.desc(), NoteKeyword.keyword)
+        .limit(limit)
+    )
+    result = await session.exec(statement)
+    return [(keyword, notes) for keyword, notes in result.all()]
@@ -6,8 +6,13 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.models import Note
+from src.ai_modules.categorization.categorizer import PENDING_CATEGORY, UNCATEGORIZED
+from src.ai_modules.recommendation.similarity_index import similarity_index
+from src.ai_modules.recommendation.keyword_index import related_notes, suggest_topics
 from src.utils.logger import setup_logger
 from src.utils.config import settings
+from src.utils.rate_limiter import YOUTUBE_UNIT_COSTS, Priority, quota_scheduler
+from src.utils.cache import AsyncTTLCache
 
 logger = setup_logger(__name__)
 
@@ -23,32 +28,71 @@ class RecommendationService:
         # Use the newer google-genai client
         self.client = genai.Client(api_key=self.api_key)
         self.youtube = build("youtube", "v3", developerKey=self.api_key)
+        # Identical searches from different users share one cached result
+        self.search_cache = AsyncTTLCache(
+            ttl=settings.youtube_cache_ttl_seconds,
+            stale_ttl=settings.youtube_cache_stale_seconds,
+            max_entries=settings.youtube_cache_max_entries,
+        )
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Cache key form of a query: lowercased with whitespace collapsed. Word
+        order is kept, since YouTube ranks "python for data science" and
+        "data science for python" differently.
+        """
+        return " ".join(query.lower().split())
+
+    def cache_metrics(self) -> Dict:
+        """Search cache hit rates and YouTube quota units saved."""
+        metrics = self.search_cache.metrics()
+        avoided = metrics["hits"] + metrics["stale_hits"] + metrics["coalesced"]
+        metrics["quota_units_saved"] = avoided * YOUTUBE_UNIT_COSTS["search.list"]
+        return metrics
 
     async def get_recommendations_for_user(
-        self, session: AsyncSession, user_id: int, limit: int = 5
+        self,
+        session: AsyncSession,
+        user_id: int,
+        limit: int = 5,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> List[Dict]:
         """
         Get general recommendations (Categories & YouTube Videos) for a user based on their history.
+        The API serves these from the materialized feed (see ``feed.py``).
         """
-        # 1. Fetch user's saved notes
+        # 1. Fetch user's most recent notes
         statement = (
-            select(Note).where(Note.user_id == user_id).order_by(Note.created_at.desc())
+            select(Note)
+            .where(Note.user_id == user_id)
+            .order_by(Note.created_at.desc())
+            .limit(5)
         )
         result = await session.exec(statement)
         notes = result.all()
 
         if not notes:
             return await self.get_youtube_recommendations(
-                "educational tutorials", limit
+                "educational tutorials", limit, priority=priority
             )
 
-        # 2. Extract topics from categories of recent notes
+        # 2. Extract topics: the recent notes' keywords the user returns to
+        # most, then categories of recent notes
         topics = [
-            n.category
-            for n in notes[:5]
-            if n.category and n.category != "Uncategorized"
+            keyword
+            for keyword, _ in await suggest_topics(
+                session, user_id, limit=3, note_ids=[n.id for n in notes]
+            )
         ]
 
+        if not topics:
+            topics = [
+                n.category
+                for n in notes
+                if n.category and n.category not in (UNCATEGORIZED, PENDING_CATEGORY)
+            ]
+
         # If no categories, use titles
         if not topics:
             topics = [n.video_title for n in notes[:3]]
@@ -56,70 +100,100 @@ class RecommendationService:
         search_query = " ".join(topics[:3])
 
         # 3. Get YouTube recommendations
-        youtube_recs = await self.get_youtube_recommendations(search_query, limit)
+        youtube_recs = await self.get_youtube_recommendations(
+            search_query, limit, priority=priority
+        )
 
         return youtube_recs
 
     async def get_youtube_recommendations(
-        self, query: str, limit: int = 5
+        self,
+        query: str,
+        limit: int = 5,
+        language: str = "en",
+        priority: Priority = Priority.INTERACTIVE,
     ) -> List[Dict]:
         """
         Search YouTube for new videos based on a query.
-        Prioritizes educational content.
+        Prioritizes educational content. Results are cached per normalized
+        query, limit and language.
         """
         if not query:
             return []
 
         # Enhance query for better educational results
         enhanced_query = f"{query} educational lecture tutorial"
+        cache_key = (self.normalize_query(enhanced_query), limit, language)
 
         try:
-            # Run in thread pool since google-api-python-client is synchronous
-            loop = asyncio.get_event_loop()
-            search_response = await loop.run_in_executor(
-                None,
-                lambda: self.youtube.search()
-                .list(
-                    q=enhanced_query,
-                    part="snippet",
-                    maxResults=limit,
-                    type="video",
-                    relevanceLanguage="en",
-                    videoEmbeddable="true",
-                )
-                .execute(),
+            return await self.search_cache.get_or_load(
+                cache_key,
+                lambda: self._search_youtube(enhanced_query, limit, language, priority),
             )
-
-            videos = []
-            for item in search_response.get("items", []):
-                snippet = item["snippet"]
-                videos.append(
-                    {
-                        "id": item["id"]["videoId"],
-                        "title": snippet["title"],
-                        "description": snippet["description"],
-                        "thumbnail": snippet["thumbnails"]["medium"]["url"],
-                        "channelTitle": snippet["channelTitle"],
-                        "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}",
-                        "type": "youtube_video",
-                    }
-                )
-            return videos
         except Exception as e:
             logger.error(f"YouTube search failed: {e}")
             return []
 
+    async def _search_youtube(
+        self, enhanced_query: str, limit: int, language: str, priority: Priority
+    ) -> List[Dict]:
+        await quota_scheduler.acquire_youtube_async(
+            "search.list", priority, max_wait=5
+        )
+        # Run in thread pool since google-api-python-client is synchronous
+        loop = asyncio.get_event_loop()
+        search_response = await loop.run_in_executor(
+            None,
+            lambda: self.youtube.search()
+            .list(
+                q=enhanced_query,
+                part="snippet",
+                maxResults=limit,
+                type="video",
+                relevanceLanguage=language,
+                videoEmbeddable="true",
+            )
+            .execute(),
+        )
+
+        videos = []
+        for item in search_response.get("items", []):
+            snippet = item["snippet"]
+            videos.append(
+                {
+                    "id": item["id"]["videoId"],
+                    "title": snippet["title"],
+                    "description": snippet["description"],
+                    "thumbnail": snippet["thumbnails"]["medium"]["url"],
+                    "channelTitle": snippet["channelTitle"],
+                    "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}",
+                    "type": "youtube_video",
+                }
+            )
+        return videos
+
     async def get_similar_notes(
         self, session: AsyncSession, note_id: int, limit: int = 3
     ) -> List[Note]:
         """
-        Find notes similar to a specific note based on category.
+        Find notes similar to a specific note.
+        Ranked by cosine similarity from the local index; falls back to
+        keyword overlap, then to notes sharing the same category.
         """
         # Fetch the target note
         target_note = await session.get(Note, note_id)
         if not target_note:
             return []
 
+        ranked = similarity_index.most_similar(
+            note_id, k=limit, user_id=target_note.user_id
+        ) or await related_notes(session, note_id, limit)
+        if ranked:
+            ids = [similar_id for similar_id, _ in ranked]
+            result = await session.exec(select(Note).where(Note.id.in_(ids)))
+            by_id = {n.id: n for n in result.all()}
+            return [by_id[i] for i in ids if i in by_id]
+
         # Fetch other notes in the same category
         statement = (
             select(Note)
@@ -0,0 +1,214 @@
+"""
+Local note-similarity index.
+
+Each note is embedded as a compact float32 vector (signed feature hashing of
+its words and bigrams, sublinear TF, L2-normalized). Vectors live in a
+memory-mapped matrix on disk so the index survives restarts without being
+loaded into RAM, and top-k cosine queries use ``argpartition``.
+
+The index assumes a single writer process; use build_similarity_index.py to
+rebuild it offline.
+"""
+
+import json
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.ai_modules.categorization.local_classifier import tokenize
+from src.ai_modules.summarization.renderer import render_note
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def embed_text(text: str, dim: int) -> np.ndarray:
+    """Signed hashed bag-of-words embedding, L2-normalized."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token, count in Counter(tokenize(text)).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dim] += sign * (1.0 + np.log(count))
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+class SimilarityIndex:
+    """
+    Memory-mapped matrix of note vectors plus parallel note/user ID columns.
+
+    Files in ``directory``: ``vectors.f32``, ``note_ids.i64``, ``user_ids.i64``
+    (all with ``capacity`` rows) and ``index.json`` (dim, count, capacity).
+    Capacity doubles when full.
+    """
+
+    INITIAL_CAPACITY = 1024
+    # user_id marking a removed row
+    REMOVED = -1
+
+    def __init__(self, directory: Path, dim: int = 512):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.count = 0
+        self.capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._note_ids: Optional[np.memmap] = None
+        self._user_ids: Optional[np.memmap] = None
+        self._row_of: Dict[int, int] = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, note_id: int) -> bool:
+        return note_id in self._row_of
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, note_id: int, user_id: int, text: str, flush: bool = True) -> None:
+        """Insert or replace the vector for a note."""
+        row = self._row_of.get(note_id)
+        if row is None:
+            if self.count == self.capacity:
+                self._resize(max(self.INITIAL_CAPACITY, self.capacity * 2))
+            row = self.count
+            self.count += 1
+            self._row_of[note_id] = row
+
+        self._vectors[row] = embed_text(text, self.dim)
+        self._note_ids[row] = note_id
+        self._user_ids[row] = user_id
+        if flush:
+            self.flush()
+
+    def add_note(self, note, flush: bool = True) -> None:
+        """Index a ``Note`` row; failures are logged, never raised."""
+        try:
+            self.add(
+                note.id,
+                note.user_id,
+                f"{note.video_title}\n{render_note(note, 'text')}",
+                flush=flush,
+            )
+        except Exception as e:
+            logger.error(f"Could not index note {note.id}: {e}")
+
+    def remove(self, note_id: int) -> None:
+        row = self._row_of.pop(note_id, None)
+        if row is not None:
+            self._user_ids[row] = self.REMOVED
+            self.flush()
+
+    def flush(self) -> None:
+        for array in (self._vectors, self._note_ids, self._user_ids):
+            if array is not None:
+                array.flush()
+        self._write_header()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def most_similar(
+        self, note_id: int, k: int = 3, user_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k notes by cosine similarity to ``note_id``.
+
+        Args:
+            note_id: Query note (must be indexed)
+            k: Number of results
+            user_id: Restrict results to this user's notes
+
+        Returns:
+            List of (note_id, score), best first; empty if the note is unknown
+        """
+        row = self._row_of.get(note_id)
+        if row is None or k <= 0:
+            return []
+
+        vectors = self._vectors[: self.count]
+        scores = np.asarray(vectors @ vectors[row])
+        user_ids = self._user_ids[: self.count]
+        invalid = user_ids == self.REMOVED
+        if user_id is not None:
+            invalid |= user_ids != user_id
+        scores[invalid] = -np.inf
+        scores[row] = -np.inf
+
+        candidates = int(np.count_nonzero(np.isfinite(scores)))
+        k = min(k, candidates)
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self._note_ids[i]), float(scores[i])) for i in top]
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _write_header(self) -> None:
+        header = {"dim": self.dim, "count": self.count, "capacity": self.capacity}
+        self._path("index.json").write_text(json.dumps(header), encoding="utf-8")
+
+    def _open(self, mode: str) -> None:
+        shape = (self.capacity, self.dim)
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode=mode, shape=shape)
+        self._note_ids = np.memmap(self._path("note_ids.i64"), dtype=np.int64, mode=mode, shape=(self.capacity,))
+        self._user_ids = np.memmap(self._path("user_ids.i64"), dtype=np.int64, mode=mode, shape=(self.capacity,))
+
+    def _load(self) -> None:
+        header_path = self._path("index.json")
+        if not header_path.exists():
+            return
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        if header["dim"] != self.dim:
+            logger.warning(
+                f"Similarity index dim {header['dim']} != configured {self.dim}, rebuild required"
+            )
+            return
+        self.count, self.capacity = header["count"], header["capacity"]
+        if self.capacity:
+            self._open("r+")
+            rows = np.nonzero(self._user_ids[: self.count] != self.REMOVED)[0]
+            self._row_of = dict(zip(self._note_ids[rows].tolist(), rows.tolist()))
+        logger.info(f"Loaded similarity index with {len(self._row_of)} notes")
+
+    def _resize(self, capacity: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        old = None
+        if self.capacity:
+            old = (
+                np.array(self._vectors[: self.count]),
+                np.array(self._note_ids[: self.count]),
+                np.array(self._user_ids[: self.count]),
+            )
+            self._vectors = self._note_ids = self._user_ids = None
+        self.capacity = capacity
+        self._open("w+")
+        if old is not None:
+            self._vectors[: self.count], self._note_ids[: self.count], self._user_ids[: self.count] = old
+
+    @classmethod
+    def rebuild(cls, directory: Path, dim: int) -> "SimilarityIndex":
+        """Start an empty index in ``directory``, discarding existing files."""
+        directory = Path(directory)
+        for name in ("index.json", "vectors.f32", "note_ids.i64", "user_ids.i64"):
+            (directory / name).unlink(missing_ok=True)
+        return cls(directory, dim)
+
+
+# Global index used by the API
+similarity_index = SimilarityIndex(settings.similarity_index_dir, settings.similarity_index_dim)
@@ -1,14 +1,36 @@
 import json
-from typing import Dict, Optional
-from google import generativeai as genai
-from pydantic import ValidationError
+import threading
+from typing import Callable, Dict, Optional
+from google import genai
 
 from src.utils.logger import setup_logger
 from src.utils.config import settings
+from src.utils.resilience import AttemptAbandoned, CircuitBreaker, ResilientCaller
+from src.utils.rate_limiter import Priority, RateLimitExceeded, estimate_tokens, quota_scheduler
 from src.ai_modules.summarization.schemas import StudyNoteSchema
+from src.ai_modules.summarization.stream_parser import StreamingNoteParser
+from src.ai_modules.summarization.renderer import (
+    format_timestamp,
+    iter_header,
+    iter_markdown,
+)
 
 logger = setup_logger(__name__)
 
+# Shared by every NoteGenerator so latency stats and circuit state are global
+gemini_caller = ResilientCaller(
+    "gemini",
+    max_retries=settings.llm_max_retries,
+    min_timeout=settings.llm_min_timeout,
+    max_timeout=settings.llm_max_timeout,
+    hedge=settings.llm_hedge_requests,
+    breaker=CircuitBreaker(
+        "gemini",
+        failure_threshold=settings.llm_circuit_failure_threshold,
+        reset_timeout=settings.llm_circuit_reset_seconds,
+    ),
+)
+
 
 class NoteGenerator:
     """Generates structured study notes using Google Gemini LLM."""
@@ -22,10 +44,20 @@ class NoteGenerator:
     4. Provide a chronological timeline of topics.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        caller: Optional[ResilientCaller] = None,
+    ):
         self.api_key = api_key or settings.google_api_key
+        self.caller = caller or gemini_caller
+        base_url = base_url or settings.gemini_base_url
         # Switch to the new google-genai client
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = genai.Client(
+            api_key=self.api_key,
+            http_options={"base_url": base_url} if base_url else None,
+        )
 
         # Use a model name that was confirmed to be available
         self.model_id = "gemini-flash-latest"
@@ -35,68 +67,113 @@ class NoteGenerator:
         )
 
     def generate_notes_json(self, transcript_text: str, video_title: str) -> Dict:
-        try:
-            prompt = f"{self.SYSTEM_PROMPT}\nVideo Title: {video_title}\nTranscript: {transcript_text}"
+        """
+        Generate validated study notes.
+
+        Raises:
+            LLMCallError: If Gemini keeps failing or returns invalid notes
+            CircuitOpenError: If Gemini is currently considered down
+        """
+        prompt = self._build_prompt(transcript_text, video_title)
 
-            logger.info(f"Generating notes for: {video_title}")
+        logger.info(f"Generating notes for: {video_title}")
 
+        def request(cancelled: threading.Event) -> Dict:
+            if cancelled.is_set():
+                raise AttemptAbandoned("Attempt abandoned before the request was sent")
             # Using the new google-genai syntax
             response = self.client.models.generate_content(
                 model=self.model_id,
                 contents=prompt,
-                config={
-                    "response_mime_type": "application/json",
-                    "response_schema": StudyNoteSchema,
-                },
+                config=self._generation_config(),
+            )
+            # The response object has a parsed data field if schema is provided
+            # but if we want to be safe with json.loads:
+            return self._validate_notes(response.text)
+
+        return self.caller.call(request, cancellable=True, acquire=self._quota_acquirer(prompt))
+
+    def generate_notes_json_stream(
+        self,
+        transcript_text: str,
+        video_title: str,
+        on_partial: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        Same as generate_notes_json, but streams the response.
+
+        ``on_partial`` is called with a snapshot of the notes parsed so far
+        every time the summary, a key concept, a timeline item, etc. completes.
+        A retried attempt starts reporting from scratch; an abandoned
+        (timed out) attempt stops reading its stream and reports nothing more.
+        """
+        prompt = self._build_prompt(transcript_text, video_title)
+
+        logger.info(f"Streaming notes for: {video_title}")
+
+        def request(cancelled: threading.Event) -> Dict:
+            if cancelled.is_set():
+                raise AttemptAbandoned("Attempt abandoned before the request was sent")
+            parser = StreamingNoteParser()
+            stream = self.client.models.generate_content_stream(
+                model=self.model_id,
+                contents=prompt,
+                config=self._generation_config(),
             )
+            for chunk in stream:
+                if cancelled.is_set():
+                    raise AttemptAbandoned("Attempt abandoned mid-stream")
+                if parser.feed(chunk.text or "") and on_partial and not cancelled.is_set():
+                    on_partial(parser.snapshot())
+            return self._validate_notes(parser.text)
+
+        # Hedging would interleave two streams' partial results
+        return self.caller.call(
+            request, hedge=False, cancellable=True, acquire=self._quota_acquirer(prompt)
+        )
+
+    def _quota_acquirer(self, prompt: str) -> Callable[[bool], bool]:
+        # Called by the caller for every request it sends (hedges included),
+        # outside the call timeout; a hedge only goes out if quota is free now
+        tokens = estimate_tokens(prompt)
 
+        def acquire(blocking: bool) -> bool:
             try:
-                # The response object has a parsed data field if schema is provided
-                # but if we want to be safe with json.loads:
-                content = response.text
-                data = json.loads(content)
-                validated_notes = StudyNoteSchema(**data)
-                return validated_notes.model_dump()
-            except (json.JSONDecodeError, ValidationError) as e:
-                logger.error(f"Validation failed: {e}")
-                return self._get_error_json(str(e))
-
-        except Exception as e:
-            logger.error(f"Gemini API Error: {e}")
-            return self._get_error_json(str(e))
+                quota_scheduler.acquire_model(
+                    self.model_id, tokens, Priority.BACKGROUND, max_wait=None if blocking else 0
+                )
+            except RateLimitExceeded:
+                return False
+            return True
+
+        return acquire
+
+    def _build_prompt(self, transcript_text: str, video_title: str) -> str:
+        return f"{self.SYSTEM_PROMPT}\nVideo Title: {video_title}\nTranscript: {transcript_text}"
+
+    @staticmethod
+    def _generation_config() -> Dict:
+        return {
+            "response_mime_type": "application/json",
+            "response_schema": StudyNoteSchema,
+        }
+
+    @staticmethod
+    def _validate_notes(content: str) -> Dict:
+        # Invalid JSON / schema errors propagate so the attempt is retried
+        data = json.loads(content)
+        validated_notes = StudyNoteSchema(**data)
+        return validated_notes.model_dump()
 
     def format_notes_to_markdown(self, json_notes: Dict) -> str:
-        md = f"## Summary\n{json_notes.get('summary', '')}\n\n"
-        md += "## Key Concepts\n"
-        for concept in json_notes.get("key_concepts", []):
-            md += f"- **{concept.get('term', '')}**: {concept.get('definition', '')}\n"
-        md += "\n## Timeline\n"
-        for item in json_notes.get("timestamps", []):
-            md += f"- **{item.get('timestamp', '')}** - {item.get('topic', '')}: {item.get('summary', '')}\n"
-        md += "\n## Action Items\n"
-        for item in json_notes.get("action_items", []):
-            md += f"- {item}\n"
-        return md
+        return "".join(iter_markdown(json_notes))
 
     def format_final_notes(
         self, notes: str, video_title: str, video_url: str, duration: int
     ) -> str:
-        duration_str = self._format_timestamp(duration)
-        header = f"# {video_title}\n\n---\n**Source:** {video_url}\n**Duration:** {duration_str}\n---\n\n"
+        header = "".join(iter_header("markdown", video_title, video_url, duration))
         return header + notes
 
     @staticmethod
     def _format_timestamp(seconds: float) -> str:
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
-
-    def _get_error_json(self, error_msg: str) -> Dict:
-        return {
-            "title": "Error",
-            "summary": error_msg,
-            "key_concepts": [],
-            "action_items": [],
-            "timestamps": [],
-            "keywords": [],
-        }
+        return format_timestamp(seconds)
@@ -0,0 +1,287 @@
+"""
+Manifest index of the generated note files in ``outputs/``.
+
+Files are stored in shard subdirectories (``outputs/3f/<name>_notes.md``,
+two hex characters of a hash of the name) so no directory grows huge;
+files left flat in ``outputs/`` by older versions are still indexed and
+served. The manifest (an SQLite file) holds filename, title, mtime and
+size, so listings are paged and sorted from its indexes instead of
+reading every file.
+
+The manifest is kept current incrementally: ``write`` updates it
+directly, and ``refresh`` re-scans only directories whose mtime changed
+(a file was added, replaced or removed), plus every directory once per
+``rescan_interval`` to catch files edited in place.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.compression import SIDECAR_SUFFIXES, write_sidecars
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NOTE_SUFFIX = "_notes.md"
+SHARD_CHARS = 2
+# The title is the first line; never read more than this to find it
+MAX_TITLE_BYTES = 4096
+
+SORT_COLUMNS = {
+    "created_at": "mtime",
+    "title": "title COLLATE NOCASE",
+    "size": "size",
+    "filename": "filename",
+}
+
+
+def read_title(path: Path) -> str:
+    """Title from the first line ("# Title") of a note file."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        first_line = f.readline(MAX_TITLE_BYTES)
+    return first_line.replace("#", "").strip() or path.name
+
+
+def _is_shard(name: str) -> bool:
+    return len(name) == SHARD_CHARS and all(c in "0123456789abcdef" for c in name)
+
+
+class OutputIndex:
+    """Sharded storage and SQLite manifest for generated note files."""
+
+    def __init__(self, root: Path, db_path: Path, rescan_interval: float = 60.0):
+        self.root = Path(root)
+        self.db_path = Path(db_path)
+        self.rescan_interval = rescan_interval
+        self._local = threading.local()
+        # One refresh at a time; concurrent callers wait and reuse its result
+        self._refresh_lock = threading.Lock()
+        self._last_full_scan = float("-inf")
+        self._init_db()
+
+    @staticmethod
+    def shard_for(filename: str) -> str:
+        return hashlib.blake2b(filename.encode("utf-8"), digest_size=8).hexdigest()[:SHARD_CHARS]
+
+    def write(self, filename: str, content: str) -> Path:
+        """Store a note file in its shard (with compressed copies) and index it."""
+        if Path(filename).name != filename or not filename.endswith(NOTE_SUFFIX):
+            raise ValueError(f"Invalid note filename: {filename!r}")
+
+        shard = self.shard_for(filename)
+        directory = self.root / shard
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / filename
+        tmp_path = directory / f".{filename}.tmp"
+        tmp_path.write_text(content, encoding="utf-8")
+        tmp_path.replace(path)
+        write_sidecars(path)
+
+        stats = path.stat()
+        title = content.split("\n", 1)[0].replace("#", "").strip() or filename
+        self._conn().execute(
+            "INSERT INTO files (filename, shard, title, mtime, size) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (filename) DO UPDATE SET shard = excluded.shard, "
+            "title = excluded.title, mtime = excluded.mtime, size = excluded.size",
+            (filename, shard, title, stats.st_mtime, stats.st_size),
+        )
+        return path
+
+    def path_for(self, filename: str) -> Optional[Path]:
+        """Location of a note file (sharded or legacy flat), None if missing."""
+        row = self._conn().execute(
+            "SELECT shard FROM files WHERE filename = ?", (filename,)
+        ).fetchone()
+        candidates = [self.root / self.shard_for(filename) / filename, self.root / filename]
+        if row is not None:
+            candidates.insert(0, self._directory(row[0]) / filename)
+        for path in candidates:
+            if path.is_file():
+                return path
+        return None
+
+    def list_files(
+        self, limit: int = 100, offset: int = 0, sort: str = "created_at", descending: bool = True
+    ) -> Tuple[List[Dict], int]:
+        """One page of indexed files plus the total count."""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort: {sort}")
+        self.refresh()
+
+        direction = "DESC" if descending else "ASC"
+        conn = self._conn()
+        rows = conn.execute(
+            f"SELECT filename, title, mtime, size FROM files "
+            f"ORDER BY {SORT_COLUMNS[sort]} {direction}, filename {direction} LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+        total = conn.execute("SELECT count(*) FROM files").fetchone()[0]
+        return [
+            {"filename": filename, "title": title, "created_at": mtime, "size": size}
+            for filename, title, mtime, size in rows
+        ], total
+
+    def refresh(self, force: bool = False) -> None:
+        """Bring the manifest up to date with the directory tree."""
+        with self._refresh_lock:
+            full = force or time.monotonic() - self._last_full_scan >= self.rescan_interval
+            conn = self._conn()
+            known = dict(conn.execute("SELECT shard, mtime_ns FROM directories").fetchall())
+
+            if not self.root.exists():
+                conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM directories")
+                return
+
+            changes = [0, 0]
+            root_mtime = self.root.stat().st_mtime_ns
+            if full or known.get("") != root_mtime:
+                # Listing the root also finds legacy flat files and new shards
+                shards = self._scan("", self.root, changes)
+                self._set_directory("", root_mtime)
+            else:
+                shards = [shard for shard in known if shard]
+
+            for shard in shards:
+                directory = self._directory(shard)
+                try:
+                    mtime = directory.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if full or known.get(shard) != mtime:
+                    self._scan(shard, directory, changes)
+                    self._set_directory(shard, mtime)
+
+            # Shard directories that disappeared
+            for shard in set(known) - set(shards) - {""}:
+                conn.execute("DELETE FROM files WHERE shard = ?", (shard,))
+                conn.execute("DELETE FROM directories WHERE shard = ?", (shard,))
+
+            if full:
+                self._last_full_scan = time.monotonic()
+            if any(changes):
+                logger.info(f"Output manifest: {changes[0]} files indexed, {changes[1]} removed")
+
+    def shard_flat_files(self) -> int:
+        """Move legacy flat files from the root into their shards."""
+        moved = 0
+        with os.scandir(self.root) as entries:
+            flat = [e.name for e in entries if e.is_file() and e.name.endswith(NOTE_SUFFIX)]
+        for filename in flat:
+            directory = self.root / self.shard_for(filename)
+            directory.mkdir(exist_ok=True)
+            (self.root / filename).replace(directory / filename)
+            for suffix in SIDECAR_SUFFIXES.values():
+                sidecar = self.root / (filename + suffix)
+                if sidecar.exists():
+                    sidecar.replace(directory / sidecar.name)
+            moved += 1
+        self.refresh(force=True)
+        return moved
+
+    def _directory(self, shard: str) -> Path:
+        return self.root / shard if shard else self.root
+
+    def _scan(self, shard: str, directory: Path, changes: List[int]) -> List[str]:
+        """
+        Re-index one directory: stat only, titles read for changed files.
+        Adds the indexed and removed counts to ``changes``; returns the
+        shard subdirectories found (root only).
+        """
+        files, subshards = {}, []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(NOTE_SUFFIX):
+                    stats = entry.stat()
+                    files[entry.name] = (stats.st_mtime, stats.st_size)
+                elif not shard and entry.is_dir() and _is_shard(entry.name):
+                    subshards.append(entry.name)
+
+        conn = self._conn()
+        indexed = {
+            filename: (mtime, size)
+            for filename, mtime, size in conn.execute(
+                "SELECT filename, mtime, size FROM files WHERE shard = ?", (shard,)
+            )
+        }
+        changed = [name for name, stat in files.items() if indexed.get(name) != stat]
+        removed = [name for name in indexed if name not in files]
+
+        conn.execute("BEGIN")
+        try:
+            for filename in changed:
+                try:
+                    title = read_title(directory / filename)
+                except OSError as e:
+                    logger.error(f"Error reading file {directory / filename}: {e}")
+                    continue
+                mtime, size = files[filename]
+                conn.execute(
+                    "INSERT INTO files (filename, shard, title, mtime, size) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (filename) DO UPDATE SET shard = excluded.shard, "
+                    "title = excluded.title, mtime = excluded.mtime, size = excluded.size",
+                    (filename, shard, title, mtime, size),
+                )
+            conn.executemany(
+                "DELETE FROM files WHERE shard = ? AND filename = ?",
+                [(shard, filename) for filename in removed],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # Compressed copies of removed files
+        for filename in removed:
+            for suffix in SIDECAR_SUFFIXES.values():
+                (directory / (filename + suffix)).unlink(missing_ok=True)
+
+        changes[0] += len(changed)
+        changes[1] += len(removed)
+        return subshards
+
+    def _set_directory(self, shard: str, mtime_ns: int) -> None:
+        self._conn().execute(
+            "INSERT INTO directories (shard, mtime_ns) VALUES (?, ?) "
+            "ON CONFLICT (shard) DO UPDATE SET mtime_ns = excluded.mtime_ns",
+            (shard, mtime_ns),
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "filename TEXT PRIMARY KEY, shard TEXT NOT NULL, title TEXT NOT NULL, "
+            "mtime REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS files_shard ON files (shard)")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime, filename)")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_title ON files (title COLLATE NOCASE, filename)")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_size ON files (size, filename)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS directories (shard TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL)"
+        )
+
+
+# Global index of settings.output_dir
+output_index = OutputIndex(
+    root=settings.output_dir,
+    db_path=settings.output_manifest_path,
+    rescan_interval=settings.output_manifest_rescan_seconds,
+)
@@ -0,0 +1,179 @@
+"""
+Render layer for structured study notes.
+Turns the stored StudyNoteSchema JSON into markdown, HTML or plain text on
+demand, and caches rendered output per note version and format.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from html import escape
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FORMATS = ("markdown", "html", "text")
+
+
+def dump_notes(json_notes: Dict) -> str:
+    """Serialize notes to the compact JSON stored in ``Note.content_json``."""
+    return json.dumps(json_notes, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_notes(content_json: str) -> Dict:
+    return json.loads(content_json)
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def iter_markdown(json_notes: Dict) -> Iterator[str]:
+    """Yield the markdown body piece by piece (no quadratic string building)."""
+    yield f"## Summary\n{json_notes.get('summary', '')}\n\n"
+    yield "## Key Concepts\n"
+    for concept in json_notes.get("key_concepts", []):
+        yield f"- **{concept.get('term', '')}**: {concept.get('definition', '')}\n"
+    yield "\n## Timeline\n"
+    for item in json_notes.get("timestamps", []):
+        yield f"- **{item.get('timestamp', '')}** - {item.get('topic', '')}: {item.get('summary', '')}\n"
+    yield "\n## Action Items\n"
+    for item in json_notes.get("action_items", []):
+        yield f"- {item}\n"
+
+
+def iter_html(json_notes: Dict) -> Iterator[str]:
+    yield f"<h2>Summary</h2>\n<p>{escape(json_notes.get('summary', ''))}</p>\n"
+    yield "<h2>Key Concepts</h2>\n<ul>\n"
+    for concept in json_notes.get("key_concepts", []):
+        yield (
+            f"<li><strong>{escape(concept.get('term', ''))}</strong>: "
+            f"{escape(concept.get('definition', ''))}</li>\n"
+        )
+    yield "</ul>\n<h2>Timeline</h2>\n<ul>\n"
+    for item in json_notes.get("timestamps", []):
+        yield (
+            f"<li><strong>{escape(item.get('timestamp', ''))}</strong> - "
+            f"{escape(item.get('topic', ''))}: {escape(item.get('summary', ''))}</li>\n"
+        )
+    yield "</ul>\n<h2>Action Items</h2>\n<ul>\n"
+    for item in json_notes.get("action_items", []):
+        yield f"<li>{escape(item)}</li>\n"
+    yield "</ul>\n"
+
+
+def iter_text(json_notes: Dict) -> Iterator[str]:
+    yield f"SUMMARY\n{json_notes.get('summary', '')}\n\n"
+    yield "KEY CONCEPTS\n"
+    for concept in json_notes.get("key_concepts", []):
+        yield f"- {concept.get('term', '')}: {concept.get('definition', '')}\n"
+    yield "\nTIMELINE\n"
+    for item in json_notes.get("timestamps", []):
+        yield f"- {item.get('timestamp', '')} {item.get('topic', '')}: {item.get('summary', '')}\n"
+    yield "\nACTION ITEMS\n"
+    for item in json_notes.get("action_items", []):
+        yield f"- {item}\n"
+
+
+def iter_header(
+    fmt: str, video_title: str, video_url: str, duration: Optional[float]
+) -> Iterator[str]:
+    """Yield the title/source/duration header for ``fmt``."""
+    duration_str = format_timestamp(duration) if duration is not None else "N/A"
+    if fmt == "html":
+        yield (
+            f"<h1>{escape(video_title)}</h1>\n<hr>\n"
+            f"<p><strong>Source:</strong> <a href=\"{escape(video_url)}\">{escape(video_url)}</a><br>\n"
+            f"<strong>Duration:</strong> {duration_str}</p>\n<hr>\n"
+        )
+    elif fmt == "text":
+        yield f"{video_title}\nSource: {video_url}\nDuration: {duration_str}\n\n"
+    else:
+        yield f"# {video_title}\n\n---\n**Source:** {video_url}\n**Duration:** {duration_str}\n---\n\n"
+
+
+_BODY_RENDERERS = {
+    "markdown": iter_markdown,
+    "html": iter_html,
+    "text": iter_text,
+}
+
+
+def iter_note(
+    fmt: str, json_notes: Dict, video_title: str, video_url: str
+) -> Iterator[str]:
+    """Yield a complete rendered note (header + body) in ``fmt``."""
+    if fmt not in _BODY_RENDERERS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    yield from iter_header(fmt, video_title, video_url, json_notes.get("duration"))
+    yield from _BODY_RENDERERS[fmt](json_notes)
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered notes keyed by (note id, version, format)."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, int, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[int, int, str]) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[int, int, str], value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, note_id: int) -> None:
+        """Drop every cached rendering of a note."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == note_id]:
+                del self._entries[key]
+
+
+render_cache = RenderCache()
+
+
+def render_note(note, fmt: str = "markdown") -> str:
+    """
+    Render a ``Note`` row in the requested format, using the render cache.
+
+    Notes created before structured storage (or through ``POST /notes``) only
+    have markdown in ``summary_content``; that is returned as-is for markdown
+    and text, and escaped for HTML.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    if not note.content_json:
+        if fmt == "html":
+            return f"<pre>{escape(note.summary_content)}</pre>"
+        return note.summary_content
+
+    key = (note.id, note.version, fmt)
+    cached = render_cache.get(key) if note.id is not None else None
+    if cached is not None:
+        return cached
+
+    rendered = "".join(
+        iter_note(fmt, load_notes(note.content_json), note.video_title, note.video_url)
+    )
+    if note.id is not None:
+        render_cache.put(key, rendered)
+    return rendered
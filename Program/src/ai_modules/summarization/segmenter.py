@@ -4,7 +4,7 @@ Splits long transcripts into logical sections for better processing.
 """
 
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Tuple
 
 from src.utils.logger import setup_logger
 
@@ -20,6 +20,18 @@ class TranscriptSegmenter:
         'basically', 'actually', 'literally', 'right', 'okay', 'so yeah'
     }
     
+    # One alternation for every filler (longest first so "so yeah" wins over
+    # shorter prefixes) plus a catch-all word group, so a transcript is
+    # scanned once instead of once per filler word.
+    _TOKEN_PATTERN = re.compile(
+        r'\b(?:'
+        + '|'.join(re.escape(f) for f in sorted(FILLER_WORDS, key=len, reverse=True))
+        + r')\b,?|(?P<word>\S+)',
+        re.IGNORECASE,
+    )
+    _SENTENCE_END = frozenset('.!?')
+    _ATTACHED_PUNCTUATION = frozenset('.,!?;:')
+    
     def __init__(self, max_segment_words: int = 500):
         """
         Initialize the segmenter.
@@ -32,6 +44,9 @@ class TranscriptSegmenter:
     def clean_text(self, text: str) -> str:
         """
         Clean transcript by removing filler words and normalizing.
+
+        Filler removal, whitespace collapsing and sentence casing happen in a
+        single pass; the original casing of every other word is kept.
         
         Args:
             text: Raw transcript text
@@ -39,27 +54,58 @@ class TranscriptSegmenter:
         Returns:
             Cleaned text
         """
-        # Convert to lowercase for processing
-        cleaned = text.lower()
-        
-        # Remove filler words
-        for filler in self.FILLER_WORDS:
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(filler) + r'\b'
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+        cleaned, _ = self._clean_chunk(text, capitalize_next=True)
         
-        # Remove multiple spaces
-        cleaned = re.sub(r'\s+', ' ', cleaned)
+        logger.debug(f"Cleaned text: reduced from {len(text)} to {len(cleaned)} characters")
         
-        # Remove leading/trailing whitespace
-        cleaned = cleaned.strip()
+        return cleaned
+    
+    def clean_segments(self, segments: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Clean Whisper segments one at a time.
         
-        # Capitalize first letter of sentences
-        cleaned = '. '.join(s.capitalize() for s in cleaned.split('. '))
+        Each input segment yields exactly one output segment with the same
+        timing, so segment boundaries survive cleaning. Sentence casing is
+        carried across segments (a sentence may span several of them).
         
-        logger.debug(f"Cleaned text: reduced from {len(text)} to {len(cleaned)} characters")
+        Args:
+            segments: Timestamped segments from Whisper
+            
+        Yields:
+            Copies of the segments with cleaned ``text``
+        """
+        capitalize_next = True
+        for seg in segments:
+            text, capitalize_next = self._clean_chunk(seg['text'], capitalize_next)
+            yield {**seg, 'text': text}
+    
+    @classmethod
+    def _clean_chunk(cls, text: str, capitalize_next: bool) -> Tuple[str, bool]:
+        """
+        Single scan over ``text`` with the precompiled token pattern.
         
-        return cleaned
+        Args:
+            text: Raw text chunk
+            capitalize_next: Whether the first word starts a sentence
+            
+        Returns:
+            Tuple of (cleaned text, whether the next chunk starts a sentence)
+        """
+        words: List[str] = []
+        for match in cls._TOKEN_PATTERN.finditer(text):
+            word = match.group('word')
+            if word is None:
+                # Filler word (and any trailing comma) is dropped
+                continue
+            if words and word[0] in cls._ATTACHED_PUNCTUATION:
+                # Punctuation orphaned by a removed filler ("okay.")
+                words[-1] += word
+            else:
+                if capitalize_next and word[0].islower():
+                    word = word[0].upper() + word[1:]
+                words.append(word)
+            capitalize_next = word[-1] in cls._SENTENCE_END
+        return ' '.join(words), capitalize_next
     
     def segment_by_time(
         self,
@@ -0,0 +1,139 @@
+"""
+Incremental parser for streamed StudyNoteSchema JSON.
+Emits top-level fields and individual list items as soon as they are complete,
+so partial notes can be shown while Gemini is still generating.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class StreamingNoteParser:
+    """
+    Scans a JSON object chunk by chunk without re-parsing what was already seen.
+
+    Scalar top-level fields (``title``, ``summary``) are emitted once their value
+    is complete; list fields (``key_concepts``, ``timestamps``, ...) are emitted
+    one item at a time.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._awaiting_value = False
+        self._value_start: Optional[int] = None
+        self._list_key: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self.partial: Dict[str, Any] = {}
+
+    @property
+    def text(self) -> str:
+        """Full JSON text received so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of streamed JSON.
+
+        Args:
+            chunk: Raw text chunk from the model stream
+
+        Returns:
+            List of (field, value) events completed by this chunk. For list
+            fields the value is a single new item.
+        """
+        events: List[Tuple[str, Any]] = []
+        if not chunk:
+            return events
+
+        start = len(self._buffer)
+        self._buffer += chunk
+        buf = self._buffer
+
+        for i in range(start, len(buf)):
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start : i + 1])
+                        self._key_start = None
+                continue
+
+            if ch.isspace():
+                continue
+
+            # Remember where the current value / list item begins
+            if self._depth == 1 and self._awaiting_value:
+                self._value_start = i
+                self._awaiting_value = False
+            elif (
+                self._depth == 2
+                and self._list_key is not None
+                and self._item_start is None
+                and ch not in ",]"
+            ):
+                self._item_start = i
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 2 and ch == "[":
+                    self._list_key = self._key
+            elif ch in "}]":
+                if self._depth == 2 and self._list_key is not None:
+                    self._finish_item(i, events)
+                    self._list_key = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_field(i, events)
+            elif ch == ",":
+                if self._depth == 1:
+                    self._finish_field(i, events)
+                elif self._depth == 2 and self._list_key is not None:
+                    self._finish_item(i, events)
+            elif ch == ":" and self._depth == 1:
+                self._awaiting_value = True
+
+        return events
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the partial notes that is safe to hand to another thread."""
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self.partial.items()
+        }
+
+    def _finish_item(self, end: int, events: List[Tuple[str, Any]]) -> None:
+        if self._item_start is None:
+            return
+        item = json.loads(self._buffer[self._item_start : end])
+        self._item_start = None
+        self.partial.setdefault(self._list_key, []).append(item)
+        events.append((self._list_key, item))
+
+    def _finish_field(self, end: int, events: List[Tuple[str, Any]]) -> None:
+        key, value_start = self._key, self._value_start
+        self._key = None
+        self._value_start = None
+        if key is None or value_start is None:
+            return
+        if self._buffer[value_start] == "[":
+            # Items were already emitted one by one
+            self.partial.setdefault(key, [])
+            return
+        value = json.loads(self._buffer[value_start:end])
+        self.partial[key] = value
+        events.append((key, value))
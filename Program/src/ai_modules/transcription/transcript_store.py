@@ -0,0 +1,282 @@
+"""
+On-disk transcript segments with a per-user inverted index.
+
+Every user has a directory of append-only, memory-mapped files:
+
+- ``starts.f32`` / ``ends.f32`` / ``note_ids.i64``: one entry per segment
+- ``offsets.i64`` + ``text.bin``: byte offset of each segment's text in a
+  UTF-8 blob (a segment ends where the next one starts)
+- ``postings-<n>.bin``: runs of (term hash, segment) pairs, each sorted by
+  term, so looking a term up is a binary search per run over the memory map
+- ``header.json``: committed segment/byte counts and the live postings runs
+
+Postings are log-structured: every ``add`` writes the new note's postings as
+a small run, and the newest runs are merged while the older of the last two
+is at most ``MERGE_FACTOR`` times the newer. A write therefore only touches
+runs of similar size (amortized O(log n) rewrites per posting) and a user
+never has more than O(log n) runs to search.
+
+Nothing is held in memory between queries; a search only touches the pages
+of the postings it binary-searches and of the segments it returns. The
+store assumes a single writer process.
+"""
+
+import json
+import math
+import re
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+POSTING = np.dtype([("term", "<u8"), ("segment", "<i4")])
+SEGMENT_FILES = {
+    "starts.f32": np.float32,
+    "ends.f32": np.float32,
+    "note_ids.i64": np.int64,
+    "offsets.i64": np.int64,
+}
+# Merge the two newest postings runs while the older is at most this many
+# times larger than the newer
+MERGE_FACTOR = 2
+
+
+def words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def term_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class TranscriptStore:
+    """Timestamped transcript segments of all notes, searchable per user."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def _user_dir(self, user_id: int) -> Path:
+        return self.directory / f"user_{user_id}"
+
+    @staticmethod
+    def _read_header(user_dir: Path) -> Dict[str, int]:
+        path = user_dir / "header.json"
+        if not path.exists():
+            return {"segments": 0, "text_bytes": 0, "runs": [], "next_run": 0}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _map(path: Path, dtype) -> np.ndarray:
+        if not path.exists() or path.stat().st_size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, user_id: int, note_id: int, segments: List[Dict]) -> int:
+        """
+        Append a note's Whisper segments (``start``, ``end``, ``text``) and
+        index their words. Returns the number of segments stored.
+        """
+        if not segments:
+            return 0
+
+        with self._lock:
+            user_dir = self._user_dir(user_id)
+            user_dir.mkdir(parents=True, exist_ok=True)
+            header = self._read_header(user_dir)
+            self._truncate(user_dir, header)
+
+            texts = [segment["text"].strip().encode("utf-8") for segment in segments]
+            lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+            offsets = header["text_bytes"] + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            columns = {
+                "starts.f32": [s["start"] for s in segments],
+                "ends.f32": [s["end"] for s in segments],
+                "note_ids.i64": [note_id] * len(segments),
+                "offsets.i64": offsets,
+            }
+            for name, dtype in SEGMENT_FILES.items():
+                with open(user_dir / name, "ab") as f:
+                    np.asarray(columns[name], dtype=dtype).tofile(f)
+            with open(user_dir / "text.bin", "ab") as f:
+                f.write(b"".join(texts))
+
+            first = header["segments"]
+            new_postings = np.array(
+                [
+                    (term_hash(word), first + i)
+                    for i, text in enumerate(texts)
+                    for word in dict.fromkeys(words(text.decode("utf-8")))
+                ],
+                dtype=POSTING,
+            )
+            next_run = header["next_run"]
+            run, next_run = f"postings-{next_run}.bin", next_run + 1
+            self._write_run(user_dir / run, new_postings)
+            runs, next_run = self._compact(user_dir, header["runs"] + [run], next_run)
+
+            header = {
+                "segments": first + len(segments),
+                "text_bytes": header["text_bytes"] + int(lengths.sum()),
+                "runs": runs,
+                "next_run": next_run,
+            }
+            self._write_json(user_dir / "header.json", header)
+            # Runs merged away are only deleted once the header no longer lists them
+            self._remove_unlisted_runs(user_dir, runs)
+
+        logger.info(f"Stored {len(segments)} transcript segments for note {note_id}")
+        return len(segments)
+
+    def _truncate(self, user_dir: Path, header: Dict[str, int]) -> None:
+        # Drop anything appended after the last committed header (crash mid-add)
+        for name, dtype in SEGMENT_FILES.items():
+            path = user_dir / name
+            if path.exists():
+                with open(path, "r+b") as f:
+                    f.truncate(header["segments"] * np.dtype(dtype).itemsize)
+        path = user_dir / "text.bin"
+        if path.exists():
+            with open(path, "r+b") as f:
+                f.truncate(header["text_bytes"])
+        self._remove_unlisted_runs(user_dir, header["runs"])
+
+    @staticmethod
+    def _remove_unlisted_runs(user_dir: Path, runs: List[str]) -> None:
+        for path in user_dir.glob("postings*"):
+            if path.name not in runs:
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _write_run(path: Path, postings: np.ndarray) -> None:
+        # Postings are in segment order, so a stable sort by term keeps
+        # each term's list ordered by segment
+        postings = postings[np.argsort(postings["term"], kind="stable")]
+        tmp_path = path.with_suffix(".tmp")
+        postings.tofile(tmp_path)
+        tmp_path.replace(path)
+
+    def _compact(self, user_dir: Path, runs: List[str], next_run: int) -> Tuple[List[str], int]:
+        """Merge the newest runs while they are of similar size."""
+        runs = list(runs)
+        while len(runs) > 1:
+            older = self._map(user_dir / runs[-2], POSTING)
+            newer = self._map(user_dir / runs[-1], POSTING)
+            if len(older) > MERGE_FACTOR * len(newer):
+                break
+            # Every segment in the newer run comes after the older run's
+            merged_name = f"postings-{next_run}.bin"
+            next_run += 1
+            self._write_run(user_dir / merged_name, np.concatenate((older, newer)))
+            del older, newer
+            runs[-2:] = [merged_name]
+        return runs, next_run
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        tmp_path.replace(path)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, user_id: int, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Segments of the user's transcripts matching ``query``.
+
+        Each query word scores ``log(1 + N / df)`` for the segments containing
+        it, so segments matching more (and rarer) words rank first.
+
+        Returns:
+            List of dicts with note_id, start, end, text and score, best first
+        """
+        user_dir = self._user_dir(user_id)
+        query_words = list(dict.fromkeys(words(query)))
+        if not query_words or limit <= 0:
+            return []
+        runs = self._map_runs(user_dir)
+        if not runs:
+            return []
+
+        starts = self._map(user_dir / "starts.f32", np.float32)
+        matched, weights = [], []
+        for word in query_words:
+            h = np.uint64(term_hash(word))
+            term_segments = []
+            for postings in runs:
+                terms = postings["term"]
+                lo = np.searchsorted(terms, h, side="left")
+                hi = np.searchsorted(terms, h, side="right")
+                if hi > lo:
+                    term_segments.append(np.asarray(postings["segment"][lo:hi]))
+            if term_segments:
+                segments = np.concatenate(term_segments)
+                matched.append(segments)
+                weights.append(np.full(len(segments), math.log(1 + len(starts) / len(segments))))
+        if not matched:
+            return []
+
+        segment_ids, inverse = np.unique(np.concatenate(matched), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+        k = min(limit, len(segment_ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Best score first, earlier segments first on ties
+        top = top[np.lexsort((segment_ids[top], -scores[top]))]
+
+        ends = self._map(user_dir / "ends.f32", np.float32)
+        note_ids = self._map(user_dir / "note_ids.i64", np.int64)
+        offsets = self._map(user_dir / "offsets.i64", np.int64)
+        text = self._map(user_dir / "text.bin", np.uint8)
+
+        hits = []
+        for i in top:
+            segment = int(segment_ids[i])
+            begin = int(offsets[segment])
+            end = int(offsets[segment + 1]) if segment + 1 < len(offsets) else len(text)
+            hits.append(
+                {
+                    "note_id": int(note_ids[segment]),
+                    "start": float(starts[segment]),
+                    "end": float(ends[segment]),
+                    "text": bytes(text[begin:end]).decode("utf-8"),
+                    "score": float(scores[i]),
+                }
+            )
+        return hits
+
+    def _map_runs(self, user_dir: Path, attempts: int = 3) -> List[np.ndarray]:
+        """Memory maps of the committed postings runs."""
+        for _ in range(attempts):
+            header = self._read_header(user_dir)
+            try:
+                maps = []
+                for run in header["runs"]:
+                    path = user_dir / run
+                    if not path.exists():
+                        raise FileNotFoundError(path)
+                    postings = self._map(path, POSTING)
+                    if len(postings):
+                        maps.append(postings)
+                return maps
+            except FileNotFoundError:
+                # A concurrent add merged a run away after we read the header
+                continue
+        return []
+
+
+# Global store used by the pipeline and the search API
+transcript_store = TranscriptStore(settings.transcript_store_dir)
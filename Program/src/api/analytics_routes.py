@@ -2,14 +2,16 @@
 Analytics API endpoints for user statistics.
 """
 
-from typing import Dict, List
-from fastapi import APIRouter, Depends
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
-from sqlmodel import Session, select, func
-from datetime import datetime
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import date, datetime, timedelta
 
 from src.db.database import get_session
 from src.db.models import User, Note
+from src.db.stats import category_totals, get_languages, get_user_stats, study_time_series
 from src.auth.dependencies import get_current_user
 from src.utils.logger import setup_logger
 
@@ -49,6 +51,20 @@ class AnalyticsResponse(BaseModel):
         }
 
 
+class StudyTimePoint(BaseModel):
+    """Study time in one day or week."""
+    period_start: date
+    notes: int
+    study_seconds: int
+
+
+class CategoryStudyTime(BaseModel):
+    """Study time in one category."""
+    category: str
+    notes: int
+    study_seconds: int
+
+
 def format_duration(seconds: int) -> str:
     """
     Format duration in seconds to HH:MM:SS format.
@@ -72,7 +88,7 @@ def format_duration(seconds: int) -> str:
 @router.get("", response_model=AnalyticsResponse)
 async def get_analytics(
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Get user statistics and analytics.
@@ -85,35 +101,25 @@ async def get_analytics(
     - Average video duration
     - Languages used
     - Recent activity
-    """
-    # Get all notes for the user
-    statement = select(Note).where(Note.user_id == current_user.id)
-    notes = session.exec(statement).all()
-    
-    total_notes = len(notes)
     
-    # Calculate total study time (sum of video durations)
-    total_study_time = 0
-    durations = []
-    for note in notes:
-        if note.video_duration:
-            total_study_time += note.video_duration
-            durations.append(note.video_duration)
-    
-    # Calculate average duration
-    average_duration = sum(durations) / len(durations) if durations else 0
+    Totals come from the precomputed rollups, so the cost does not grow
+    with the number of notes.
+    """
+    stats = await get_user_stats(session, current_user.id)
+    languages = await get_languages(session, current_user.id)
     
-    # Get unique languages
-    languages = list(set(note.language for note in notes if note.language))
+    average_duration = (
+        stats.total_study_seconds / stats.timed_notes if stats.timed_notes else 0
+    )
     
     # Get recent activity (last 5 notes)
     recent_statement = (
-        select(Note)
+        select(Note.video_title, Note.video_url, Note.created_at, Note.video_duration)
         .where(Note.user_id == current_user.id)
-        .order_by(Note.created_at.desc())
+        .order_by(Note.created_at.desc(), Note.id.desc())
         .limit(5)
     )
-    recent_notes = session.exec(recent_statement).all()
+    result = await session.exec(recent_statement)
     
     recent_activity = [
         {
@@ -123,17 +129,46 @@ async def get_analytics(
             "duration": note.video_duration,
             "duration_formatted": format_duration(note.video_duration) if note.video_duration else "N/A"
         }
-        for note in recent_notes
+        for note in result.all()
     ]
     
     logger.info(f"Analytics retrieved for user {current_user.email}")
     
     return AnalyticsResponse(
-        total_videos_processed=total_notes,
-        total_study_time_seconds=total_study_time,
-        total_study_time_formatted=format_duration(total_study_time),
-        total_notes=total_notes,
+        total_videos_processed=stats.total_notes,
+        total_study_time_seconds=stats.total_study_seconds,
+        total_study_time_formatted=format_duration(stats.total_study_seconds),
+        total_notes=stats.total_notes,
         average_video_duration=round(average_duration, 2),
         languages_used=languages,
         recent_activity=recent_activity
     )
+
+
+@router.get("/study-time", response_model=List[StudyTimePoint])
+async def get_study_time(
+    period: str = Query("day", pattern="^(day|week)$"),
+    days: int = Query(30, ge=1, le=366, description="How many days back to include"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Study time series per day or week (weeks start on Monday), oldest
+    first, with empty periods included as zeros.
+    """
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    return await study_time_series(session, current_user.id, start, end, period)
+
+
+@router.get("/categories", response_model=List[CategoryStudyTime])
+async def get_category_study_time(
+    days: Optional[int] = Query(None, ge=1, le=3660, description="Only the last N days (default: all time)"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Notes and study time per category, most studied first.
+    """
+    start = datetime.utcnow().date() - timedelta(days=days - 1) if days else None
+    return await category_totals(session, current_user.id, start)
@@ -7,12 +7,19 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy import case, or_
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.database import get_session
 from src.db.models import User
-from src.auth.security import hash_password, verify_password, create_access_token
+from src.auth.security import (
+    create_access_token,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from src.auth.dependencies import get_current_user, invalidate_user
 from src.utils.logger import setup_logger
 from src.utils.config import settings
 
@@ -64,6 +71,14 @@ class UserResponse(BaseModel):
         }
 
 
+class ProfileUpdate(BaseModel):
+    """Request model for profile changes (omitted fields are left as they are)."""
+
+    email: Optional[EmailStr] = Field(None, description="New email address")
+    age: Optional[int] = Field(None, ge=0, le=120, description="User age")
+    gender: Optional[str] = Field(None, max_length=20, description="User gender")
+
+
 class TokenResponse(BaseModel):
     """Response model for login token."""
 
@@ -81,6 +96,18 @@ class TokenResponse(BaseModel):
         }
 
 
+def user_response(user: User) -> UserResponse:
+    return UserResponse(
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        role=user.role,
+        age=user.age,
+        gender=user.gender,
+        created_at=str(user.created_at),
+    )
+
+
 @router.post(
     "/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
@@ -104,7 +131,7 @@ async def signup(
         )
 
     # Create new user with hashed password
-    hashed_password_value = hash_password(signup_data.password)
+    hashed_password_value = await hash_password_async(signup_data.password)
 
     new_user = User(
         email=signup_data.email,
@@ -118,18 +145,12 @@ async def signup(
     session.add(new_user)
     await session.commit()
     await session.refresh(new_user)
+    # A previous user of the same name may still be cached
+    invalidate_user(new_user.username)
 
     logger.info(f"New user registered: {new_user.email}")
 
-    return UserResponse(
-        id=new_user.id,
-        email=new_user.email,
-        username=new_user.username,
-        role=new_user.role,
-        age=new_user.age,
-        gender=new_user.gender,
-        created_at=str(new_user.created_at),
-    )
+    return user_response(new_user)
 
 
 @router.post("/login", response_model=TokenResponse)
@@ -140,29 +161,39 @@ async def login(
     """
     Authenticate user and return JWT access token.
     """
-    # Find user by username
-    statement = select(User).where(User.username == form_data.username)
+    # Find user by username or email in one query (a username match wins)
+    login_name = form_data.username
+    statement = (
+        select(User)
+        .where(or_(User.username == login_name, User.email == login_name))
+        .order_by(case((User.username == login_name, 0), else_=1))
+        .limit(1)
+    )
     result = await session.exec(statement)
     user = result.first()
 
-    # If not found by username, try finding by email
-    if not user:
-        statement = select(User).where(User.email == form_data.username)
-        result = await session.exec(statement)
-        user = result.first()
-
     # Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Upgrade hashes made with an older cost factor while the password is known
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(form_data.password)
+        session.add(user)
+        await session.commit()
+        logger.info(f"Password hash upgraded for user: {user.username}")
+
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    # The user ID and role travel in the token so requests can be
+    # authenticated from the user cache without a lookup by name
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id, "role": user.role},
+        expires_delta=access_token_expires,
     )
 
     logger.info(f"User logged in: {user.username}")
@@ -172,3 +203,46 @@ async def login(
         token_type="bearer",
         expires_in=settings.access_token_expire_minutes,
     )
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_profile(current_user: User = Depends(get_current_user)):
+    """
+    Get the current user's profile.
+    """
+    return user_response(current_user)
+
+
+@router.patch("/me", response_model=UserResponse)
+async def update_profile(
+    profile: ProfileUpdate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Update the current user's profile.
+    """
+    changes = profile.model_dump(exclude_unset=True)
+    if changes.get("email") is None:
+        # Email is required; only age and gender can be cleared
+        changes.pop("email", None)
+    elif changes["email"] != current_user.email:
+        result = await session.exec(select(User.id).where(User.email == changes["email"]))
+        if result.first() is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Email already registered"
+            )
+
+    # The cached user is shared across requests, so update a fresh copy
+    user = await session.get(User, current_user.id)
+    for field, value in changes.items():
+        setattr(user, field, value)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    invalidate_user(user.username)
+
+    logger.info(f"Profile updated: {user.username}")
+
+    return user_response(user)
+
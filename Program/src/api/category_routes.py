@@ -1,5 +1,7 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -14,16 +16,32 @@ class CategoryCreate(BaseModel):
     name: str
     description: str = None
 
-@router.get("", response_model=List[Category])
+class CategoryFacet(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+    note_count: int
+    created_at: datetime
+
+@router.get("", response_model=List[CategoryFacet])
 async def list_categories(
+    include_empty: bool = Query(False, description="Also return categories without notes"),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Category facets of the current user, most used first. Counts are
+    maintained on write, so this is one read of the user's category rows;
+    filter notes with ``GET /notes?category_id=``.
+    """
     statement = select(Category).where(Category.user_id == current_user.id)
+    if not include_empty:
+        statement = statement.where(Category.note_count > 0)
+    statement = statement.order_by(Category.note_count.desc(), Category.name)
     result = await session.exec(statement)
     return result.all()
 
-@router.post("", response_model=Category, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=CategoryFacet, status_code=status.HTTP_201_CREATED)
 async def create_category(
     data: CategoryCreate,
     session: AsyncSession = Depends(get_session),
@@ -35,6 +53,9 @@ async def create_category(
         user_id=current_user.id
     )
     session.add(new_cat)
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Category already exists")
     await session.refresh(new_cat)
     return new_cat
@@ -0,0 +1,86 @@
+"""
+Negotiated gzip/brotli compression of API responses.
+
+Only complete single-message bodies (JSON, markdown, HTML, ...) at or
+above ``minimum_size`` bytes are compressed, at a fast level suited to
+per-request work. Streaming responses (SSE progress, files) and bodies
+that already carry a Content-Encoding, such as the pre-compressed note
+files, are passed through untouched.
+"""
+
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.compression import compress, negotiate_encoding
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses with the client's preferred encoding."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 4, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether to compress
+                start = message
+                return
+
+            if message.get("more_body", False):
+                # Streaming response: sent as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                len(body) >= self.minimum_size
+                and start["status"] not in (204, 206, 304)
+                and "content-encoding" not in headers
+                and "no-transform" not in headers.get("cache-control", "")
+                and is_compressible(headers.get("content-type"))
+            ):
+                # The representation depends on Accept-Encoding whether or
+                # not this client gets it compressed
+                headers.add_vary_header("Accept-Encoding")
+                if encoding:
+                    body = compress(body, encoding, self.levels[encoding])
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        # Byte-for-byte different from the identity body
+                        headers["ETag"] = f"W/{etag}"
+                    message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,74 @@
+"""
+Conditional GET helpers: ETag / Last-Modified validators and 304 checks.
+
+Note ETags are derived from note versions (every change bumps
+``Note.version`` and ``updated_at``), so a client revalidating an
+unchanged note gets a ``304 Not Modified`` without the body being
+loaded, rendered or serialized.
+"""
+
+import calendar
+import hashlib
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def version_etag(*parts) -> str:
+    """Strong ETag from the values identifying a response (ids, versions, params)."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """HTTP date for a naive UTC (or aware) datetime."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return formatdate(calendar.timegm(value.timetuple()), usegmt=True)
+
+
+def validators(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """Caching headers for per-user API responses: always revalidate."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Whether the client's copy is current. If-None-Match takes precedence;
+    If-Modified-Since is only used without it (second resolution).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        return modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,160 @@
+"""
+Conditional, range-aware file responses.
+
+``file_response`` serves a file from disk in chunks with a strong ETag
+(a content hash, cached per file version), Last-Modified, ``304 Not
+Modified`` for matching ``If-None-Match``, single byte ranges (``206``),
+and the pre-compressed ``.br``/``.gz`` sidecar matching the client's
+Accept-Encoding (created on first use if missing or stale).
+"""
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from src.api.conditional import etag_matches
+from src.utils.compression import fresh_sidecar, negotiate_encoding, sidecar_path, write_sidecars
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+MAX_CACHED_ETAGS = 10000
+
+# Content hashes by (path, mtime_ns, size, inode): each file version is hashed once
+_etags: "OrderedDict[Tuple, str]" = OrderedDict()
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+async def content_hash(path: Path, stats: os.stat_result) -> str:
+    key = (str(path), stats.st_mtime_ns, stats.st_size, stats.st_ino)
+    value = _etags.get(key)
+    if value is None:
+        value = await asyncio.get_running_loop().run_in_executor(None, _hash_file, path)
+        _etags[key] = value
+        while len(_etags) > MAX_CACHED_ETAGS:
+            _etags.popitem(last=False)
+    else:
+        _etags.move_to_end(key)
+    return value
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single ``bytes=`` range. Returns None to
+    ignore the header (malformed or multiple ranges: the full file is
+    sent); raises ValueError if the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    try:
+        first_value = int(first) if first else None
+        last_value = int(last) if last else None
+    except ValueError:
+        return None
+    if not sep or (first_value is None and last_value is None):
+        return None
+
+    if first_value is None:
+        # Suffix range: the last N bytes
+        if last_value == 0:
+            raise ValueError("Empty suffix range")
+        start, end = max(size - last_value, 0), size - 1
+    else:
+        start = first_value
+        end = last_value if last_value is not None else size - 1
+        if last_value is not None and last_value < start:
+            return None
+    if start >= size:
+        raise ValueError("Range starts past the end")
+    return start, min(end, size - 1)
+
+
+async def _read_range(path: Path, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+async def _sidecar(path: Path, encoding: str, stats: os.stat_result) -> Optional[os.stat_result]:
+    sidecar = fresh_sidecar(path, encoding, stats)
+    if sidecar is None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, write_sidecars, path)
+        except OSError as e:
+            logger.warning(f"Could not write compressed copies of {path}: {e}")
+            return None
+        sidecar = fresh_sidecar(path, encoding, stats)
+    return sidecar
+
+
+async def file_response(request: Request, path: Path, media_type: str) -> Response:
+    stats = path.stat()
+    digest = await content_hash(path, stats)
+    range_header = request.headers.get("range")
+
+    # Ranges are served from the uncompressed file only
+    encoding = None if range_header else negotiate_encoding(request.headers.get("accept-encoding"))
+    sidecar = await _sidecar(path, encoding, stats) if encoding else None
+    if sidecar is None:
+        encoding = None
+
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers: Dict[str, str] = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stats.st_mtime, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "Accept-Ranges": "bytes",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return FileResponse(
+            sidecar_path(path, encoding), headers=headers, media_type=media_type, stat_result=sidecar
+        )
+
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, stats.st_size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{stats.st_size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{stats.st_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _read_range(path, start, end - start + 1),
+                status_code=206,
+                headers=headers,
+                media_type=media_type,
+            )
+
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=stats)
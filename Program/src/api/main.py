@@ -1,4 +1,6 @@
+import json
 import uuid
+import asyncio
 from datetime import datetime
 from typing import Dict
 from enum import Enum
@@ -6,17 +8,37 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl
 
 from src.ai_modules.transcription.audio_downloader import YouTubeDownloader
 from src.ai_modules.transcription.whisper_transcriber import WhisperTranscriber
+from src.ai_modules.transcription.transcript_store import transcript_store
 from src.ai_modules.summarization.note_generator import NoteGenerator
+from src.ai_modules.summarization.renderer import dump_notes
+from src.ai_modules.categorization.categorizer import PENDING_CATEGORY
+from src.ai_modules.categorization.enrichment import enrichment_queue
+from src.ai_modules.recommendation.similarity_index import similarity_index
+from src.ai_modules.recommendation.feed import recommendation_feed
+from src.ai_modules.recommendation.keyword_index import index_notes
+from src.utils.resilience import CircuitOpenError, LLMCallError
 from src.utils.logger import setup_logger
+from src.utils.config import settings
 from src.db.database import create_db_and_tables, async_engine
+from src.db.metrics import record_query_metrics
 from src.db.models import Note, User
+from src.db.search import index_search_document
+from src.db.categories import category_id
 from src.auth.dependencies import get_current_user
 from src.api.auth_routes import router as auth_router
 from src.api.notes_routes import router as notes_router
+from src.api.recommendation_routes import router as recommendation_router
+from src.api.search_routes import router as search_router
+from src.api.analytics_routes import router as analytics_router
+from src.api.category_routes import router as category_router
+from src.api.metrics_routes import router as metrics_router
+from src.api.compression import CompressionMiddleware
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 logger = setup_logger(__name__)
@@ -28,6 +50,7 @@ class TaskStatus(str, Enum):
     DOWNLOADING = "downloading"
     TRANSCRIBING = "transcribing"
     GENERATING_NOTES = "generating_notes"
+    QUEUED = "queued"
     COMPLETED = "completed"
     FAILED = "failed"
 
@@ -51,22 +74,48 @@ tasks: Dict[str, Dict] = {}
 async def lifespan(app: FastAPI):
     logger.info("Lifespan: Initializing database tables...")
     await create_db_and_tables()
+    await enrichment_queue.start()
+    await recommendation_feed.start()
     yield
+    await recommendation_feed.stop()
+    await enrichment_queue.stop()
 
 
-app = FastAPI(title="YouTube Study Notes AI", lifespan=lifespan)
+# orjson serializes responses several times faster than the stdlib encoder
+app = FastAPI(
+    title="YouTube Study Notes AI",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.response_compression_min_bytes,
+    gzip_level=settings.response_gzip_level,
+    brotli_quality=settings.response_brotli_quality,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
+
+# Per-route query counts and latency (GET /metrics/database)
+app.middleware("http")(record_query_metrics)
+
+
 # --- Routes ---
 app.include_router(auth_router)
 app.include_router(notes_router)
+app.include_router(recommendation_router)
+app.include_router(search_router)
+app.include_router(analytics_router)
+app.include_router(category_router)
+app.include_router(metrics_router)
 
 
 @app.post("/generate", response_model=TaskResponse)
@@ -117,31 +166,76 @@ async def process_video_and_save(
 
         tasks[task_id]["status"] = TaskStatus.GENERATING_NOTES
         note_gen = NoteGenerator()
-        json_notes = note_gen.generate_notes_json(
-            transcript_data["text"], video_info["title"]
-        )
-        final_notes = note_gen.format_final_notes(
-            note_gen.format_notes_to_markdown(json_notes),
-            video_info["title"],
-            youtube_url,
-            video_info["duration"],
-        )
+
+        def publish_partial(partial_notes: Dict):
+            tasks[task_id]["partial_notes"] = partial_notes
+
+        # Run in thread pool so /status polls are served while Gemini streams
+        loop = asyncio.get_event_loop()
+        queue_deadline = None
+        while True:
+            try:
+                json_notes = await loop.run_in_executor(
+                    None,
+                    lambda: note_gen.generate_notes_json_stream(
+                        transcript_data["text"], video_info["title"], publish_partial
+                    ),
+                )
+                break
+            except CircuitOpenError as e:
+                # Gemini is down: park the task until the breaker lets a trial
+                # through, for at most llm_queue_max_wait_seconds in total
+                if queue_deadline is None:
+                    queue_deadline = loop.time() + settings.llm_queue_max_wait_seconds
+                if loop.time() + e.retry_after > queue_deadline:
+                    raise LLMCallError(
+                        "Note generation service unavailable for "
+                        f"{settings.llm_queue_max_wait_seconds:.0f}s, giving up"
+                    ) from e
+                tasks[task_id]["status"] = TaskStatus.QUEUED
+                tasks[task_id]["message"] = "Note generation service unavailable, queued for retry"
+                await asyncio.sleep(max(e.retry_after, 1.0))
+                tasks[task_id]["status"] = TaskStatus.GENERATING_NOTES
+        tasks[task_id]["partial_notes"] = json_notes
+
+        # Store the structured notes; markdown/HTML/text are rendered on read
+        json_notes["duration"] = video_info["duration"]
 
         async with AsyncSession(async_engine) as session:
             new_note = Note(
                 user_id=user_id,
                 video_url=youtube_url,
                 video_title=video_info["title"],
-                summary_content=final_notes,
+                content_json=dump_notes(json_notes),
+                category=PENDING_CATEGORY,
+                category_id=await category_id(session, user_id, PENDING_CATEGORY),
+                video_duration=int(video_info["duration"] or 0) or None,
+                language=language,
             )
             session.add(new_note)
+            await session.flush()
+            # Keywords and search text are indexed in the same transaction as the note
+            await index_notes(session, [new_note])
+            await index_search_document(session, new_note, transcript_data["text"])
             await session.commit()
             await session.refresh(new_note)
+            enrichment_queue.enqueue(new_note.id)
+            similarity_index.add_note(new_note)
+            recommendation_feed.schedule_refresh(user_id)
+
+        # Keep the timestamped segments for GET /search/moments
+        try:
+            await loop.run_in_executor(
+                None, transcript_store.add, user_id, new_note.id, transcript_data["segments"]
+            )
+        except Exception as e:
+            logger.error(f"Could not store transcript segments for note {new_note.id}: {e}")
 
         tasks[task_id]["status"] = TaskStatus.COMPLETED
     except Exception as e:
         logger.error(f"Task failed: {e}")
         tasks[task_id]["status"] = TaskStatus.FAILED
+        tasks[task_id]["message"] = str(e)
     finally:
         if audio_file and audio_file.exists():
             downloader.cleanup(audio_file)
@@ -152,3 +246,31 @@ async def get_task_status(task_id: str):
     if task_id not in tasks:
         raise HTTPException(status_code=404, detail="Task not found")
     return tasks[task_id]
+
+
+@app.get("/status/{task_id}/events")
+async def stream_task_status(task_id: str):
+    """
+    Server-sent events for a task: pushes the status and partial notes
+    whenever they change, and closes once the task is finished.
+    """
+    if task_id not in tasks:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def event_stream():
+        last_payload = None
+        while True:
+            task = tasks.get(task_id)
+            if task is None:
+                break
+            payload = json.dumps(jsonable_encoder(task))
+            if payload != last_payload:
+                last_payload = payload
+                yield f"data: {payload}\n\n"
+            if task["status"] in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
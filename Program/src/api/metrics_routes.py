@@ -0,0 +1,19 @@
+from typing import Dict
+from fastapi import APIRouter, Depends
+
+from src.db.database import async_engine
+from src.db.metrics import db_metrics
+from src.db.models import User
+from src.auth.dependencies import get_current_admin_user
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/database")
+async def database_metrics(current_user: User = Depends(get_current_admin_user)) -> Dict:
+    """
+    Pool occupancy, checkout wait times and query latency per route.
+
+    Admins only: the report lists every route and its traffic.
+    """
+    return db_metrics.snapshot(async_engine.pool)
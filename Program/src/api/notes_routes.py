@@ -3,24 +3,37 @@ Notes management API endpoints.
 """
 
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional, Tuple
 from pathlib import Path
 import os
+import asyncio
+import json
+import base64
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel, HttpUrl, Field
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 
 from src.db.database import get_session
 from src.db.models import User, Note
+from src.db.search import index_search_document, search_notes
+from src.db.categories import category_id
+from src.api.file_responses import file_response
+from src.api.conditional import is_not_modified, not_modified, validators, version_etag
 from src.auth.dependencies import get_current_user
-from src.ai_modules.categorization.categorizer import CategorizationService
+from src.ai_modules.categorization.categorizer import PENDING_CATEGORY
+from src.ai_modules.categorization.enrichment import enrichment_queue
+from src.ai_modules.recommendation.similarity_index import similarity_index
+from src.ai_modules.recommendation.feed import recommendation_feed
+from src.ai_modules.summarization.renderer import render_note
+from src.ai_modules.summarization.output_index import output_index
 from src.utils.logger import setup_logger
 from src.utils.config import settings
 
 logger = setup_logger(__name__)
-categorizer = CategorizationService()
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
@@ -38,7 +51,12 @@ class CreateNoteRequest(BaseModel):
     video_url: HttpUrl = Field(..., description="YouTube video URL")
     video_title: str = Field(..., max_length=500, description="Video title")
     summary_text: str = Field(..., description="Generated study notes in markdown")
-    video_duration: Optional[int] = Field(None, description="Video duration in seconds")
+    video_duration: Optional[int] = Field(
+        None,
+        ge=0,
+        le=settings.max_video_duration,
+        description="Video duration in seconds (feeds study time analytics)",
+    )
     language: str = Field(
         default="en", max_length=10, description="Video language code"
     )
@@ -56,67 +74,99 @@ class NoteResponse(BaseModel):
     created_at: str
 
 
+class NoteListItem(BaseModel):
+    """Lightweight note for lists; fields not requested are omitted."""
+    id: Optional[int] = None
+    video_url: Optional[str] = None
+    video_title: Optional[str] = None
+    category: Optional[str] = None
+    version: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    summary_text: Optional[str] = None
+
+
+LIST_FIELDS = ["id", "video_url", "video_title", "category", "version", "created_at", "updated_at"]
+
+
+class NoteSearchHit(BaseModel):
+    id: int
+    video_url: str
+    video_title: str
+    category: Optional[str]
+    created_at: str
+    score: float
+    snippet: str
+
+
+class NoteSearchResults(BaseModel):
+    results: List[NoteSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class NoteChange(BaseModel):
+    id: int
+    category: Optional[str]
+    version: int
+    updated_at: datetime
+
+
 # ==========================================
 # ✅ NEW ENDPOINTS: Read from 'outputs' folder
 # ==========================================
 
 
 @router.get("/generated", response_model=List[GeneratedNoteFile])
-async def list_generated_notes():
-    """
-    List all markdown files found in the 'outputs' directory.
-    This bypasses the database to show files directly.
-    """
-    notes = []
-    output_dir = settings.output_dir
-
-    # Create directory if it doesn't exist
-    if not output_dir.exists():
-        return []
-
-    # Scan for .md files
-    # We look for files ending with _notes.md
-    for file_path in output_dir.glob("*_notes.md"):
-        try:
-            # Try to read the first line to get a clean title
-            content = file_path.read_text(encoding="utf-8")
-            lines = content.split("\n")
-            # Usually the first line is "# Title"
-            title = lines[0].replace("#", "").strip() if lines else file_path.name
-
-            stats = file_path.stat()
-
-            notes.append(
-                GeneratedNoteFile(
-                    filename=file_path.name,
-                    title=title if title else file_path.name,
-                    created_at=stats.st_mtime,
-                    size=stats.st_size,
-                )
-            )
-        except Exception as e:
-            logger.error(f"Error reading file {file_path}: {e}")
-            continue
+async def list_generated_notes(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    sort: Literal["created_at", "title", "size", "filename"] = Query("created_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+):
+    """
+    List the markdown files in the 'outputs' directory, newest first by
+    default. This bypasses the database to show files directly.
 
-    # Sort by newest first
-    notes.sort(key=lambda x: x.created_at, reverse=True)
-    return notes
+    Served from the outputs manifest (only directories that changed are
+    re-scanned); the total number of files is in the ``X-Total-Count``
+    header.
+    """
+    loop = asyncio.get_running_loop()
+    files, total = await loop.run_in_executor(
+        None, output_index.list_files, limit, offset, sort, order == "desc"
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return [GeneratedNoteFile(**f) for f in files]
 
 
 @router.get("/generated/{filename}")
-async def get_generated_note_content(filename: str):
+async def get_generated_note_content(
+    filename: str,
+    request: Request,
+    format: Literal["file", "json"] = Query(
+        "file", description="file: the markdown file itself; json: the legacy {content, filename} object"
+    ),
+):
     """
     Get the full content of a specific markdown file.
+
+    Streamed from disk with a strong ETag (answer ``If-None-Match`` with
+    304), byte ranges, and the pre-compressed gzip/brotli copy matching
+    Accept-Encoding.
     """
     # Security check: prevent directory traversal
     if ".." in filename or "/" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    file_path = settings.output_dir / filename
+    file_path = output_index.path_for(filename)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="Note file not found")
 
+    if format == "file":
+        return await file_response(request, file_path, "text/markdown; charset=utf-8")
+
     content = file_path.read_text(encoding="utf-8")
     return {"content": content, "filename": filename}
 
@@ -130,15 +180,99 @@ async def get_generated_note_content(filename: str):
 # For brevity, I'll include the standard DB create/get just to not break anything.
 
 
+@router.get("/changes", response_model=List[NoteChange])
+async def list_note_changes(
+    since: datetime = Query(..., description="Return notes changed after this time (UTC)"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Change feed: notes of the current user modified after ``since``
+    (e.g. once background categorization finished). Poll with the latest
+    ``updated_at`` seen.
+    """
+    statement = (
+        select(Note)
+        .where(Note.user_id == current_user.id, Note.updated_at > since)
+        .order_by(Note.updated_at)
+    )
+    result = await session.exec(statement)
+    return [
+        NoteChange(id=n.id, category=n.category, version=n.version, updated_at=n.updated_at)
+        for n in result.all()
+    ]
+
+
+@router.get("/search", response_model=NoteSearchResults)
+async def search_user_notes(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Full-text search over the current user's notes (title, notes and
+    transcript), best matches first. Pass ``next_cursor`` back as ``cursor``
+    for the next page.
+    """
+    try:
+        hits, next_cursor = await search_notes(session, current_user.id, q, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return NoteSearchResults(
+        results=[
+            NoteSearchHit(
+                id=hit["note_id"],
+                video_url=hit["video_url"],
+                video_title=hit["video_title"],
+                category=hit["category"],
+                created_at=str(hit["created_at"]),
+                score=hit["score"],
+                snippet=hit["snippet"] or "",
+            )
+            for hit in hits
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+async def note_validators(
+    session: AsyncSession, user_id: int, note_id: int, *variant
+) -> Tuple[str, dict, datetime]:
+    """
+    ETag and caching headers of a note from its version alone (two small
+    columns by primary key), so revalidation never loads the note body.
+    """
+    statement = select(Note.version, Note.updated_at).where(
+        Note.id == note_id, Note.user_id == user_id
+    )
+    row = (await session.exec(statement)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    etag = version_etag("note", note_id, row.version, row.updated_at, *variant)
+    return etag, validators(etag, row.updated_at), row.updated_at
+
+
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get a specific note by ID.
+
+    The ETag follows the note version: send it back as ``If-None-Match``
+    to get a 304 while the note is unchanged.
     """
+    etag, headers, updated_at = await note_validators(session, current_user.id, note_id)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(headers)
+
     statement = select(Note).where(Note.id == note_id, Note.user_id == current_user.id)
     result = await session.exec(statement)
     note = result.first()
@@ -146,49 +280,142 @@ async def get_note(
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
 
+    response.headers.update(headers)
     return NoteResponse(
         id=note.id,
         video_url=note.video_url,
         video_title=note.video_title,
-        summary_text=note.summary_content,
-        video_duration=None,
-        language="en",
+        summary_text=render_note(note),
+        video_duration=note.video_duration,
+        language=note.language,
         user_id=note.user_id,
         category=note.category,
         created_at=str(note.created_at),
     )
 
 
-@router.get("", response_model=List[NoteResponse])
-async def list_user_notes(
+RENDER_MEDIA_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+}
+
+
+@router.get("/{note_id}/render")
+async def render_user_note(
+    note_id: int,
+    request: Request,
+    format: str = Query("markdown", pattern="^(markdown|html|text)$"),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
-    List all notes belonging to the current user.
+    Render a note as markdown, HTML or plain text (conditional on the
+    note version, like GET /notes/{note_id}).
     """
-    statement = (
-        select(Note)
-        .where(Note.user_id == current_user.id)
-        .order_by(Note.created_at.desc())
-    )
+    etag, headers, updated_at = await note_validators(session, current_user.id, note_id, format)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(headers)
+
+    statement = select(Note).where(Note.id == note_id, Note.user_id == current_user.id)
     result = await session.exec(statement)
-    notes = result.all()
+    note = result.first()
 
-    return [
-        NoteResponse(
-            id=n.id,
-            video_url=n.video_url,
-            video_title=n.video_title,
-            summary_text=n.summary_content,
-            video_duration=None,  # Update if stored
-            language="en",  # Default
-            user_id=n.user_id,
-            category=n.category,
-            created_at=str(n.created_at),
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    return Response(
+        content=render_note(note, format), media_type=RENDER_MEDIA_TYPES[format], headers=headers
+    )
+
+
+def encode_list_cursor(created_at: datetime, note_id: int) -> str:
+    return base64.urlsafe_b64encode(
+        json.dumps([created_at.isoformat(), note_id]).encode()
+    ).decode()
+
+
+def decode_list_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, note_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(note_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("", response_model=List[NoteListItem], response_model_exclude_unset=True)
+async def list_user_notes(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    category_id: Optional[int] = Query(None, description="Only notes in this category (see GET /categories)"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return (default: all list fields; "
+        "add summary_text to include the rendered note)",
+    ),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    List the current user's notes, newest first, without the note body.
+
+    Paged by (created_at, id): when more notes exist, the ``X-Next-Cursor``
+    response header holds the cursor for the next page. Both the full list
+    and a ``category_id`` filter are served from an index in page order.
+
+    The ETag covers the query and the (id, version) of every note on the
+    page; a matching ``If-None-Match`` gets a 304 before anything is
+    rendered or serialized.
+    """
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else LIST_FIELDS
+    unknown = set(requested) - set(LIST_FIELDS) - {"summary_text"}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    if "summary_text" in requested:
+        # Rendering needs the whole row
+        statement = select(Note)
+    else:
+        # Only the requested columns (plus the keyset and ETag columns) are read
+        columns = {"id", "created_at", "version", *requested}
+        statement = select(*(getattr(Note, c) for c in LIST_FIELDS if c in columns))
+
+    statement = statement.where(Note.user_id == current_user.id)
+    if category_id is not None:
+        statement = statement.where(Note.category_id == category_id)
+    if cursor:
+        statement = statement.where(
+            tuple_(Note.created_at, Note.id) < tuple_(*decode_list_cursor(cursor))
         )
-        for n in notes
-    ]
+    statement = statement.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit + 1)
+    result = await session.exec(statement)
+    rows = result.all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_list_cursor(rows[-1].created_at, rows[-1].id)
+
+    etag = version_etag(
+        "notes", current_user.id, limit, cursor, category_id, tuple(requested),
+        [(row.id, row.version) for row in rows],
+    )
+    headers.update(validators(etag))
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+
+    items = []
+    for row in rows:
+        values = {field: getattr(row, field) for field in requested if field != "summary_text"}
+        if "summary_text" in requested:
+            values["summary_text"] = render_note(row)
+        if "created_at" in values:
+            values["created_at"] = str(values["created_at"])
+        items.append(NoteListItem(**values))
+    return items
 
 
 @router.post("", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
@@ -197,26 +424,33 @@ async def create_note(
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    # Automatically categorize the note
-    category = await categorizer.categorize_text(note_data.summary_text)
-
+    # Categorized in the background; clients see the final category via
+    # GET /notes or GET /notes/changes
     new_note = Note(
         video_url=str(note_data.video_url),
         video_title=note_data.video_title,
         summary_content=note_data.summary_text,
+        video_duration=note_data.video_duration,
+        language=note_data.language,
         user_id=current_user.id,
-        category=category,
+        category=PENDING_CATEGORY,
+        category_id=await category_id(session, current_user.id, PENDING_CATEGORY),
     )
     session.add(new_note)
+    await session.flush()
+    await index_search_document(session, new_note)
     await session.commit()
     await session.refresh(new_note)
+    enrichment_queue.enqueue(new_note.id)
+    similarity_index.add_note(new_note)
+    recommendation_feed.schedule_refresh(current_user.id)
     return NoteResponse(
         id=new_note.id,
         video_url=new_note.video_url,
         video_title=new_note.video_title,
         summary_text=new_note.summary_content,
-        video_duration=None,
-        language="en",
+        video_duration=new_note.video_duration,
+        language=new_note.language,
         user_id=new_note.user_id,
         category=new_note.category,
         created_at=str(new_note.created_at),
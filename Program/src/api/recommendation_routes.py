@@ -1,25 +1,121 @@
 from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.database import get_session
-from src.db.models import User
+from src.db.models import Note, User
 from src.auth.dependencies import get_current_user
-from src.ai_modules.recommendation.recommender import RecommendationService
+from src.ai_modules.recommendation.feed import recommendation_feed
+from src.ai_modules.recommendation.keyword_index import related_notes, suggest_topics
+from src.ai_modules.recommendation.collaborative import also_studied, video_key
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
-recommender = RecommendationService()
+recommender = recommendation_feed.recommender
 
 
 @router.get("", response_model=List[Dict])
 async def get_general_recommendations(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get general recommendations for the user based on their note history.
+    Served from the user's precomputed feed, refreshed in the background.
     """
-    return await recommender.get_recommendations_for_user(session, current_user.id)
+    return await recommendation_feed.get_page(session, current_user.id, offset, limit)
+
+
+@router.get("/metrics", response_model=Dict)
+async def get_recommendation_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    YouTube search cache metrics: hit rates and quota units saved.
+    """
+    return recommender.cache_metrics()
+
+
+@router.get("/topics", response_model=List[Dict])
+async def get_topic_suggestions(
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Topics the user studies most, from the keywords of their notes.
+    """
+    topics = await suggest_topics(session, current_user.id, limit)
+    return [{"keyword": keyword, "notes": count} for keyword, count in topics]
+
+
+@router.get("/{note_id}/related", response_model=List[Dict])
+async def get_related_notes(
+    note_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The user's notes ranked by keyword overlap with a specific note.
+    """
+    note = await session.get(Note, note_id)
+    if not note or note.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    ranked = await related_notes(session, note_id, limit)
+    titles = {}
+    if ranked:
+        result = await session.exec(
+            select(Note.id, Note.video_title).where(Note.id.in_([i for i, _ in ranked]))
+        )
+        titles = dict(result.all())
+    return [
+        {"id": i, "title": titles[i], "type": "note", "score": round(score, 4)}
+        for i, score in ranked
+        if i in titles
+    ]
+
+
+@router.get("/{note_id}/also-studied", response_model=List[Dict])
+async def get_also_studied(
+    note_id: int,
+    limit: int = Query(10, ge=1, le=20),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Students who studied this video also studied: videos from other users'
+    notes, precomputed by build_video_neighbors.py. Videos the user already
+    has notes for are left out.
+    """
+    note = await session.get(Note, note_id)
+    if not note or note.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    key = video_key(note.video_url)
+    neighbors = await also_studied(session, key, limit) if key else []
+    if not neighbors:
+        return []
+
+    # Titles and URLs come from the neighbor rows; the user's own videos are
+    # read from the (user_id, ...) index, without matching URL substrings
+    result = await session.exec(select(Note.video_url).where(Note.user_id == current_user.id))
+    studied = {video_key(url) for url in result.all()}
+    return [
+        {
+            "id": n.neighbor_key,
+            "title": n.neighbor_title,
+            "url": n.neighbor_url,
+            "type": "youtube_video",
+            "score": round(n.score, 4),
+            "students": n.support,
+        }
+        for n in neighbors
+        if n.neighbor_key not in studied
+    ]
 
 
 @router.get("/{note_id}", response_model=List[Dict])
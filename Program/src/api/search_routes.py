@@ -0,0 +1,90 @@
+"""
+Search API endpoints across a user's videos.
+"""
+
+import re
+import html
+import asyncio
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.database import get_session
+from src.db.models import User, Note
+from src.auth.dependencies import get_current_user
+from src.ai_modules.summarization.renderer import format_timestamp
+from src.ai_modules.transcription.transcript_store import transcript_store, words
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+class MomentHit(BaseModel):
+    """A transcript segment matching the query."""
+    note_id: int
+    video_title: str
+    video_url: str
+    start: float = Field(..., description="Segment start in seconds")
+    end: float = Field(..., description="Segment end in seconds")
+    timestamp: str = Field(..., description="Segment start as MM:SS")
+    url: str = Field(..., description="Video URL that starts playback at the segment")
+    snippet: str
+    score: float
+
+
+def highlight(text: str, query: str) -> str:
+    """HTML-escape ``text`` and wrap the query words found in it in <b> tags."""
+    query_words = set(words(query))
+    return "".join(
+        f"<b>{html.escape(part)}</b>" if part.lower() in query_words else html.escape(part)
+        for part in re.split(r"(\w+)", text)
+    )
+
+
+def timestamped_url(video_url: str, seconds: float) -> str:
+    separator = "&" if "?" in video_url else "?"
+    return f"{video_url}{separator}t={int(seconds)}s"
+
+
+@router.get("/moments", response_model=List[MomentHit])
+async def search_moments(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Find the moments in the user's videos where the query is discussed:
+    matching transcript segments with their timestamps, best first.
+    """
+    loop = asyncio.get_event_loop()
+    hits = await loop.run_in_executor(
+        None, transcript_store.search, current_user.id, q, limit
+    )
+    if not hits:
+        return []
+
+    result = await session.exec(
+        select(Note.id, Note.video_title, Note.video_url).where(
+            Note.id.in_({hit["note_id"] for hit in hits}),
+            Note.user_id == current_user.id,
+        )
+    )
+    videos = {note_id: (title, url) for note_id, title, url in result.all()}
+
+    return [
+        MomentHit(
+            note_id=hit["note_id"],
+            video_title=videos[hit["note_id"]][0],
+            video_url=videos[hit["note_id"]][1],
+            start=hit["start"],
+            end=hit["end"],
+            timestamp=format_timestamp(hit["start"]),
+            url=timestamped_url(videos[hit["note_id"]][1], hit["start"]),
+            snippet=highlight(hit["text"], q),
+            score=round(hit["score"], 4),
+        )
+        for hit in hits
+        if hit["note_id"] in videos
+    ]
@@ -6,19 +6,27 @@ Provides secure password hashing and JWT token management.
 from .security import (
     hash_password,
     verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
     decode_access_token,
 )
 from .dependencies import (
     get_current_user,
     get_current_active_user,
+    invalidate_user,
 )
 
 __all__ = [
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
+    "password_needs_rehash",
     "create_access_token",
     "decode_access_token",
     "get_current_user",
     "get_current_active_user",
+    "invalidate_user",
 ]
@@ -7,27 +7,60 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import select
 
-from src.db.database import get_session
+from src.db.database import async_session_factory
 from src.db.models import User
-from sqlmodel.ext.asyncio.session import AsyncSession
 from src.auth.security import decode_access_token
+from src.utils.cache import AsyncTTLCache
+from src.utils.config import settings
 
 # OAuth2 scheme for extracting bearer tokens from Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Resolved users by token subject (username). Entries are detached User
+# objects shared across requests: read them, don't modify them. Call
+# invalidate_user after changing a user so this worker re-reads it; other
+# worker processes pick the change up within the TTL.
+user_cache = AsyncTTLCache(
+    ttl=settings.auth_user_cache_ttl_seconds,
+    max_entries=settings.auth_user_cache_max_entries,
+)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)
-) -> User:
+
+def invalidate_user(username: str) -> None:
+    """
+    Drop a user from the authenticated-user cache (e.g. after a profile change).
+
+    A lookup already in flight is not cached either, so it cannot put the
+    pre-change profile back.
+    """
+    user_cache.invalidate(username)
+
+
+async def _load_user(username: str, user_id: Optional[int]) -> Optional[User]:
+    """The user currently named ``username`` (cached under that name)."""
+    async with async_session_factory() as session:
+        if user_id is not None:
+            # Primary-key lookup using the uid claim
+            user = await session.get(User, user_id)
+            if user is not None and user.username == username:
+                return user
+        # Tokens issued before the uid claim existed, or stale ones
+        result = await session.exec(select(User).where(User.username == username))
+        return result.first()
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     Get the currently authenticated user from JWT token.
 
     This dependency extracts the JWT token from the Authorization header,
-    validates it, and retrieves the corresponding user from the database.
+    validates it, and resolves the corresponding user. Users are cached
+    in memory for ``auth_user_cache_ttl_seconds``, so the common case does
+    no database round trip; a miss is a primary-key read using the token's
+    ``uid`` claim.
 
     Args:
         token: JWT token from Authorization header
-        session: Database session
 
     Returns:
         User object if authentication is successful
@@ -51,17 +84,18 @@ async def get_current_user(
     if payload is None:
         raise credentials_exception
 
-    # Extract user identity from token (sub is username in auth_routes.py)
+    # Extract user identity from token (sub is username, uid the user ID
+    # in auth_routes.py)
     username: Optional[str] = payload.get("sub")
     if username is None:
         raise credentials_exception
+    user_id: Optional[int] = payload.get("uid")
 
-    # Retrieve user from database
-    statement = select(User).where(User.username == username)
-    result = await session.exec(statement)
-    user = result.first()
+    user = await user_cache.get_or_load(username, lambda: _load_user(username, user_id))
 
-    if user is None:
+    # A token for a different (e.g. deleted and re-registered) user of the
+    # same name is rejected
+    if user is None or (user_id is not None and user.id != user_id):
         raise credentials_exception
 
     return user
@@ -95,3 +129,20 @@ async def get_current_active_user(
     #     raise HTTPException(status_code=400, detail="Inactive user")
 
     return current_user
+
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """
+    Get the current user, who must have the ``admin`` role.
+
+    Raises:
+        HTTPException: 403 Forbidden for any other role
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required",
+        )
+    return current_user
@@ -2,7 +2,9 @@
 Security utilities for password hashing and JWT token management.
 """
 
+import asyncio
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -11,7 +13,15 @@ from passlib.context import CryptContext
 from src.utils.config import settings
 
 # Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+)
+
+# bcrypt releases the GIL, so hashing on these threads keeps the event loop
+# free while the pool size bounds the CPU spent on it
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
 
 
 def hash_password(password: str) -> str:
@@ -46,6 +56,28 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return pwd_context.verify(plain_password, hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with another cost factor than ``bcrypt_rounds``."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except (ValueError, TypeError):
+        return False
+
+
+async def hash_password_async(password: str) -> str:
+    """``hash_password`` on the password executor (for async handlers)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the password executor (for async handlers)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
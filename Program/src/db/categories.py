@@ -0,0 +1,124 @@
+"""
+Normalized note categories.
+
+Category names produced by the categorizer are mapped to per-user rows in
+``categories`` (created on first use) and linked from ``Note.category_id``.
+``Category.note_count`` is maintained by triggers on ``notes``, so facet
+counts are read straight from the user's category rows.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Category
+
+_SQLITE_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_category_count_ai AFTER INSERT ON notes
+    WHEN new.category_id IS NOT NULL BEGIN
+        UPDATE categories SET note_count = note_count + 1 WHERE id = new.category_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_category_count_ad AFTER DELETE ON notes
+    WHEN old.category_id IS NOT NULL BEGIN
+        UPDATE categories SET note_count = note_count - 1 WHERE id = old.category_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_category_count_au AFTER UPDATE OF category_id ON notes
+    WHEN old.category_id IS NOT new.category_id BEGIN
+        UPDATE categories SET note_count = note_count - 1 WHERE id = old.category_id;
+        UPDATE categories SET note_count = note_count + 1 WHERE id = new.category_id;
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION notes_category_count_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.category_id IS NOT DISTINCT FROM NEW.category_id THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.category_id IS NOT NULL THEN
+            UPDATE categories SET note_count = note_count - 1 WHERE id = OLD.category_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.category_id IS NOT NULL THEN
+            UPDATE categories SET note_count = note_count + 1 WHERE id = NEW.category_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS notes_category_count ON notes",
+    """
+    CREATE TRIGGER notes_category_count
+    AFTER INSERT OR DELETE OR UPDATE OF category_id
+    ON notes FOR EACH ROW EXECUTE FUNCTION notes_category_count_trigger()
+    """,
+]
+
+for _statement in _SQLITE_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in _POSTGRES_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+async def category_ids(
+    session: AsyncSession, names: Iterable[Tuple[int, Optional[str]]]
+) -> Dict[Tuple[int, str], int]:
+    """
+    IDs of categories by (user_id, name), creating missing ones.
+
+    Safe under concurrency: inserts use ON CONFLICT DO NOTHING on the
+    (user_id, name) unique index. Runs in the caller's transaction.
+    """
+    wanted = {(user_id, name) for user_id, name in names if name}
+    if not wanted:
+        return {}
+
+    insert = postgres_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+    await session.execute(
+        insert(Category)
+        .values(
+            [
+                {"user_id": user_id, "name": name, "note_count": 0, "created_at": now}
+                for user_id, name in wanted
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "name"])
+    )
+
+    ids: Dict[Tuple[int, str], int] = {}
+    for user_id in {user_id for user_id, _ in wanted}:
+        user_names = [name for uid, name in wanted if uid == user_id]
+        result = await session.exec(
+            select(Category.name, Category.id).where(
+                Category.user_id == user_id, Category.name.in_(user_names)
+            )
+        )
+        ids.update(((user_id, name), category_id) for name, category_id in result.all())
+    return ids
+
+
+async def category_id(session: AsyncSession, user_id: int, name: str) -> Optional[int]:
+    """ID of one of the user's categories, created if missing."""
+    return (await category_ids(session, [(user_id, name)])).get((user_id, name))
+
+
+async def rebuild_category_counts(session: AsyncSession) -> None:
+    """Recompute ``note_count`` of every category from ``notes`` (the caller commits)."""
+    await session.execute(
+        text(
+            "UPDATE categories SET note_count = "
+            "(SELECT count(*) FROM notes WHERE notes.category_id = categories.id)"
+        )
+    )
@@ -2,20 +2,61 @@
 Database connection and session management.
 """
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import uuid
+from typing import Any, AsyncGenerator, Dict
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.utils.config import settings
+from src.utils.config import Settings, settings
+from src.db.metrics import InstrumentedPool, instrument_engine
+# Register the backend-specific full-text index and trigger DDL before
+# create_all runs
+import src.db.categories  # noqa: F401
+import src.db.search  # noqa: F401
+import src.db.stats  # noqa: F401
 
 DATABASE_URL = settings.database_url
 
-async_engine: AsyncEngine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
+
+def engine_options(url: str, config: Settings = settings) -> Dict[str, Any]:
+    """
+    Keyword arguments for ``create_async_engine`` from the DB settings.
+
+    With asyncpg, both SQLAlchemy's prepared statement cache and asyncpg's
+    own cache hold ``db_statement_cache_size`` statements per connection.
+    PgBouncer in transaction mode hands each transaction a different server
+    connection, so ``db_pgbouncer_mode`` turns both caches off and gives
+    prepared statements unique names to avoid collisions.
+    """
+    options: Dict[str, Any] = {
+        "echo": False,
+        "future": True,
+        "poolclass": InstrumentedPool,
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        "pool_recycle": config.db_pool_recycle,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    if url.startswith("postgresql+asyncpg"):
+        cache_size = 0 if config.db_pgbouncer_mode else config.db_statement_cache_size
+        connect_args: Dict[str, Any] = {
+            "statement_cache_size": cache_size,
+            "prepared_statement_cache_size": cache_size,
+        }
+        if config.db_pgbouncer_mode:
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        options["connect_args"] = connect_args
+    return options
+
+
+async_engine: AsyncEngine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(async_engine)
+
+# Shared by every request instead of building a factory per session
+async_session_factory = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
@@ -31,8 +72,5 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     Yields:
         AsyncSession: Database session
     """
-    async_session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
-    async with async_session() as session:
+    async with async_session_factory() as session:
         yield session
@@ -0,0 +1,200 @@
+"""
+Connection pool and query instrumentation.
+
+``InstrumentedPool`` times how long each checkout waits for a connection,
+engine cursor events time every query, and the ``record_query_metrics``
+HTTP middleware wraps each request in ``db_metrics.request`` so query
+counts and latency are attributed to the route that served it (queries outside requests, or
+run by a request's background tasks and streamed bodies after its route
+was credited, count as "background"). ``db_metrics.snapshot`` reports all of it together with
+the pool's current occupancy.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+from src.utils.resilience import LatencyTracker
+
+logger = setup_logger(__name__)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class RequestQueries:
+    """Query latencies of one request (its route is only known once routed)."""
+
+    def __init__(self):
+        self.durations: List[float] = []
+        self.slow: List[Tuple[float, str]] = []
+        # Set once the route is credited; later queries (background tasks,
+        # streaming bodies that inherited the context) count as background
+        self.closed = False
+
+
+class RouteStats:
+    def __init__(self, window: int):
+        self.requests = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.query_latency = LatencyTracker(window)
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0,
+            "query_ms_per_request": _ms(self.query_seconds / self.requests) if self.requests else 0,
+            "query_p50_ms": _ms(self.query_latency.percentile(50)),
+            "query_p95_ms": _ms(self.query_latency.percentile(95)),
+        }
+
+
+# Queries of the request being served; None outside requests (scripts, workers)
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("db_request", default=None)
+
+BACKGROUND = "background"
+
+
+class DatabaseMetrics:
+    """Process-wide pool and query statistics (rolling latency windows)."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait = LatencyTracker(window)
+        self.max_checkout_wait = 0.0
+        self.routes: Dict[str, RouteStats] = {}
+
+    def record_checkout(self, wait: float, timed_out: bool = False) -> None:
+        self.checkouts += 1
+        self.checkout_timeouts += timed_out
+        self.checkout_wait.record(wait)
+        self.max_checkout_wait = max(self.max_checkout_wait, wait)
+
+    def record_query(self, duration: float, statement: str) -> None:
+        slow = duration * 1000 >= settings.db_slow_query_ms
+        current = _current_request.get()
+        if current is not None and not current.closed:
+            current.durations.append(duration)
+            if slow:
+                current.slow.append((duration, statement))
+            return
+
+        self._add(self._route(BACKGROUND), [duration])
+        if slow:
+            logger.warning(f"Slow query ({duration * 1000:.0f} ms) on {BACKGROUND}: {statement[:200]}")
+
+    @contextmanager
+    def request(self) -> Iterator[RequestQueries]:
+        """Collect the queries run inside (including in tasks started there)."""
+        queries = RequestQueries()
+        token = _current_request.set(queries)
+        try:
+            yield queries
+        finally:
+            _current_request.reset(token)
+
+    def finish(self, route: str, queries: RequestQueries) -> None:
+        """Add a finished request's queries to its route."""
+        queries.closed = True
+        stats = self._route(route)
+        stats.requests += 1
+        self._add(stats, queries.durations)
+        for duration, statement in queries.slow:
+            logger.warning(f"Slow query ({duration * 1000:.0f} ms) on {route}: {statement[:200]}")
+
+    @staticmethod
+    def _add(stats: RouteStats, durations: List[float]) -> None:
+        stats.queries += len(durations)
+        stats.query_seconds += sum(durations)
+        for duration in durations:
+            stats.query_latency.record(duration)
+
+    def _route(self, route: str) -> RouteStats:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteStats(self.window)
+        return stats
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict:
+        report = {
+            "checkout": {
+                "count": self.checkouts,
+                "timeouts": self.checkout_timeouts,
+                "wait_p50_ms": _ms(self.checkout_wait.percentile(50)),
+                "wait_p95_ms": _ms(self.checkout_wait.percentile(95)),
+                "wait_max_ms": _ms(self.max_checkout_wait),
+            },
+            "routes": {route: stats.to_dict() for route, stats in sorted(self.routes.items())},
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            report["pool"] = {
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        return report
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            db_metrics.record_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        db_metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every query run through ``engine``."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        db_metrics.record_query(time.perf_counter() - started, statement)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(context):
+        # Failed queries never reach after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+
+# Global metrics, reported by GET /metrics/database
+db_metrics = DatabaseMetrics()
+
+
+async def record_query_metrics(request: Request, call_next) -> Response:
+    """HTTP middleware filing each request's queries under its route."""
+    # The route template (e.g. /notes/{note_id}) is only known once routing
+    # has happened; queries from the request's background tasks and
+    # streamed body run after that and count as background
+    with db_metrics.request() as queries:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    db_metrics.finish(getattr(route, "path", "unmatched"), queries)
+    return response
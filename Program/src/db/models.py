@@ -3,8 +3,9 @@ SQLModel database models for PostgreSQL (Supabase).
 Optimized for cloud deployment and mobile app integration.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -13,7 +14,7 @@ class User(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(unique=True, index=True, max_length=255, nullable=False)
-    username: str = Field(max_length=100, nullable=False)
+    username: str = Field(index=True, max_length=100, nullable=False)
     password_hash: str = Field(max_length=255, nullable=False)
     role: str = Field(default="user", max_length=50, nullable=False)
     age: Optional[int] = Field(default=None)
@@ -24,29 +25,191 @@ class User(SQLModel, table=True):
 
 
 class Category(SQLModel, table=True):
+    """
+    A user's category. Notes link to it through ``Note.category_id``;
+    ``note_count`` is maintained by database triggers on ``notes`` (see
+    ``src.db.categories``).
+    """
+
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_name", "user_id", "name", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, max_length=100, nullable=False)
     description: Optional[str] = Field(default=None, max_length=500)
     user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
+    note_count: int = Field(default=0, nullable=False)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
 
 
 class Note(SQLModel, table=True):
     """
     Note model synchronized with Supabase schema.
-    Removed content_json and keywords to prevent UndefinedColumnError.
+
+    Notes produced by the pipeline keep the validated StudyNoteSchema as compact
+    JSON in ``content_json`` and are rendered on demand (see
+    ``summarization.renderer``); ``summary_content`` then stays empty. Notes
+    posted by clients only have markdown in ``summary_content``.
+    ``version`` is bumped and ``updated_at`` refreshed on every change to the
+    row (including background categorization); the version keys the render
+    cache and ``updated_at`` drives the notes change feed.
+    Keywords from the structured notes are indexed in ``note_keywords``.
+    ``category`` keeps the category name for display; ``category_id`` links
+    the same category in ``categories`` and is set on every write.
+    Run reset_db.py after pulling schema changes.
     """
 
     __tablename__ = "notes"
+    # Serves GET /notes keyset pages: newest first per user
+    __table_args__ = (
+        Index("ix_notes_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_notes_user_category_created_id", "user_id", "category_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
     video_url: str = Field(index=True, max_length=500, nullable=False)
     video_title: str = Field(max_length=500, nullable=False)
-    summary_content: str = Field(nullable=False)
+    summary_content: str = Field(default="", nullable=False)
+    content_json: Optional[str] = Field(default=None)
+    version: int = Field(default=1, nullable=False)
     category: Optional[str] = Field(default="Uncategorized", max_length=100)
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
+    video_duration: Optional[int] = Field(default=None)
+    language: str = Field(default="en", max_length=10, nullable=False)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow, index=True, nullable=False
+    )
 
     owner: Optional[User] = Relationship(back_populates="notes")
+
+
+class UserStats(SQLModel, table=True):
+    """
+    Per-user note totals, maintained by database triggers on ``notes``
+    (see ``src.db.stats``).
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    total_notes: int = Field(default=0, nullable=False)
+    # Notes with a known video duration (denominator of the average)
+    timed_notes: int = Field(default=0, nullable=False)
+    total_study_seconds: int = Field(default=0, nullable=False)
+
+
+class UserLanguageStats(SQLModel, table=True):
+    """Notes per user and video language, maintained by triggers."""
+
+    __tablename__ = "user_language_stats"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    language: str = Field(primary_key=True, max_length=10)
+    notes: int = Field(default=0, nullable=False)
+
+
+class DailyStudyRollup(SQLModel, table=True):
+    """
+    Notes and study time per user, day (UTC) and category, maintained by
+    triggers. The primary key serves date-range scans for a user.
+    """
+
+    __tablename__ = "daily_study_rollups"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    category: str = Field(primary_key=True, max_length=100)
+    notes: int = Field(default=0, nullable=False)
+    study_seconds: int = Field(default=0, nullable=False)
+
+
+class NoteKeyword(SQLModel, table=True):
+    """
+    Inverted keyword index: one row per (note, normalized keyword).
+
+    The primary key serves per-note lookups; the (user_id, keyword, note_id)
+    index serves postings lists and per-user document frequencies without
+    touching the notes table.
+    """
+
+    __tablename__ = "note_keywords"
+    __table_args__ = (
+        Index("ix_note_keywords_user_keyword", "user_id", "keyword", "note_id"),
+    )
+
+    note_id: int = Field(foreign_key="notes.id", primary_key=True)
+    keyword: str = Field(primary_key=True, max_length=100)
+    user_id: int = Field(foreign_key="users.id", nullable=False)
+
+
+class NoteSearchDocument(SQLModel, table=True):
+    """
+    Text indexed for full-text search of a note (see ``src.db.search``).
+
+    The full-text index itself is created with the table: a generated
+    ``tsvector`` column with a GIN index on PostgreSQL, an external-content
+    FTS5 table kept in sync by triggers on SQLite.
+    """
+
+    __tablename__ = "note_search_documents"
+
+    note_id: int = Field(foreign_key="notes.id", primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
+    title: str = Field(default="", nullable=False)
+    body: str = Field(default="", nullable=False)
+    transcript: str = Field(default="", nullable=False)
+
+
+class VideoNeighbor(SQLModel, table=True):
+    """
+    Precomputed "students who studied this also studied" list entry.
+
+    Rebuilt as a whole by build_video_neighbors.py from all users' notes.
+    Videos are identified by their YouTube ID; the neighbor's title and URL
+    are denormalized so a list is served by one range scan on
+    (video_key, rank).
+    """
+
+    __tablename__ = "video_neighbors"
+    __table_args__ = (
+        Index("ix_video_neighbors_video_rank", "video_key", "rank", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    video_key: str = Field(max_length=100, nullable=False)
+    rank: int = Field(nullable=False)
+    neighbor_key: str = Field(max_length=100, nullable=False)
+    neighbor_title: str = Field(max_length=500, nullable=False)
+    neighbor_url: str = Field(max_length=500, nullable=False)
+    score: float = Field(nullable=False)
+    support: int = Field(nullable=False)
+
+
+class RecommendationItem(SQLModel, table=True):
+    """
+    One row of a user's materialized recommendation feed.
+
+    Feeds are rewritten as a whole by ``recommendation.feed`` with contiguous
+    ``position`` values, so a page is a single range scan on
+    (user_id, position).
+    """
+
+    __tablename__ = "recommendation_feed"
+    __table_args__ = (
+        Index("ix_recommendation_feed_user_position", "user_id", "position", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", nullable=False)
+    position: int = Field(nullable=False)
+    video_id: str = Field(max_length=50, nullable=False)
+    title: str = Field(max_length=500, nullable=False)
+    description: str = Field(default="", nullable=False)
+    thumbnail: Optional[str] = Field(default=None, max_length=500)
+    channel_title: Optional[str] = Field(default=None, max_length=255)
+    url: str = Field(max_length=500, nullable=False)
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
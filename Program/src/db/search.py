@@ -0,0 +1,191 @@
+"""
+Full-text search over notes.
+
+Each note has a ``NoteSearchDocument`` row with its title, rendered body and
+transcript. The index is backend specific and created alongside that table:
+
+- PostgreSQL: a weighted ``tsvector`` generated column with a GIN index,
+  queried with ``websearch_to_tsquery`` and ranked by ``ts_rank_cd``.
+- SQLite (local/tests): an external-content FTS5 table kept in sync by
+  triggers, ranked by ``bm25``.
+
+Results are ordered by (score desc, note_id desc) and paged with an opaque
+keyset cursor over that pair.
+"""
+
+import re
+import json
+import base64
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DDL, event, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Note, NoteSearchDocument
+from src.ai_modules.summarization.renderer import render_note
+
+# Title matches weigh most, then the notes, then the transcript
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE note_search_documents ADD COLUMN tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A') ||
+        setweight(to_tsvector('english', body), 'B') ||
+        setweight(to_tsvector('english', transcript), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_note_search_documents_tsv ON note_search_documents USING GIN (tsv)",
+]
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE note_search_fts USING fts5(
+        title, body, transcript,
+        content='note_search_documents', content_rowid='note_id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER note_search_documents_ai AFTER INSERT ON note_search_documents BEGIN
+        INSERT INTO note_search_fts(rowid, title, body, transcript)
+        VALUES (new.note_id, new.title, new.body, new.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_documents_ad AFTER DELETE ON note_search_documents BEGIN
+        INSERT INTO note_search_fts(note_search_fts, rowid, title, body, transcript)
+        VALUES ('delete', old.note_id, old.title, old.body, old.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_documents_au AFTER UPDATE ON note_search_documents BEGIN
+        INSERT INTO note_search_fts(note_search_fts, rowid, title, body, transcript)
+        VALUES ('delete', old.note_id, old.title, old.body, old.transcript);
+        INSERT INTO note_search_fts(rowid, title, body, transcript)
+        VALUES (new.note_id, new.title, new.body, new.transcript);
+    END
+    """,
+]
+
+_table = NoteSearchDocument.__table__
+for _statement in _POSTGRES_DDL:
+    event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in _SQLITE_DDL:
+    event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    _table, "before_drop", DDL("DROP TABLE IF EXISTS note_search_fts").execute_if(dialect="sqlite")
+)
+
+_POSTGRES_SEARCH = """
+WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+ranked AS (
+    SELECT d.note_id, ts_rank_cd(d.tsv, q.query)::float8 AS score
+    FROM note_search_documents d, q
+    WHERE d.user_id = :user_id AND d.tsv @@ q.query
+)
+SELECT r.note_id, r.score, n.video_title, n.video_url, n.category, n.created_at,
+       ts_headline('english', d.body || ' ' || d.transcript, q.query,
+                   'MaxFragments=2, MaxWords=20, MinWords=8, StartSel=<b>, StopSel=</b>') AS snippet
+FROM (
+    SELECT * FROM ranked {cursor}
+    ORDER BY score DESC, note_id DESC
+    LIMIT :limit
+) r
+JOIN note_search_documents d ON d.note_id = r.note_id
+JOIN notes n ON n.id = r.note_id
+CROSS JOIN q
+ORDER BY r.score DESC, r.note_id DESC
+"""
+
+_SQLITE_SEARCH = """
+SELECT m.note_id, m.score, n.video_title, n.video_url, n.category, n.created_at, m.snippet
+FROM (
+    SELECT f.rowid AS note_id,
+           -bm25(note_search_fts, 10.0, 4.0, 1.0) AS score,
+           snippet(note_search_fts, -1, '<b>', '</b>', '…', 16) AS snippet
+    FROM note_search_fts f
+    JOIN note_search_documents d ON d.note_id = f.rowid
+    WHERE note_search_fts MATCH :query AND d.user_id = :user_id
+) m
+JOIN notes n ON n.id = m.note_id
+{cursor}
+ORDER BY m.score DESC, m.note_id DESC
+LIMIT :limit
+"""
+
+_CURSOR_CONDITION = "WHERE (score < :cursor_score OR (score = :cursor_score AND note_id < :cursor_id))"
+
+
+def encode_cursor(score: float, note_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, note_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        score, note_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(note_id)
+    except Exception as e:
+        raise ValueError("Invalid search cursor") from e
+
+
+def fts5_query(query: str) -> str:
+    """User input as an FTS5 query: every word must match (as a literal)."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+async def index_search_document(
+    session: AsyncSession, note: Note, transcript: Optional[str] = None
+) -> None:
+    """
+    Add or replace the search document of ``note`` in the current
+    transaction (the note must have an ID; the caller commits). An existing
+    transcript is kept when ``transcript`` is None.
+    """
+    document = await session.get(NoteSearchDocument, note.id)
+    if document is None:
+        document = NoteSearchDocument(note_id=note.id, user_id=note.user_id)
+    document.title = note.video_title
+    document.body = render_note(note, "text")
+    if transcript is not None:
+        document.transcript = transcript
+    session.add(document)
+
+
+async def search_notes(
+    session: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Ranked full-text search over one user's notes.
+
+    Returns:
+        (hits, next_cursor); ``next_cursor`` is None on the last page
+    """
+    if session.bind.dialect.name == "postgresql":
+        sql, params = _POSTGRES_SEARCH, {"query": query}
+    else:
+        match = fts5_query(query)
+        if not match:
+            return [], None
+        sql, params = _SQLITE_SEARCH, {"query": match}
+
+    # One extra row tells whether there is a next page
+    params.update(user_id=user_id, limit=limit + 1)
+    condition = ""
+    if cursor:
+        params["cursor_score"], params["cursor_id"] = decode_cursor(cursor)
+        condition = _CURSOR_CONDITION
+
+    result = await session.execute(text(sql.format(cursor=condition)), params)
+    rows = result.mappings().all()
+
+    hits = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = hits[-1]
+        next_cursor = encode_cursor(last["score"], last["note_id"])
+    return hits, next_cursor
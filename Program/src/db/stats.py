@@ -0,0 +1,233 @@
+"""
+Per-user analytics rollups.
+
+``user_stats``, ``user_language_stats`` and ``daily_study_rollups`` are kept
+up to date by database triggers on ``notes``: an insert adds the note's
+contribution, a delete subtracts it, and an update of its category,
+duration, language or date moves it. Every write path (API, pipeline,
+background categorization, bulk scripts) is covered, and the counters are
+updated atomically in the same transaction as the note.
+
+``rebuild_stats`` recomputes everything from ``notes`` for repairs.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import DDL, event, text
+from sqlmodel import SQLModel, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import DailyStudyRollup, UserLanguageStats, UserStats
+
+DEFAULT_CATEGORY = "Uncategorized"
+
+
+def _sqlite_apply(row: str, sign: int) -> str:
+    """Trigger body adding (sign=1) or removing (sign=-1) one note."""
+    return f"""
+        INSERT INTO user_stats (user_id, total_notes, timed_notes, total_study_seconds)
+        VALUES ({row}.user_id, {sign}, {sign} * ({row}.video_duration IS NOT NULL),
+                {sign} * coalesce({row}.video_duration, 0))
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_notes = total_notes + excluded.total_notes,
+            timed_notes = timed_notes + excluded.timed_notes,
+            total_study_seconds = total_study_seconds + excluded.total_study_seconds;
+        INSERT INTO user_language_stats (user_id, language, notes)
+        VALUES ({row}.user_id, {row}.language, {sign})
+        ON CONFLICT (user_id, language) DO UPDATE SET notes = notes + excluded.notes;
+        INSERT INTO daily_study_rollups (user_id, day, category, notes, study_seconds)
+        VALUES ({row}.user_id, date({row}.created_at),
+                coalesce({row}.category, '{DEFAULT_CATEGORY}'), {sign},
+                {sign} * coalesce({row}.video_duration, 0))
+        ON CONFLICT (user_id, day, category) DO UPDATE SET
+            notes = notes + excluded.notes,
+            study_seconds = study_seconds + excluded.study_seconds;
+    """
+
+
+_SQLITE_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS notes_stats_ai AFTER INSERT ON notes BEGIN
+        {_sqlite_apply("new", 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS notes_stats_ad AFTER DELETE ON notes BEGIN
+        {_sqlite_apply("old", -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS notes_stats_au
+    AFTER UPDATE OF category, video_duration, language, created_at ON notes
+    WHEN old.category IS NOT new.category
+        OR old.video_duration IS NOT new.video_duration
+        OR old.language IS NOT new.language
+        OR date(old.created_at) IS NOT date(new.created_at)
+    BEGIN
+        {_sqlite_apply("old", -1)}
+        {_sqlite_apply("new", 1)}
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION apply_note_stats(
+        p_user_id integer, p_day date, p_category varchar, p_language varchar,
+        p_duration integer, p_sign integer
+    ) RETURNS void AS $$
+    BEGIN
+        INSERT INTO user_stats AS s (user_id, total_notes, timed_notes, total_study_seconds)
+        VALUES (p_user_id, p_sign, CASE WHEN p_duration IS NULL THEN 0 ELSE p_sign END,
+                p_sign * COALESCE(p_duration, 0))
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_notes = s.total_notes + EXCLUDED.total_notes,
+            timed_notes = s.timed_notes + EXCLUDED.timed_notes,
+            total_study_seconds = s.total_study_seconds + EXCLUDED.total_study_seconds;
+
+        INSERT INTO user_language_stats AS l (user_id, language, notes)
+        VALUES (p_user_id, p_language, p_sign)
+        ON CONFLICT (user_id, language) DO UPDATE SET notes = l.notes + EXCLUDED.notes;
+
+        INSERT INTO daily_study_rollups AS r (user_id, day, category, notes, study_seconds)
+        VALUES (p_user_id, p_day, COALESCE(p_category, '{DEFAULT_CATEGORY}'), p_sign,
+                p_sign * COALESCE(p_duration, 0))
+        ON CONFLICT (user_id, day, category) DO UPDATE SET
+            notes = r.notes + EXCLUDED.notes,
+            study_seconds = r.study_seconds + EXCLUDED.study_seconds;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notes_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM apply_note_stats(OLD.user_id, OLD.created_at::date, OLD.category,
+                                     OLD.language, OLD.video_duration, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM apply_note_stats(NEW.user_id, NEW.created_at::date, NEW.category,
+                                     NEW.language, NEW.video_duration, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS notes_stats ON notes",
+    """
+    CREATE TRIGGER notes_stats
+    AFTER INSERT OR DELETE OR UPDATE OF category, video_duration, language, created_at
+    ON notes FOR EACH ROW EXECUTE FUNCTION notes_stats_trigger()
+    """,
+]
+
+# Registered on the metadata so the triggers are created once all tables exist
+for _statement in _SQLITE_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in _POSTGRES_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+_REBUILD = [
+    "DELETE FROM user_stats",
+    "DELETE FROM user_language_stats",
+    "DELETE FROM daily_study_rollups",
+    """
+    INSERT INTO user_stats (user_id, total_notes, timed_notes, total_study_seconds)
+    SELECT user_id, count(*), count(video_duration), coalesce(sum(video_duration), 0)
+    FROM notes GROUP BY user_id
+    """,
+    """
+    INSERT INTO user_language_stats (user_id, language, notes)
+    SELECT user_id, language, count(*) FROM notes GROUP BY user_id, language
+    """,
+    f"""
+    INSERT INTO daily_study_rollups (user_id, day, category, notes, study_seconds)
+    SELECT user_id, date(created_at), coalesce(category, '{DEFAULT_CATEGORY}'),
+           count(*), coalesce(sum(video_duration), 0)
+    FROM notes GROUP BY user_id, date(created_at), coalesce(category, '{DEFAULT_CATEGORY}')
+    """,
+]
+
+
+async def rebuild_stats(session: AsyncSession) -> None:
+    """Recompute all rollups from ``notes`` (the caller commits)."""
+    for statement in _REBUILD:
+        await session.execute(text(statement))
+
+
+async def get_user_stats(session: AsyncSession, user_id: int) -> UserStats:
+    """Totals for a user (all zero if they have no notes): one primary-key read."""
+    stats = await session.get(UserStats, user_id)
+    return stats or UserStats(user_id=user_id)
+
+
+async def get_languages(session: AsyncSession, user_id: int) -> List[str]:
+    statement = (
+        select(UserLanguageStats.language)
+        .where(UserLanguageStats.user_id == user_id, UserLanguageStats.notes > 0)
+        .order_by(UserLanguageStats.notes.desc())
+    )
+    result = await session.exec(statement)
+    return result.all()
+
+
+async def study_time_series(
+    session: AsyncSession, user_id: int, start: date, end: date, period: str = "day"
+) -> List[Dict]:
+    """
+    Notes and study seconds per day (or ISO week, starting Monday) between
+    ``start`` and ``end`` inclusive, with empty periods filled with zeros.
+    """
+    statement = (
+        select(
+            DailyStudyRollup.day,
+            func.sum(DailyStudyRollup.notes),
+            func.sum(DailyStudyRollup.study_seconds),
+        )
+        .where(
+            DailyStudyRollup.user_id == user_id,
+            DailyStudyRollup.day >= start,
+            DailyStudyRollup.day <= end,
+        )
+        .group_by(DailyStudyRollup.day)
+    )
+    result = await session.exec(statement)
+
+    def bucket(day: date) -> date:
+        return day - timedelta(days=day.weekday()) if period == "week" else day
+
+    step = timedelta(days=7 if period == "week" else 1)
+    series: Dict[date, Dict] = {}
+    current = bucket(start)
+    while current <= end:
+        series[current] = {"period_start": current, "notes": 0, "study_seconds": 0}
+        current += step
+    for day, notes, seconds in result.all():
+        entry = series[bucket(day)]
+        entry["notes"] += notes
+        entry["study_seconds"] += seconds
+    return list(series.values())
+
+
+async def category_totals(
+    session: AsyncSession, user_id: int, start: Optional[date] = None
+) -> List[Dict]:
+    """Notes and study seconds per category, optionally since ``start``."""
+    notes = func.sum(DailyStudyRollup.notes)
+    seconds = func.sum(DailyStudyRollup.study_seconds)
+    statement = select(DailyStudyRollup.category, notes, seconds).where(
+        DailyStudyRollup.user_id == user_id
+    )
+    if start is not None:
+        statement = statement.where(DailyStudyRollup.day >= start)
+    statement = (
+        statement.group_by(DailyStudyRollup.category)
+        .having(notes > 0)
+        .order_by(seconds.desc(), notes.desc())
+    )
+    result = await session.exec(statement)
+    return [
+        {"category": category, "notes": count, "study_seconds": total}
+        for category, count, total in result.all()
+    ]
@@ -0,0 +1,112 @@
+"""
+Async TTL cache with stale-while-revalidate and single-flight loading.
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    Bounded LRU cache for results of expensive async calls.
+
+    - Fresh entries (younger than ``ttl``) are returned directly.
+    - Stale entries (younger than ``ttl + stale_ttl``) are returned immediately
+      while a single background task refreshes them.
+    - Concurrent misses for the same key share one in-flight load.
+
+    Failed loads are not cached, and neither are loads that were running
+    when their key was invalidated (they may have read the old value).
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 1000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "loads": 0,
+            "load_errors": 0,
+        }
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._start_load(key, loader).add_done_callback(self._consume_error)
+                return entry[1]
+
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.stats["misses"] += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        # A load in flight may predate the change: it still answers the
+        # callers already waiting on it but no longer stores its value, and
+        # the next miss starts a fresh load
+        self._inflight.pop(key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        served = self.stats["hits"] + self.stats["stale_hits"] + self.stats["coalesced"]
+        requests = served + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": served / requests if requests else 0.0,
+        }
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = future
+        return future
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["loads"] += 1
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+        except Exception:
+            self.stats["load_errors"] += 1
+            raise
+        finally:
+            current = self._inflight.get(key) is task
+            if current:
+                self._inflight.pop(key)
+
+        if not current:
+            # Invalidated while loading
+            return value
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _consume_error(future: asyncio.Future) -> None:
+        # Background refresh failures keep serving the stale value
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {future.exception()}")
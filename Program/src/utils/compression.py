@@ -0,0 +1,94 @@
+"""
+gzip/brotli helpers shared by file serving and API responses.
+
+brotli is optional: without the package only gzip is offered.
+"""
+
+import os
+import gzip
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Preference order when a client accepts several encodings equally
+ENCODINGS: List[str] = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+SIDECAR_SUFFIXES: Dict[str, str] = {"br": ".br", "gzip": ".gz"}
+
+
+def negotiate_encoding(
+    accept_encoding: Optional[str], available: Sequence[str] = ENCODINGS
+) -> Optional[str]:
+    """
+    Best content coding from an Accept-Encoding header, or None for
+    identity. Highest q-value wins; ties go to the order of ``available``.
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress with ``encoding`` ("gzip" or "br"). ``level`` defaults to the
+    maximum (for content compressed once and served many times).
+    """
+    if encoding == "gzip":
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11 if level is None else level)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def sidecar_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + SIDECAR_SUFFIXES[encoding])
+
+
+def write_sidecars(path: Path) -> None:
+    """
+    Write pre-compressed copies of ``path`` next to it (``.br``/``.gz``),
+    stamped with the source's mtime so staleness is an mtime comparison.
+    """
+    source = path.stat()
+    data = path.read_bytes()
+    for encoding in ENCODINGS:
+        target = sidecar_path(path, encoding)
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        tmp_path.write_bytes(compress(data, encoding))
+        os.utime(tmp_path, ns=(source.st_atime_ns, source.st_mtime_ns))
+        tmp_path.replace(target)
+
+
+def fresh_sidecar(path: Path, encoding: str, source: os.stat_result) -> Optional[os.stat_result]:
+    """Stat of the sidecar if it exists and matches the source's mtime."""
+    try:
+        stats = sidecar_path(path, encoding).stat()
+    except FileNotFoundError:
+        return None
+    return stats if stats.st_mtime_ns == source.st_mtime_ns else None
@@ -0,0 +1,254 @@
+"""
+Shared rate limiting and quota scheduling for Google APIs.
+
+All services use the same ``google_api_key``, so Gemini requests/tokens per
+minute and YouTube Data API units are tracked in token buckets stored in a
+small SQLite file. Every worker process on the host sees the same buckets.
+The file is created on first use, not at import.
+"""
+
+import time
+import asyncio
+import sqlite3
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class Priority(str, Enum):
+    """Interactive calls (a user is waiting) may dip into the reserved capacity."""
+
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+class RateLimitExceeded(Exception):
+    """Raised when capacity does not free up within the allowed wait."""
+
+    def __init__(self, bucket: str, wait: float):
+        super().__init__(f"Rate limit for '{bucket}' exceeded, capacity in {wait:.1f}s")
+        self.bucket = bucket
+        self.wait = wait
+
+
+# YouTube Data API v3 cost per call
+YOUTUBE_UNIT_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class QuotaScheduler:
+    """
+    Token-bucket scheduler backed by SQLite so it works across processes.
+
+    Each bucket has a capacity and a refill rate. A request names the buckets it
+    needs and how much of each; it is granted only if all of them have enough
+    tokens, atomically. Background requests must leave ``interactive_reserve``
+    of each bucket's capacity untouched.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        gemini_rpm: int,
+        gemini_tpm: int,
+        youtube_daily_units: int,
+        interactive_reserve: float = 0.2,
+    ):
+        self.db_path = Path(db_path)
+        self.gemini_rpm = gemini_rpm
+        self.gemini_tpm = gemini_tpm
+        self.youtube_daily_units = youtube_daily_units
+        self.interactive_reserve = interactive_reserve
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def acquire_model(
+        self,
+        model: str,
+        tokens: int,
+        priority: Priority = Priority.BACKGROUND,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        """Block until one request of ``tokens`` tokens may be sent to ``model``."""
+        self._acquire(self._model_costs(model, tokens), priority, max_wait)
+
+    async def acquire_model_async(
+        self,
+        model: str,
+        tokens: int,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        """Async variant of acquire_model."""
+        await self._acquire_async(self._model_costs(model, tokens), priority, max_wait)
+
+    async def acquire_youtube_async(
+        self,
+        operation: str,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        """Account for one YouTube Data API call (e.g. ``search.list``)."""
+        costs = self._youtube_costs(operation)
+        await self._acquire_async(costs, priority, max_wait)
+
+    def usage(self, day: Optional[str] = None) -> Dict[str, float]:
+        """Units consumed per bucket on ``day`` (YYYY-MM-DD, default today)."""
+        day = day or time.strftime("%Y-%m-%d")
+        rows = self._conn().execute(
+            "SELECT bucket, amount FROM quota_usage WHERE day = ?", (day,)
+        ).fetchall()
+        return {bucket: amount for bucket, amount in rows}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _model_costs(self, model: str, tokens: int) -> Dict[str, Tuple[float, float, float]]:
+        # bucket -> (amount, capacity, refill per second)
+        return {
+            f"{model}:rpm": (1, self.gemini_rpm, self.gemini_rpm / 60),
+            f"{model}:tpm": (
+                min(tokens, self.gemini_tpm),
+                self.gemini_tpm,
+                self.gemini_tpm / 60,
+            ),
+        }
+
+    def _youtube_costs(self, operation: str) -> Dict[str, Tuple[float, float, float]]:
+        units = YOUTUBE_UNIT_COSTS.get(operation, 1)
+        return {
+            "youtube:units": (
+                units,
+                self.youtube_daily_units,
+                self.youtube_daily_units / 86400,
+            )
+        }
+
+    def _acquire(self, costs, priority: Priority, max_wait: Optional[float]) -> None:
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            bucket, wait = self._try_acquire(costs, priority)
+            if wait <= 0:
+                return
+            self._check_deadline(bucket, wait, deadline)
+            logger.debug(f"Waiting {wait:.2f}s for rate limit bucket '{bucket}'")
+            # Re-check regularly: other processes may free or take capacity
+            time.sleep(min(wait, 1.0))
+
+    async def _acquire_async(self, costs, priority: Priority, max_wait: Optional[float]) -> None:
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            # BEGIN IMMEDIATE may wait on other processes' locks: off the loop
+            bucket, wait = await asyncio.to_thread(self._try_acquire, costs, priority)
+            if wait <= 0:
+                return
+            self._check_deadline(bucket, wait, deadline)
+            await asyncio.sleep(min(wait, 1.0))
+
+    @staticmethod
+    def _check_deadline(bucket: str, wait: float, deadline: Optional[float]) -> None:
+        if deadline is not None and time.monotonic() + wait > deadline:
+            raise RateLimitExceeded(bucket, wait)
+
+    def _try_acquire(self, costs, priority: Priority) -> Tuple[str, float]:
+        """
+        Take ``costs`` from every bucket atomically.
+
+        Returns:
+            ("", 0) on success, otherwise the limiting bucket and the seconds
+            until it will have enough tokens.
+        """
+        now = time.time()
+        reserve = 0.0 if priority == Priority.INTERACTIVE else self.interactive_reserve
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = {}
+            worst_bucket, worst_wait = "", 0.0
+            for bucket, (amount, capacity, refill) in costs.items():
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM quota_buckets WHERE bucket = ?",
+                    (bucket,),
+                ).fetchone()
+                tokens = capacity if row is None else min(
+                    capacity, row[0] + (now - row[1]) * refill
+                )
+                levels[bucket] = tokens
+                needed = min(capacity, amount + reserve * capacity)
+                if tokens < needed:
+                    wait = (needed - tokens) / refill
+                    if wait > worst_wait:
+                        worst_bucket, worst_wait = bucket, wait
+
+            if worst_wait > 0:
+                conn.execute("ROLLBACK")
+                return worst_bucket, worst_wait
+
+            day = time.strftime("%Y-%m-%d", time.localtime(now))
+            for bucket, (amount, _, _) in costs.items():
+                conn.execute(
+                    "INSERT INTO quota_buckets (bucket, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(bucket) DO UPDATE SET tokens = excluded.tokens, "
+                    "updated_at = excluded.updated_at",
+                    (bucket, levels[bucket] - amount, now),
+                )
+                conn.execute(
+                    "INSERT INTO quota_usage (day, bucket, amount) VALUES (?, ?, ?) "
+                    "ON CONFLICT(day, bucket) DO UPDATE SET amount = amount + excluded.amount",
+                    (day, bucket, amount),
+                )
+            conn.execute("COMMIT")
+            return "", 0.0
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._init_db(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _init_db(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_buckets ("
+            "bucket TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_usage ("
+            "day TEXT NOT NULL, bucket TEXT NOT NULL, amount REAL NOT NULL, "
+            "PRIMARY KEY (day, bucket))"
+        )
+
+
+# Global scheduler instance shared by all Google API clients
+quota_scheduler = QuotaScheduler(
+    db_path=settings.rate_limit_db_path,
+    gemini_rpm=settings.gemini_rpm_limit,
+    gemini_tpm=settings.gemini_tpm_limit,
+    youtube_daily_units=settings.youtube_daily_quota,
+    interactive_reserve=settings.rate_limit_interactive_reserve,
+)
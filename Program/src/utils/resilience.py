@@ -0,0 +1,337 @@
+"""
+Resilience helpers for calls to external LLM APIs.
+Provides retries with exponential backoff, latency-based adaptive timeouts,
+optional hedged requests and a circuit breaker.
+"""
+
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class LLMCallError(Exception):
+    """Raised when an upstream call still fails after all retries."""
+
+
+class LLMTimeoutError(LLMCallError):
+    """Raised when an upstream call exceeds its adaptive timeout."""
+
+
+class AttemptAbandoned(LLMCallError):
+    """Raised by a cancellable call that noticed its attempt was abandoned."""
+
+
+class CircuitOpenError(LLMCallError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class LatencyTracker:
+    """Rolling window of call latencies (seconds) with percentile lookups."""
+
+    def __init__(self, window: int = 100):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Get a latency percentile.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None if nothing was recorded yet
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests fail fast for ``reset_timeout`` seconds. Then a single trial
+    request is let through; success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a trial request through."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+
+class ResilientCaller:
+    """
+    Wraps blocking upstream calls with retries, adaptive timeouts, hedging
+    and a circuit breaker.
+
+    The timeout for each attempt is ``timeout_multiplier`` times the observed
+    p99 latency (timed-out attempts count as taking the timeout), clamped to
+    [min_timeout, max_timeout]. With hedging enabled,
+    a duplicate request is sent once the first has been running longer than
+    the observed p95 and whichever finishes first wins.
+
+    Threads cannot be interrupted, so an abandoned attempt (timed out, or
+    beaten by its hedge) keeps its worker until ``func`` returns. Calls made
+    with ``cancellable=True`` get a ``cancelled`` event, set on abandonment,
+    to stop early and drop any side effects.
+    """
+
+    # Latency samples needed before percentiles are trusted
+    MIN_SAMPLES = 5
+
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        min_timeout: float = 30.0,
+        max_timeout: float = 300.0,
+        timeout_multiplier: float = 2.0,
+        hedge: bool = False,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 8,
+    ):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker(name)
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-call"
+        )
+
+    def current_timeout(self) -> float:
+        """Adaptive per-attempt timeout in seconds."""
+        p99 = self.latency.percentile(99) if len(self.latency) >= self.MIN_SAMPLES else None
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before sending a hedged duplicate, if known."""
+        if len(self.latency) < self.MIN_SAMPLES:
+            return None
+        return self.latency.percentile(95)
+
+    def call(
+        self,
+        func: Callable[..., Any],
+        *args,
+        hedge: Optional[bool] = None,
+        cancellable: bool = False,
+        acquire: Optional[Callable[[bool], bool]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Call ``func(*args, **kwargs)`` with the configured protections.
+
+        Args:
+            func: Blocking function performing the upstream request
+            hedge: Override the default hedging behaviour for this call
+            cancellable: Pass ``cancelled=<threading.Event>`` to ``func``; the
+                event is set once that attempt is abandoned
+            acquire: Reserves capacity (e.g. rate limit quota) for every
+                request sent, hedges included. ``acquire(True)`` waits for it,
+                outside the attempt's timeout and before a half-open breaker
+                slot is taken; ``acquire(False)`` returns whether it was
+                available right away (a hedge without it is not sent)
+
+        Returns:
+            Whatever ``func`` returns
+
+        Raises:
+            CircuitOpenError: If the circuit is open (no request is made)
+            LLMCallError: If every attempt failed
+        """
+        hedge = self.hedge if hedge is None else hedge
+        last_error: Optional[BaseException] = None
+
+        for attempt in range(self.max_retries + 1):
+            if self.breaker.state == CircuitBreaker.OPEN:
+                raise CircuitOpenError(self.name, self.breaker.retry_after)
+            if acquire is not None:
+                acquire(True)
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(self.name, self.breaker.retry_after)
+            try:
+                result = self._attempt(func, args, kwargs, hedge, cancellable, acquire)
+            except Exception as e:
+                last_error = e
+                self.breaker.record_failure()
+                logger.warning(
+                    f"{self.name} call failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}"
+                )
+                if attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+        raise LLMCallError(
+            f"{self.name} call failed after {self.max_retries + 1} attempts: {last_error}"
+        ) from last_error
+
+    def _attempt(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        hedge: bool,
+        cancellable: bool,
+        acquire: Optional[Callable[[bool], bool]],
+    ) -> Any:
+        timeout = self.current_timeout()
+        started = time.monotonic()
+        # Cancellation event of every request sent for this attempt
+        events: Dict[Future, threading.Event] = {}
+        pending = {self._submit(func, args, kwargs, events, cancellable)}
+
+        hedge_delay = self.hedge_delay() if hedge else None
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done and acquire is not None and not acquire(False):
+                logger.info(f"{self.name} call exceeded p95 ({hedge_delay:.2f}s), no quota to hedge")
+            elif not done:
+                logger.info(f"{self.name} call exceeded p95 ({hedge_delay:.2f}s), hedging")
+                pending.add(self._submit(func, args, kwargs, events, cancellable))
+
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._abandon(pending, events)
+                    self.latency.record(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+        # Running threads cannot be interrupted; they are told to stop and
+        # their results are discarded. The timeout is recorded as a (censored)
+        # sample: once upstream settles into a slower regime, the p99 and so
+        # the next timeout grow towards max_timeout instead of every attempt
+        # timing out against a p99 only fast calls ever fed.
+        self._abandon(pending, events)
+        self.latency.record(timeout)
+        raise LLMTimeoutError(f"{self.name} call timed out after {timeout:.1f}s")
+
+    def _submit(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        events: Dict[Future, threading.Event],
+        cancellable: bool,
+    ) -> Future:
+        event = threading.Event()
+        if cancellable:
+            kwargs = {**kwargs, "cancelled": event}
+        future = self._executor.submit(func, *args, **kwargs)
+        events[future] = event
+        return future
+
+    @staticmethod
+    def _abandon(pending, events: Dict[Future, threading.Event]) -> None:
+        for future in pending:
+            future.cancel()
+            events[future].set()
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
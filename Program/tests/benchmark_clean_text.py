@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for TranscriptSegmenter.clean_text on a multi-hour transcript.
+
+Compares the single-pass cleaner against the previous one-regex-per-filler
+implementation. Run with: python tests/benchmark_clean_text.py [hours]
+"""
+
+import re
+import sys
+import random
+import timeit
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.summarization.segmenter import TranscriptSegmenter
+
+# Roughly 150 spoken words per minute
+WORDS_PER_HOUR = 150 * 60
+VOCABULARY = (
+    "the gradient descent algorithm updates Python NumPy weights using "
+    "backpropagation and we compute loss over Fourier transforms in MATLAB"
+).split()
+FILLERS = ["um", "uh", "like", "you know", "basically", "okay", "so yeah"]
+
+
+def build_segments(hours: float, seed: int = 42):
+    """Build synthetic Whisper-style segments (~12 words each)."""
+    rng = random.Random(seed)
+    total_words = int(hours * WORDS_PER_HOUR)
+    segments = []
+    start = 0.0
+    for _ in range(total_words // 12):
+        words = [
+            rng.choice(FILLERS) if rng.random() < 0.1 else rng.choice(VOCABULARY)
+            for _ in range(12)
+        ]
+        text = " " + " ".join(words) + rng.choice([".", ",", "", "?"])
+        segments.append({"start": start, "end": start + 4.8, "text": text})
+        start += 4.8
+    return segments
+
+
+def legacy_clean_text(text: str) -> str:
+    """The previous multi-pass implementation, kept for comparison."""
+    cleaned = text.lower()
+    for filler in TranscriptSegmenter.FILLER_WORDS:
+        pattern = r'\b' + re.escape(filler) + r'\b'
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    cleaned = cleaned.strip()
+    return '. '.join(s.capitalize() for s in cleaned.split('. '))
+
+
+def main(hours: float = 3.0, repeat: int = 3):
+    segmenter = TranscriptSegmenter()
+    segments = build_segments(hours)
+    text = "".join(seg["text"] for seg in segments)
+
+    print(f"Transcript: {hours:g}h, {len(segments)} segments, {len(text):,} chars")
+
+    cases = {
+        "legacy clean_text": lambda: legacy_clean_text(text),
+        "clean_text": lambda: segmenter.clean_text(text),
+        "clean_segments": lambda: list(segmenter.clean_segments(segments)),
+    }
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:<20} {best * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
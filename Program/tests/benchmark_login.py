@@ -0,0 +1,121 @@
+"""
+Load benchmark for concurrent logins.
+
+Runs concurrent POST /auth/login requests against the auth router (on a
+throwaway SQLite database) while a heartbeat task measures how long the
+event loop is blocked. Compares bcrypt verification run inline on the
+loop, as login used to do, with the password executor.
+Run with: python tests/benchmark_login.py [logins] [concurrency]
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.api.auth_routes as auth_routes
+from src.auth.security import hash_password, verify_password
+from src.db.database import get_session
+from src.db.models import User
+from src.utils.config import settings
+
+USERS = 20
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    """The previous behaviour: bcrypt on the event loop."""
+    return verify_password(plain_password, hashed_password)
+
+
+async def heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(app: FastAPI, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/auth/login", data={"username": f"user{i % USERS}", "password": "password"}
+                )
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        beat = asyncio.create_task(heartbeat(stop, lags))
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await beat
+
+    return elapsed, latencies, lags
+
+
+async def main(logins: int = 100, concurrency: int = 20):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        hashed = hash_password("password")
+        async with factory() as session:
+            for i in range(USERS):
+                session.add(User(email=f"user{i}@example.com", username=f"user{i}", password_hash=hashed))
+            await session.commit()
+
+        async def session_override():
+            async with factory() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(auth_routes.router)
+        app.dependency_overrides[get_session] = session_override
+
+        print(
+            f"{logins} logins, concurrency {concurrency}, bcrypt cost {settings.bcrypt_rounds}, "
+            f"{settings.password_hash_workers} hash workers"
+        )
+        print(f"{'mode':<10} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max loop stall ms':>18}")
+        executor_verify = auth_routes.verify_password_async
+        for mode, verify in (("inline", inline_verify), ("executor", executor_verify)):
+            auth_routes.verify_password_async = verify
+            elapsed, latencies, lags = await run(app, logins, concurrency)
+            print(
+                f"{mode:<10} {logins / elapsed:9.1f} {percentile(latencies, 50) * 1000:8.0f} "
+                f"{percentile(latencies, 95) * 1000:8.0f} {max(lags) * 1000:18.0f}"
+            )
+        auth_routes.verify_password_async = executor_verify
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        )
+    )
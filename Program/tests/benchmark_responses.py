@@ -0,0 +1,92 @@
+"""
+Benchmark of API response serialization and compression.
+
+Serializes a page of note list items (with rendered notes, as
+``GET /notes?fields=...,summary_text`` returns) with the stdlib
+JSONResponse FastAPI used before and with ORJSONResponse, then reports
+the payload size and per-request cost of gzip/brotli at the levels the
+compression middleware uses.
+Run with: python tests/benchmark_responses.py [notes]
+"""
+
+import sys
+import random
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from src.api.notes_routes import NoteListItem
+from src.utils.compression import ENCODINGS, compress
+from src.utils.config import settings
+
+SAMPLE = Path(__file__).parent.parent / "examples" / "sample_output.md"
+
+
+def build_summary(words, rng: random.Random, length: int = 700) -> str:
+    """Distinct markdown notes drawn from the sample's vocabulary."""
+    lines = []
+    for _ in range(length // 70):
+        lines.append(f"## {' '.join(rng.choices(words, k=4)).title()}")
+        for _ in range(5):
+            lines.append("- " + " ".join(rng.choices(words, k=14)) + ".")
+    return "\n".join(lines)
+
+
+def build_page(notes: int, seed: int = 42):
+    rng = random.Random(seed)
+    words = SAMPLE.read_text(encoding="utf-8").replace("#", " ").split()
+    started = datetime(2024, 1, 1)
+    return [
+        NoteListItem(
+            id=i,
+            video_url=f"https://www.youtube.com/watch?v=video{i:05d}",
+            video_title=f"Lecture {i}: Fourier series and signal processing",
+            category="Mathematics",
+            version=1 + i % 3,
+            created_at=str(started + timedelta(hours=i)),
+            updated_at=started + timedelta(hours=i, minutes=5),
+            summary_text=build_summary(words, rng),
+        )
+        for i in range(notes)
+    ]
+
+
+def timed(fn, number: int) -> float:
+    """Best per-call time in milliseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def main(notes: int = 50, number: int = 50):
+    page = build_page(notes)
+    content = jsonable_encoder(page, exclude_unset=True)
+
+    stdlib_body = JSONResponse(content).body
+    orjson_body = ORJSONResponse(content).body
+    assert len(orjson_body) == len(stdlib_body)
+
+    stdlib_ms = timed(lambda: JSONResponse(content), number)
+    orjson_ms = timed(lambda: ORJSONResponse(content), number)
+    print(f"📄 {notes} notes, {len(orjson_body) / 1024:.1f} KiB of JSON")
+    print(f"   JSONResponse (stdlib): {stdlib_ms:.3f} ms")
+    print(f"   ORJSONResponse:        {orjson_ms:.3f} ms  ({stdlib_ms / orjson_ms:.1f}x faster)")
+
+    levels = {"gzip": settings.response_gzip_level, "br": settings.response_brotli_quality}
+    print("\n🗜️  Payload on the wire")
+    print(f"   identity: {len(orjson_body):>9,} bytes")
+    for encoding in ENCODINGS:
+        compressed = compress(orjson_body, encoding, levels[encoding])
+        ms = timed(lambda: compress(orjson_body, encoding, levels[encoding]), 10)
+        print(
+            f"   {encoding:<8}: {len(compressed):>9,} bytes "
+            f"({len(compressed) / len(orjson_body):.1%}, level {levels[encoding]}, {ms:.2f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
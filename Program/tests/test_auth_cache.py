@@ -0,0 +1,134 @@
+"""
+Tests for the authenticated-user cache.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth import dependencies
+from src.auth.dependencies import get_current_user, invalidate_user
+from src.auth.security import create_access_token
+from src.api.auth_routes import router as auth_router
+from src.db.database import get_session
+from src.db.models import User
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    sessions = []
+
+    def counting_factory():
+        sessions.append(1)
+        return factory()
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with factory() as session:
+            session.add(User(id=1, email="a@example.com", username="alice", password_hash="x"))
+            await session.commit()
+
+    asyncio.run(setup())
+    monkeypatch.setattr(dependencies, "async_session_factory", counting_factory)
+    dependencies.user_cache._entries.clear()
+    yield factory, sessions
+    dependencies.user_cache._entries.clear()
+    asyncio.run(engine.dispose())
+
+
+def token(user_id=1, username="alice"):
+    return create_access_token({"sub": username, "uid": user_id, "role": "user"})
+
+
+def test_cached_users_skip_the_database(db):
+    _, sessions = db
+
+    async def main():
+        first = await get_current_user(token())
+        second = await get_current_user(token())
+        assert first.id == second.id == 1
+        assert len(sessions) == 1
+
+        invalidate_user("alice")
+        await get_current_user(token())
+        assert len(sessions) == 2
+
+        # Tokens without the uid claim fall back to the username
+        legacy = create_access_token({"sub": "alice"})
+        assert (await get_current_user(legacy)).id == 1
+
+    asyncio.run(main())
+
+
+def test_token_for_another_user_is_rejected(db):
+    async def main():
+        for bad in (token(user_id=2), token(username="bob"), "not-a-token"):
+            with pytest.raises(HTTPException) as error:
+                await get_current_user(bad)
+            assert error.value.status_code == 401
+        # The cached entry still serves the real user
+        assert (await get_current_user(token())).username == "alice"
+
+    asyncio.run(main())
+
+
+def test_profile_change_invalidates_the_cache(db):
+    factory, _ = db
+
+    async def session_override():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_session] = session_override
+    headers = {"Authorization": f"Bearer {token()}"}
+
+    with TestClient(app) as client:
+        assert client.get("/auth/me", headers=headers).json()["age"] is None
+        response = client.patch("/auth/me", json={"age": 30}, headers=headers)
+        assert response.status_code == 200
+        assert client.get("/auth/me", headers=headers).json()["age"] == 30
+
+
+def test_invalidation_during_a_load_is_not_undone(db):
+    factory, _ = db
+    original = dependencies._load_user
+
+    async def slow_load(username, user_id):
+        user = await original(username, user_id)
+        await asyncio.sleep(0.05)  # the profile changes meanwhile
+        return user
+
+    async def main():
+        dependencies._load_user = slow_load
+        try:
+            in_flight = asyncio.ensure_future(get_current_user(token()))
+            await asyncio.sleep(0.02)
+            async with factory() as session:
+                user = await session.get(User, 1)
+                user.age = 30
+                session.add(user)
+                await session.commit()
+            invalidate_user("alice")
+            # The request already waiting got the old profile...
+            assert (await in_flight).age is None
+        finally:
+            dependencies._load_user = original
+        # ...but it was not cached for later ones
+        assert (await get_current_user(token())).age == 30
+
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Tests for the MicroBatcher request coalescer.
+"""
+
+import gc
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.batching import MicroBatcher
+
+
+def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    async def handler(items):
+        calls.append(list(items))
+        return [item.upper() for item in items]
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=10, max_delay=0.01)
+        return await asyncio.gather(*(batcher.submit(w) for w in ["a", "b", "c"]))
+
+    assert asyncio.run(run()) == ["A", "B", "C"]
+    assert calls == [["a", "b", "c"]]
+
+
+def test_full_batch_is_sent_without_waiting():
+    calls = []
+
+    async def handler(items):
+        calls.append(len(items))
+        return items
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=2, max_delay=10)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+        )
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
+    assert calls == [2, 2]
+
+
+def test_handler_error_reaches_every_caller():
+    async def handler(items):
+        return items[:1]  # wrong number of results
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=10, max_delay=0.001)
+        return await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_batch_in_flight_is_referenced():
+    batchers = []
+
+    async def handler(items):
+        # Strong reference while the batch runs, released once it is done
+        assert len(batchers[0]._running) == 1
+        gc.collect()
+        await asyncio.sleep(0.01)
+        return items
+
+    async def run():
+        batchers.append(MicroBatcher(handler, max_batch_size=10, max_delay=0.001))
+        results = await asyncio.gather(*(batchers[0].submit(i) for i in range(3)))
+        await asyncio.sleep(0)
+        return results
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert not batchers[0]._running
@@ -0,0 +1,94 @@
+"""
+Tests for AsyncTTLCache (TTL, stale-while-revalidate, single-flight) and
+the YouTube search cache keys.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.recommendation.recommender import RecommendationService
+from src.utils.cache import AsyncTTLCache
+
+
+class CountingLoader:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return f"value {call}"
+
+
+def test_concurrent_misses_share_one_load():
+    cache = AsyncTTLCache(ttl=60)
+    loader = CountingLoader(delay=0.01)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("q", loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value 1"] * 5
+    assert loader.calls == 1
+    assert cache.stats["coalesced"] == 4
+
+
+def test_stale_value_served_while_refreshing():
+    cache = AsyncTTLCache(ttl=0.01, stale_ttl=60)
+    loader = CountingLoader()
+
+    async def run():
+        first = await cache.get_or_load("q", loader)
+        await asyncio.sleep(0.02)
+        stale = await cache.get_or_load("q", loader)
+        await asyncio.sleep(0)  # let the background refresh finish
+        await asyncio.sleep(0)
+        fresh = await cache.get_or_load("q", loader)
+        return first, stale, fresh
+
+    assert asyncio.run(run()) == ("value 1", "value 1", "value 2")
+    assert cache.stats["stale_hits"] == 1
+
+
+def test_failed_loads_are_not_cached():
+    cache = AsyncTTLCache(ttl=60)
+
+    async def failing():
+        raise ConnectionError("quota exceeded")
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await cache.get_or_load("q", failing)
+        return await cache.get_or_load("q", CountingLoader())
+
+    assert asyncio.run(run()) == "value 1"
+    assert cache.metrics()["load_errors"] == 1
+
+
+def test_load_in_flight_during_invalidation_is_not_cached():
+    cache = AsyncTTLCache(ttl=60)
+    loader = CountingLoader(delay=0.02)
+
+    async def run():
+        before = asyncio.ensure_future(cache.get_or_load("q", loader))
+        await asyncio.sleep(0.01)
+        cache.invalidate("q")
+        # A miss after the invalidation does not join the old load
+        after = await cache.get_or_load("q", loader)
+        return await before, after, await cache.get_or_load("q", loader)
+
+    assert asyncio.run(run()) == ("value 1", "value 2", "value 2")
+    assert loader.calls == 2
+
+
+def test_search_cache_key_keeps_word_order():
+    normalize = RecommendationService.normalize_query
+    assert normalize("  Python  FOR data\tscience ") == "python for data science"
+    assert normalize("data science for python") != normalize("python for data science")
@@ -0,0 +1,146 @@
+"""
+Tests for normalized categories and their trigger-maintained note counts
+(SQLite backend).
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db import categories as _categories  # noqa: F401  (registers the triggers)
+from src.db.categories import category_id, category_ids, rebuild_category_counts
+from src.db.database import get_session
+from src.db.models import Category, Note, User
+from src.auth.dependencies import get_current_user
+from src.api.category_routes import router as category_router
+from src.api.notes_routes import router as notes_router
+
+
+def make_engine(tmp_path):
+    return create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'categories.db'}")
+
+
+async def setup(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(User(id=1, email="a@example.com", username="a", password_hash="x"))
+        session.add(User(id=2, email="b@example.com", username="b", password_hash="x"))
+        await session.commit()
+        ids = await category_ids(session, [(1, "Math"), (1, "Physics"), (2, "Math"), (1, None)])
+        for user_id, name in [(1, "Math"), (1, "Math"), (1, "Physics"), (2, "Math")]:
+            session.add(
+                Note(
+                    user_id=user_id,
+                    video_url="https://youtu.be/x",
+                    video_title=f"{name} video",
+                    category=name,
+                    category_id=ids[(user_id, name)],
+                )
+            )
+        await session.commit()
+        return ids
+
+
+async def counts(session, user_id):
+    result = await session.exec(
+        select(Category.name, Category.note_count).where(Category.user_id == user_id)
+    )
+    return dict(result.all())
+
+
+def test_ids_are_per_user_and_reused(tmp_path):
+    engine = make_engine(tmp_path)
+
+    async def main():
+        ids = await setup(engine)
+        async with AsyncSession(engine) as session:
+            assert ids[(1, "Math")] != ids[(2, "Math")]
+            assert (1, None) not in ids
+            # Existing rows are returned, not duplicated
+            assert await category_id(session, 1, "Math") == ids[(1, "Math")]
+            assert len((await session.exec(select(Category))).all()) == 3
+
+    try:
+        asyncio.run(main())
+    finally:
+        asyncio.run(engine.dispose())
+
+
+def test_counts_follow_inserts_updates_and_deletes(tmp_path):
+    engine = make_engine(tmp_path)
+
+    async def main():
+        ids = await setup(engine)
+        async with AsyncSession(engine) as session:
+            assert await counts(session, 1) == {"Math": 2, "Physics": 1}
+            assert await counts(session, 2) == {"Math": 1}
+
+            note_id = (await session.exec(
+                select(Note.id).where(Note.user_id == 1, Note.category == "Math")
+            )).first()
+            await session.execute(
+                update(Note)
+                .where(Note.id == note_id)
+                .values(category="Physics", category_id=ids[(1, "Physics")])
+            )
+            await session.execute(delete(Note).where(Note.user_id == 2))
+            await session.commit()
+            assert await counts(session, 1) == {"Math": 1, "Physics": 2}
+            assert await counts(session, 2) == {"Math": 0}
+
+            # A repair recomputes the same counts
+            await session.execute(update(Category).values(note_count=99))
+            await rebuild_category_counts(session)
+            await session.commit()
+            assert await counts(session, 1) == {"Math": 1, "Physics": 2}
+
+    try:
+        asyncio.run(main())
+    finally:
+        asyncio.run(engine.dispose())
+
+
+def test_facets_and_note_filter(tmp_path):
+    engine = make_engine(tmp_path)
+    ids = asyncio.run(setup(engine))
+
+    async def session_override():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(category_router)
+    app.include_router(notes_router)
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, email="a@example.com", username="a", password_hash="x"
+    )
+
+    try:
+        with TestClient(app) as client:
+            facets = client.get("/categories").json()
+            assert [(f["name"], f["note_count"]) for f in facets] == [("Math", 2), ("Physics", 1)]
+
+            notes = client.get("/notes", params={"category_id": ids[(1, "Physics")]}).json()
+            assert [n["video_title"] for n in notes] == ["Physics video"]
+            # Another user's category matches none of this user's notes
+            assert client.get("/notes", params={"category_id": ids[(2, "Math")]}).json() == []
+
+            assert client.post("/categories", json={"name": "Art"}).status_code == 201
+            assert client.post("/categories", json={"name": "Art"}).status_code == 409
+            assert "Art" not in [f["name"] for f in client.get("/categories").json()]
+            empty = client.get("/categories", params={"include_empty": True}).json()
+            assert ("Art", 0) in [(f["name"], f["note_count"]) for f in empty]
+    finally:
+        asyncio.run(engine.dispose())
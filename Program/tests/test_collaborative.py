@@ -0,0 +1,113 @@
+"""
+Tests for item-item collaborative filtering.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.ai_modules.recommendation.collaborative import build_neighbors, video_key, video_url
+from src.api.recommendation_routes import router as recommendation_router
+from src.auth.dependencies import get_current_user
+from src.db.database import get_session
+from src.db.models import Note, User, VideoNeighbor
+
+PAIRS = [
+    (1, "a"), (1, "b"), (1, "c"),
+    (2, "a"), (2, "b"),
+    (3, "a"), (3, "b"), (3, "d"),
+    (4, "c"), (4, "e"),
+    (4, "c"),  # duplicate note of the same video
+]
+
+
+def test_video_key_normalizes_urls():
+    for url in (
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42s",
+        "https://youtu.be/dQw4w9WgXcQ?si=abc",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    ):
+        assert video_key(url) == "dQw4w9WgXcQ"
+    assert video_url("dQw4w9WgXcQ") == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    # No video ID: left out of co-occurrence rather than keyed by the raw URL
+    assert video_key("https://example.com/lecture") is None
+    assert video_key("https://example.com/" + "x" * 400) is None
+
+
+def test_neighbors_ranked_by_cosine():
+    neighbors = dict(build_neighbors(PAIRS, top_n=3, block_size=2))
+
+    # a and b were studied together by all three of their students; d (one
+    # student, shared) beats the more popular c (one of its two students)
+    assert [n for n, _, _ in neighbors["a"]] == ["b", "d", "c"]
+    assert neighbors["a"][0][1:] == (1.0, 3)
+    # c: e (1 shared of 1 and 2 students) beats a and b (1 shared of 3)
+    assert neighbors["c"][0][0] == "e"
+    assert neighbors["e"] == [("c", neighbors["e"][0][1], 1)]
+
+
+def test_min_support_and_blocks_agree():
+    small_blocks = dict(build_neighbors(PAIRS, min_support=2, block_size=1))
+    one_block = dict(build_neighbors(PAIRS, min_support=2))
+
+    assert small_blocks == one_block
+    assert set(one_block) == {"a", "b"}
+    assert list(build_neighbors([])) == []
+
+
+def test_also_studied_route_skips_videos_already_studied(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'neighbors.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(User(id=1, email="a@example.com", username="a", password_hash="x"))
+            await session.commit()
+            for url in ("https://youtu.be/aaaaaaaaaaa", "https://youtube.com/watch?v=bbbbbbbbbbb&t=3s"):
+                session.add(Note(user_id=1, video_url=url, video_title="Mine"))
+            session.add(Note(user_id=1, video_url="https://example.com/lecture", video_title="Other"))
+            for rank, key in enumerate(["bbbbbbbbbbb", "ccccccccccc"]):
+                session.add(
+                    VideoNeighbor(
+                        video_key="aaaaaaaaaaa",
+                        rank=rank,
+                        neighbor_key=key,
+                        neighbor_title=f"Video {key[0]}",
+                        neighbor_url=video_url(key),
+                        score=0.5,
+                        support=3,
+                    )
+                )
+            await session.commit()
+
+    asyncio.run(setup())
+
+    async def session_override():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(recommendation_router)
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, email="a@example.com", username="a", password_hash="x"
+    )
+    try:
+        with TestClient(app) as client:
+            hits = client.get("/recommendations/1/also-studied").json()
+            assert [(h["id"], h["title"]) for h in hits] == [("ccccccccccc", "Video c")]
+            # A note without a YouTube video ID has no neighbors
+            assert client.get("/recommendations/3/also-studied").json() == []
+    finally:
+        asyncio.run(engine.dispose())
@@ -0,0 +1,133 @@
+"""
+Tests for the background enrichment (categorization) queue (SQLite backend).
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.ai_modules.categorization.enrichment as enrichment
+from src.ai_modules.categorization.categorizer import PENDING_CATEGORY, UNCATEGORIZED
+from src.ai_modules.categorization.enrichment import EnrichmentQueue
+from src.db.models import Note, User
+
+
+class StubCategorizer:
+    """Fails the first ``failures`` calls per note text, then answers ``Math``."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = []
+
+    async def categorize_text(self, text: str, raise_errors: bool = False) -> str:
+        self.calls.append(text)
+        if len(text) < 10:
+            return UNCATEGORIZED
+        if self.calls.count(text) <= self.failures:
+            raise ConnectionError("Gemini unavailable")
+        return "Math"
+
+
+async def setup(tmp_path, summaries):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'enrichment.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add(User(id=1, email="a@example.com", username="a", password_hash="x"))
+        await session.commit()
+        for summary, category in summaries:
+            session.add(
+                Note(
+                    user_id=1,
+                    video_url="https://youtu.be/x",
+                    video_title="",
+                    summary_content=summary,
+                    category=category,
+                )
+            )
+        await session.commit()
+    return engine
+
+
+async def categories(engine):
+    async with AsyncSession(engine) as session:
+        result = await session.exec(select(Note.id, Note.category).order_by(Note.id))
+        return dict(result.all())
+
+
+def test_only_transient_failures_are_retried(tmp_path, monkeypatch):
+    async def main():
+        engine = await setup(
+            tmp_path,
+            [
+                ("Fourier series and periodic functions", PENDING_CATEGORY),
+                ("short", PENDING_CATEGORY),
+                ("Already categorized elsewhere", "Physics"),
+            ],
+        )
+        monkeypatch.setattr(enrichment, "async_engine", engine)
+        categorizer = StubCategorizer(failures=1)
+        queue = EnrichmentQueue(categorizer, max_attempts=3, retry_base_delay=0.01)
+        await queue.start()
+        queue.enqueue(3)  # no longer pending: skipped
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        assert await categories(engine) == {1: "Math", 2: UNCATEGORIZED, 3: "Physics"}
+        # The Gemini failure was retried; the too-short note was not
+        assert sum(1 for text in categorizer.calls if "Fourier" in text) == 2
+        assert sum(1 for text in categorizer.calls if "short" in text) == 1
+        assert not any("elsewhere" in text for text in categorizer.calls)
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_gives_up_after_max_attempts(tmp_path, monkeypatch):
+    async def main():
+        engine = await setup(tmp_path, [("Fourier series and periodic functions", PENDING_CATEGORY)])
+        monkeypatch.setattr(enrichment, "async_engine", engine)
+        categorizer = StubCategorizer(failures=10)
+        queue = EnrichmentQueue(categorizer, max_attempts=2, retry_base_delay=0.01)
+        await queue.start()
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        assert await categories(engine) == {1: UNCATEGORIZED}
+        assert len(categorizer.calls) == 2
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_notes_categorized_meanwhile_are_not_overwritten(tmp_path, monkeypatch):
+    async def main():
+        engine = await setup(tmp_path, [("Fourier series and periodic functions", PENDING_CATEGORY)])
+        monkeypatch.setattr(enrichment, "async_engine", engine)
+
+        class EditingCategorizer(StubCategorizer):
+            async def categorize_text(self, text, raise_errors=False):
+                # No transaction of the queue is open during the call, so
+                # the user's edit commits instead of waiting on a row lock
+                async with AsyncSession(engine) as session:
+                    await session.exec(update(Note).where(Note.id == 1).values(category="Physics"))
+                    await session.commit()
+                return await super().categorize_text(text, raise_errors)
+
+        queue = EnrichmentQueue(EditingCategorizer())
+        await queue.start()
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        assert await categories(engine) == {1: "Physics"}
+        await engine.dispose()
+
+    asyncio.run(main())
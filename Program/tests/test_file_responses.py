@@ -0,0 +1,124 @@
+"""
+Tests for conditional, range and pre-compressed serving of generated notes.
+"""
+
+import sys
+import gzip
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.api.notes_routes as notes_routes
+from src.ai_modules.summarization.output_index import OutputIndex
+from src.api.file_responses import parse_range
+from src.utils.compression import ENCODINGS, negotiate_encoding, sidecar_path
+
+CONTENT = "# Fourier Series\n\n" + "Periodic functions as sums of sines. " * 200
+URL = "/notes/generated/Fourier_notes.md"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    index = OutputIndex(tmp_path, tmp_path / ".manifest.sqlite3")
+    index.write("Fourier_notes.md", CONTENT)
+    monkeypatch.setattr(notes_routes, "output_index", index)
+    app = FastAPI()
+    app.include_router(notes_routes.router)
+    with TestClient(app) as client:
+        yield client, index
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("*;q=0.1, gzip;q=0", ["gzip"]) is None
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=x-", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+def test_etag_and_not_modified(client):
+    client, _ = client
+    response = client.get(URL, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.text == CONTENT
+    assert response.headers["content-type"].startswith("text/markdown")
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert "last-modified" in response.headers
+
+    repeat = client.get(URL, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == etag
+
+
+def test_precompressed_sidecars(client):
+    client, index = client
+    response = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == CONTENT  # decoded by the client
+    assert int(response.headers["content-length"]) < len(CONTENT) / 5
+    gzip_etag = response.headers["etag"]
+    assert gzip_etag.endswith('-gzip"')
+    assert client.get(URL, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag}).status_code == 304
+
+    # Written next to the file at write time
+    path = index.path_for("Fourier_notes.md")
+    for encoding in ENCODINGS:
+        assert sidecar_path(path, encoding).exists()
+    assert gzip.decompress(sidecar_path(path, "gzip").read_bytes()).decode() == CONTENT
+
+    # Stale copies are rebuilt after the note changes
+    path.write_text(CONTENT + "Update.", encoding="utf-8")
+    updated = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert updated.text == CONTENT + "Update."
+    assert updated.headers["etag"] != gzip_etag
+
+
+def test_byte_ranges(client):
+    client, _ = client
+    data = CONTENT.encode()
+    response = client.get(URL, headers={"Range": "bytes=2-17", "Accept-Encoding": "gzip"})
+    assert response.status_code == 206
+    assert response.content == data[2:18]
+    assert response.headers["content-range"] == f"bytes 2-17/{len(data)}"
+    assert "content-encoding" not in response.headers
+
+    tail = client.get(URL, headers={"Range": "bytes=-5"})
+    assert tail.content == data[-5:]
+
+    unsatisfiable = client.get(URL, headers={"Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(data)}"
+
+    # A stale If-Range gets the whole file
+    stale = client.get(URL, headers={"Range": "bytes=0-3", "If-Range": '"old"', "Accept-Encoding": "identity"})
+    assert stale.status_code == 200
+    assert stale.content == data
+
+
+def test_legacy_json_format(client):
+    client, _ = client
+    assert client.get(URL, params={"format": "json"}).json() == {
+        "content": CONTENT,
+        "filename": "Fourier_notes.md",
+    }
+    assert client.get("/notes/generated/Missing_notes.md").status_code == 404
@@ -0,0 +1,100 @@
+"""
+Tests for the keyword inverted index.
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.ai_modules.recommendation.keyword_index import (
+    index_notes,
+    normalize_keywords,
+    related_notes,
+    suggest_topics,
+)
+from src.db.models import Note, User
+
+NOTES = {
+    1: (1, ["Python", "functions", "loops"]),
+    2: (1, ["python", "Classes", "functions"]),
+    3: (1, ["baking", "bread"]),
+    4: (1, ["python", "loops", "recursion"]),
+    5: (2, ["python", "functions", "loops"]),
+}
+
+
+def run(tmp_path, scenario):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'keywords.db'}")
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            for user_id in (1, 2):
+                session.add(User(id=user_id, email=f"{user_id}@example.com", username="u", password_hash="x"))
+            notes = [
+                Note(
+                    id=note_id,
+                    user_id=user_id,
+                    video_url="https://youtu.be/x",
+                    video_title=f"Note {note_id}",
+                    content_json=json.dumps({"keywords": keywords}),
+                )
+                for note_id, (user_id, keywords) in NOTES.items()
+            ]
+            session.add_all(notes)
+            await session.flush()
+            await index_notes(session, notes)
+            await session.commit()
+            return await scenario(session)
+
+    return asyncio.run(main())
+
+
+def test_normalize_keywords():
+    assert normalize_keywords([" Machine  Learning ", "machine learning", "#AI", "", "."]) == [
+        "machine learning",
+        "ai",
+    ]
+
+
+def test_related_notes_weight_rare_keywords(tmp_path):
+    ranked = run(tmp_path, lambda session: related_notes(session, 1))
+
+    # Note 4 shares "loops" (df 2) and "python"; note 2 shares "functions"
+    # (df 2) and "python"; ties go to the newer note. Other users' notes and
+    # notes without shared keywords are excluded.
+    assert [note_id for note_id, _ in ranked] == [4, 2]
+    assert ranked[0][1] > 0
+
+
+def test_suggest_topics_by_document_frequency(tmp_path):
+    async def scenario(session):
+        return (
+            await suggest_topics(session, 1, limit=3),
+            await suggest_topics(session, 1, limit=5, note_ids=[3]),
+        )
+
+    topics, baking = run(tmp_path, scenario)
+    assert topics == [("python", 3), ("functions", 2), ("loops", 2)]
+    assert baking == [("baking", 1), ("bread", 1)]
+
+
+def test_reindexing_replaces_keywords(tmp_path):
+    async def scenario(session):
+        note = await session.get(Note, 3)
+        note.content_json = json.dumps({"keywords": ["python", "recursion"]})
+        await index_notes(session, [note])
+        await session.commit()
+        return await related_notes(session, 3)
+
+    ranked = run(tmp_path, scenario)
+    assert [note_id for note_id, _ in ranked] == [4, 2, 1]
@@ -0,0 +1,62 @@
+"""
+Tests for the local hashed TF-IDF naive Bayes category classifier.
+"""
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.categorization.categorizer import CategorizationService
+from src.ai_modules.categorization.local_classifier import HashedTfidfNaiveBayes, evaluate
+
+TEXTS = [
+    "python function variable loop debugging the compiler",
+    "write a python class and call the function in a loop",
+    "bake the flour and sugar in the oven for this recipe",
+    "chicken recipe with spices and a tomato sauce in the oven",
+]
+LABELS = ["Programming", "Programming", "Cooking", "Cooking"]
+
+
+def test_predicts_label_with_confidence():
+    model = HashedTfidfNaiveBayes().fit(TEXTS, LABELS)
+
+    label, confidence = model.predict("debugging a python loop")
+    assert label == "Programming"
+    assert 0.5 < confidence <= 1.0
+
+
+def test_untrained_model_defers():
+    assert HashedTfidfNaiveBayes().predict("anything") == (None, 0.0)
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    model = HashedTfidfNaiveBayes().fit(TEXTS, LABELS)
+    path = tmp_path / "model.json"
+    model.save(path)
+
+    loaded = HashedTfidfNaiveBayes.load(path)
+    assert loaded.predict("oven recipe") == model.predict("oven recipe")
+    assert evaluate(loaded, TEXTS, LABELS, threshold=0.5)["accuracy"] == 1.0
+
+
+def test_service_predicts_off_the_event_loop():
+    model = HashedTfidfNaiveBayes().fit(TEXTS, LABELS)
+    threads = []
+    predict = model.predict
+
+    def tracking_predict(text):
+        threads.append(threading.current_thread())
+        return predict(text)
+
+    model.predict = tracking_predict
+    service = CategorizationService(api_key="x", local_model=model)
+    service.confidence_threshold = 0.5
+
+    assert asyncio.run(service.categorize_text("debugging a python loop")) == "Programming"
+    assert threads and threads[0] is not threading.main_thread()
+    assert service.stats["local"] == 1
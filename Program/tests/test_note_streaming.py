@@ -0,0 +1,97 @@
+"""
+Streaming note generation against a local fake Gemini streaming server.
+"""
+
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.summarization.note_generator import NoteGenerator
+from src.ai_modules.summarization.stream_parser import StreamingNoteParser
+
+NOTES = {
+    "title": "Intro to Sorting",
+    "summary": "Covers bubble sort, {merge} sort and \"quick\" sort.",
+    "key_concepts": [
+        {"term": "Merge sort", "definition": "Divide, sort halves, merge."},
+        {"term": "Pivot", "definition": "Element used to partition, e.g. [3, 1]."},
+    ],
+    "action_items": ["Implement merge sort"],
+    "timestamps": [
+        {"timestamp": "00:30", "topic": "Bubble sort", "summary": "Swaps neighbours."},
+        {"timestamp": "05:10", "topic": "Quick sort", "summary": "Partitions around a pivot."},
+    ],
+    "keywords": ["sorting", "algorithms"],
+}
+
+
+class FakeGeminiStreamHandler(BaseHTTPRequestHandler):
+    """Replies to streamGenerateContent with the notes JSON split into SSE chunks."""
+
+    chunk_size = 7
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        text = json.dumps(NOTES)
+        for i in range(0, len(text), self.chunk_size):
+            event = {
+                "candidates": [
+                    {"content": {"role": "model", "parts": [{"text": text[i : i + self.chunk_size]}]}}
+                ]
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeminiStreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_parser_emits_items_as_they_complete():
+    parser = StreamingNoteParser()
+    text = json.dumps(NOTES, indent=2)
+    events = []
+    for i in range(0, len(text), 3):
+        events.extend(parser.feed(text[i : i + 3]))
+
+    assert events[:3] == [
+        ("title", NOTES["title"]),
+        ("summary", NOTES["summary"]),
+        ("key_concepts", NOTES["key_concepts"][0]),
+    ]
+    assert parser.partial == NOTES
+
+
+def test_generate_notes_json_stream_reports_partials():
+    server = start_fake_server()
+    try:
+        generator = NoteGenerator(
+            api_key="test-key", base_url=f"http://127.0.0.1:{server.server_port}"
+        )
+        partials = []
+        notes = generator.generate_notes_json_stream(
+            "transcript", "Intro to Sorting", partials.append
+        )
+    finally:
+        server.shutdown()
+
+    assert notes == NOTES
+    assert partials[0] == {"title": NOTES["title"]}
+    assert partials[1]["summary"] == NOTES["summary"]
+    # Timeline items arrive one at a time
+    assert [len(p.get("timestamps", [])) for p in partials].count(1) >= 1
+    assert partials[-1] == NOTES
@@ -0,0 +1,73 @@
+"""
+Tests for the outputs/ manifest index.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.ai_modules.summarization.output_index import OutputIndex
+
+
+def make_index(tmp_path, rescan_interval=3600.0):
+    root = tmp_path / "outputs"
+    root.mkdir(exist_ok=True)
+    return OutputIndex(root, root / ".manifest.sqlite3", rescan_interval), root
+
+
+def test_write_shards_and_indexes(tmp_path):
+    index, root = make_index(tmp_path)
+    path = index.write("Calculus_notes.md", "# Calculus\n\nLimits...")
+
+    assert path.parent.name == index.shard_for("Calculus_notes.md")
+    assert path.parent.parent == root
+    assert index.path_for("Calculus_notes.md") == path
+    files, total = index.list_files()
+    assert total == 1
+    assert files[0]["title"] == "Calculus"
+    assert files[0]["size"] == path.stat().st_size
+
+    with pytest.raises(ValueError):
+        index.write("../escape_notes.md", "x")
+
+
+def test_incremental_refresh_picks_up_new_and_removed_files(tmp_path):
+    index, root = make_index(tmp_path)
+    (root / "Legacy_notes.md").write_text("# Legacy\n", encoding="utf-8")
+    index.write("B_notes.md", "# Bravo\n")
+    assert [f["title"] for f in index.list_files(sort="title", descending=False)[0]] == ["Bravo", "Legacy"]
+
+    # Added outside the index: the shard directory's mtime changes
+    shard = root / index.shard_for("B_notes.md")
+    (shard / "C_notes.md").write_text("# Charlie\n", encoding="utf-8")
+    os.utime(shard, ns=(1, 1))
+    (root / "Legacy_notes.md").unlink()
+    os.utime(root, ns=(2, 2))
+
+    files, total = index.list_files(sort="title", descending=False)
+    assert [f["title"] for f in files] == ["Bravo", "Charlie"]
+    assert total == 2
+
+
+def test_paging_sorting_and_sharding_flat_files(tmp_path):
+    index, root = make_index(tmp_path)
+    for i, name in enumerate(["a", "b", "c", "d"]):
+        path = root / f"{name}_notes.md"
+        path.write_text(f"# {name.upper()}\n" + "x" * i, encoding="utf-8")
+        os.utime(path, (1000 + i, 1000 + i))
+
+    first, total = index.list_files(limit=2)
+    second, _ = index.list_files(limit=2, offset=2)
+    assert total == 4
+    assert [f["filename"] for f in first + second] == ["d_notes.md", "c_notes.md", "b_notes.md", "a_notes.md"]
+    assert [f["filename"] for f in index.list_files(sort="size", descending=False)[0]][0] == "a_notes.md"
+
+    assert index.shard_flat_files() == 4
+    assert not list(root.glob("*_notes.md"))
+    assert index.path_for("c_notes.md").parent.name == index.shard_for("c_notes.md")
+    assert index.list_files()[1] == 4
@@ -0,0 +1,88 @@
+"""
+Tests for off-loop password hashing, rehash-on-login and single-query login.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bcrypt
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.security import (
+    decode_access_token,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from src.api.auth_routes import router as auth_router
+from src.db.database import get_session
+from src.db.models import User
+from src.utils.config import settings
+
+
+def weak_hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=4)).decode()
+
+
+def test_async_hash_and_verify():
+    async def main():
+        hashed = await hash_password_async("secret-pw")
+        assert hashed.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+        assert not password_needs_rehash(hashed)
+        assert await verify_password_async("secret-pw", hashed)
+        assert not await verify_password_async("wrong", hashed)
+
+    asyncio.run(main())
+    assert password_needs_rehash(weak_hash("x"))
+    assert not password_needs_rehash("not-a-hash")
+
+
+def test_login_by_username_or_email_upgrades_hash(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'login.db'}")
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with factory() as session:
+            session.add(User(id=1, email="a@example.com", username="alice", password_hash=weak_hash("pw-alice")))
+            # Another user whose username is alice's email: a username match wins
+            session.add(User(id=2, email="b@example.com", username="a@example.com", password_hash=weak_hash("pw-b")))
+            await session.commit()
+
+    async def password_hash(user_id):
+        async with factory() as session:
+            return (await session.get(User, user_id)).password_hash
+
+    async def session_override():
+        async with factory() as session:
+            yield session
+
+    asyncio.run(setup())
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_session] = session_override
+
+    def login(name, password):
+        return TestClient(app).post("/auth/login", data={"username": name, "password": password})
+
+    try:
+        response = login("alice", "pw-alice")
+        assert response.status_code == 200
+        assert decode_access_token(response.json()["access_token"])["uid"] == 1
+        assert not password_needs_rehash(asyncio.run(password_hash(1)))
+
+        assert login("a@example.com", "pw-b").status_code == 200
+        assert login("a@example.com", "pw-alice").status_code == 401
+        assert login("b@example.com", "pw-b").status_code == 200
+        assert login("nobody", "pw").status_code == 401
+    finally:
+        asyncio.run(engine.dispose())
@@ -0,0 +1,76 @@
+"""
+Tests for the shared SQLite-backed quota scheduler.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.rate_limiter import Priority, QuotaScheduler, RateLimitExceeded
+
+
+def make_scheduler(db_path, **kwargs):
+    defaults = dict(gemini_rpm=10, gemini_tpm=1000, youtube_daily_units=300, interactive_reserve=0.2)
+    defaults.update(kwargs)
+    return QuotaScheduler(db_path, **defaults)
+
+
+def test_buckets_are_shared_between_instances(tmp_path):
+    db_path = tmp_path / "limits.sqlite3"
+    first, second = make_scheduler(db_path), make_scheduler(db_path)
+
+    for _ in range(5):
+        first.acquire_model("gemini", 10, Priority.INTERACTIVE, max_wait=0)
+    for _ in range(5):
+        second.acquire_model("gemini", 10, Priority.INTERACTIVE, max_wait=0)
+
+    # Both "processes" drew from the same 10 requests-per-minute bucket
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        first.acquire_model("gemini", 10, Priority.INTERACTIVE, max_wait=0)
+    assert exc_info.value.bucket == "gemini:rpm"
+
+
+def test_background_leaves_reserve_for_interactive(tmp_path):
+    scheduler = make_scheduler(tmp_path / "limits.sqlite3")
+
+    for _ in range(8):
+        scheduler.acquire_model("gemini", 10, Priority.BACKGROUND, max_wait=0)
+    with pytest.raises(RateLimitExceeded):
+        scheduler.acquire_model("gemini", 10, Priority.BACKGROUND, max_wait=0)
+
+    # The reserved 20% is still available to interactive calls
+    scheduler.acquire_model("gemini", 10, Priority.INTERACTIVE, max_wait=0)
+    scheduler.acquire_model("gemini", 10, Priority.INTERACTIVE, max_wait=0)
+
+
+def test_token_budget_and_youtube_units(tmp_path):
+    scheduler = make_scheduler(tmp_path / "limits.sqlite3")
+
+    scheduler.acquire_model("gemini", 900, Priority.INTERACTIVE, max_wait=0)
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        scheduler.acquire_model("gemini", 200, Priority.INTERACTIVE, max_wait=0)
+    assert exc_info.value.bucket == "gemini:tpm"
+
+    for _ in range(3):
+        asyncio.run(scheduler.acquire_youtube_async("search.list", max_wait=0))
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(scheduler.acquire_youtube_async("search.list", max_wait=0))
+
+    usage = scheduler.usage()
+    assert usage["youtube:units"] == 300
+    assert usage["gemini:rpm"] == 1
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    db_path = tmp_path / "nested" / "limits.sqlite3"
+    scheduler = make_scheduler(db_path)
+    assert not db_path.exists()
+
+    asyncio.run(scheduler.acquire_model_async("gemini", 10, max_wait=0))
+    assert db_path.exists()
+    assert scheduler.usage()["gemini:rpm"] == 1
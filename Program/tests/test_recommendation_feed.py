@@ -0,0 +1,150 @@
+"""
+Tests for materialized recommendation feeds.
+"""
+
+import sys
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.ai_modules.recommendation import feed as feed_module
+from src.ai_modules.recommendation.feed import RecommendationFeed
+from src.db.models import RecommendationItem, User
+
+
+class FakeRecommender:
+    def __init__(self):
+        self.calls = 0
+        self.results = None
+
+    async def get_recommendations_for_user(self, session, user_id, limit=5, priority=None):
+        self.calls += 1
+        if self.results is not None:
+            return self.results
+        return [
+            {
+                "id": f"v{self.calls}-{i}",
+                "title": f"Video {i}",
+                "description": "",
+                "thumbnail": None,
+                "channelTitle": "Channel",
+                "url": f"https://www.youtube.com/watch?v=v{i}",
+                "type": "youtube_video",
+            }
+            for i in range(limit)
+        ]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'feed.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(User(id=1, email="a@example.com", username="a", password_hash="x"))
+            await session.commit()
+
+    asyncio.run(setup())
+    monkeypatch.setattr(feed_module, "async_engine", engine)
+    return engine
+
+
+def test_cold_start_builds_feed_and_pages(engine):
+    recommender = FakeRecommender()
+    feed = RecommendationFeed(recommender, feed_size=7)
+
+    async def scenario():
+        async with AsyncSession(engine) as session:
+            first = await feed.get_page(session, 1, offset=0, limit=5)
+            second = await feed.get_page(session, 1, offset=5, limit=5)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [v["id"] for v in first] == [f"v1-{i}" for i in range(5)]
+    assert [v["id"] for v in second] == ["v1-5", "v1-6"]
+    # The second page is read from the table, not recomputed
+    assert recommender.calls == 1
+
+
+def test_empty_refresh_keeps_previous_feed(engine):
+    recommender = FakeRecommender()
+    feed = RecommendationFeed(recommender, feed_size=3)
+
+    async def scenario():
+        await feed.refresh(1)
+        recommender.results = []
+        assert await feed.refresh(1) == 0
+        async with AsyncSession(engine) as session:
+            return await feed.get_page(session, 1)
+
+    page = asyncio.run(scenario())
+    assert [v["id"] for v in page] == ["v1-0", "v1-1", "v1-2"]
+
+
+def test_empty_refresh_backs_off(engine):
+    recommender = FakeRecommender()
+    recommender.results = []
+    feed = RecommendationFeed(recommender, feed_size=3, retry_delay=0.2)
+
+    async def scenario():
+        async with AsyncSession(engine) as session:
+            # Quota gone: the cold start searches once, later reads do not
+            for _ in range(3):
+                assert await feed.get_page(session, 1) == []
+            assert recommender.calls == 1
+
+            await asyncio.sleep(0.25)
+            recommender.results = None
+            return await feed.get_page(session, 1)
+
+    page = asyncio.run(scenario())
+    assert recommender.calls == 2
+    assert [v["id"] for v in page] == ["v2-0", "v2-1", "v2-2"]
+
+
+def test_expired_feed_is_refreshed_on_read(engine):
+    recommender = FakeRecommender()
+    feed = RecommendationFeed(recommender, feed_size=2, ttl=60)
+
+    async def scenario():
+        await feed.start()
+        await feed.refresh(1)
+        async with AsyncSession(engine) as session:
+            await feed.get_page(session, 1)
+        await asyncio.sleep(0.05)
+        # Fresh feed: no refresh
+        assert recommender.calls == 1
+
+        async with AsyncSession(engine) as session:
+            await session.exec(
+                update(RecommendationItem).values(
+                    refreshed_at=datetime.utcnow() - timedelta(minutes=5)
+                )
+            )
+            await session.commit()
+            # The expired feed is still served while it is refreshed
+            stale = await feed.get_page(session, 1)
+        assert [v["id"] for v in stale] == ["v1-0", "v1-1"]
+
+        for _ in range(100):
+            if recommender.calls == 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        await feed.stop()
+
+        async with AsyncSession(engine) as session:
+            return await feed.get_page(session, 1)
+
+    page = asyncio.run(scenario())
+    assert [v["id"] for v in page] == ["v2-0", "v2-1"]
@@ -0,0 +1,217 @@
+"""
+Resilience layer tests against a local fault-injecting stand-in for Gemini.
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMCallError,
+    LLMTimeoutError,
+    ResilientCaller,
+)
+
+
+class FaultyUpstream:
+    """Stand-in upstream: fails the first ``failures`` calls, with per-call latencies."""
+
+    def __init__(self, failures: int = 0, latencies=None):
+        self.failures = failures
+        self.latencies = list(latencies or [])
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            latency = self.latencies.pop(0) if self.latencies else 0.0
+        time.sleep(latency)
+        if call <= self.failures:
+            raise ConnectionError(f"injected failure #{call}")
+        return f"ok #{call}"
+
+
+def make_caller(**kwargs):
+    defaults = dict(max_retries=3, base_delay=0.001, max_delay=0.002, min_timeout=0.05, max_timeout=1.0)
+    defaults.update(kwargs)
+    return ResilientCaller("test", **defaults)
+
+
+def test_retries_transient_failures():
+    upstream = FaultyUpstream(failures=2)
+
+    assert make_caller().call(upstream) == "ok #3"
+    assert upstream.calls == 3
+
+
+def test_gives_up_after_max_retries():
+    upstream = FaultyUpstream(failures=10)
+
+    with pytest.raises(LLMCallError):
+        make_caller(max_retries=2).call(upstream)
+    assert upstream.calls == 3
+
+
+def test_circuit_opens_and_fails_fast():
+    upstream = FaultyUpstream(failures=100)
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    caller = make_caller(max_retries=5, breaker=breaker)
+
+    with pytest.raises(CircuitOpenError):
+        caller.call(upstream)
+    assert upstream.calls == 2
+
+    # Fails fast without touching upstream while open
+    with pytest.raises(CircuitOpenError) as exc_info:
+        caller.call(upstream)
+    assert upstream.calls == 2
+    assert exc_info.value.retry_after > 0
+
+    # Half-open trial succeeds and closes the circuit
+    time.sleep(0.06)
+    upstream.failures = 0
+    assert caller.call(upstream).startswith("ok")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_adaptive_timeout_follows_latency():
+    caller = make_caller(min_timeout=0.01, timeout_multiplier=2.0)
+    for _ in range(10):
+        caller.latency.record(0.02)
+
+    assert caller.current_timeout() == pytest.approx(0.04)
+
+    slow = FaultyUpstream(latencies=[0.2])
+    with pytest.raises(LLMCallError) as exc_info:
+        make_caller(max_retries=0, min_timeout=0.01, max_timeout=0.05).call(slow)
+    assert isinstance(exc_info.value.__cause__, LLMTimeoutError)
+
+
+def test_timeouts_widen_the_adaptive_timeout():
+    caller = make_caller(max_retries=3, min_timeout=0.01, max_timeout=1.0, timeout_multiplier=2.0)
+    for _ in range(10):
+        caller.latency.record(0.02)
+
+    # Upstream slowed down past the learned 0.04s timeout: each timeout is
+    # sampled at its value, doubling the next timeout until calls fit again
+    slower = FaultyUpstream(latencies=[0.1] * 4)
+    assert caller.call(slower) == "ok #3"
+    assert caller.current_timeout() >= 0.2
+
+
+def test_hedged_request_beats_slow_tail():
+    caller = make_caller(hedge=True, max_timeout=2.0, min_timeout=1.0)
+    for _ in range(10):
+        caller.latency.record(0.01)
+
+    # First request hits the long tail; the hedge is fast
+    upstream = FaultyUpstream(latencies=[0.5, 0.0])
+    started = time.monotonic()
+    result = caller.call(upstream)
+
+    assert result == "ok #2"
+    assert time.monotonic() - started < 0.4
+
+
+def test_abandoned_attempt_is_cancelled():
+    caller = make_caller(max_retries=1, min_timeout=0.05, max_timeout=0.05)
+    events = []
+    published = []
+
+    def slow_stream(cancelled: threading.Event):
+        events.append(cancelled)
+        for chunk in range(100):
+            if cancelled.is_set():
+                return None
+            published.append((len(events), chunk))
+            time.sleep(0.01)
+
+    with pytest.raises(LLMCallError):
+        caller.call(slow_stream, cancellable=True)
+
+    assert len(events) == 2 and all(e.is_set() for e in events)
+    time.sleep(0.05)
+    # Nothing is published once an attempt is abandoned
+    settled = len(published)
+    time.sleep(0.05)
+    assert len(published) == settled
+
+
+def test_hedge_loser_is_cancelled():
+    caller = make_caller(hedge=True, max_timeout=2.0, min_timeout=1.0)
+    for _ in range(10):
+        caller.latency.record(0.01)
+    events = []
+
+    def upstream(cancelled: threading.Event):
+        events.append(cancelled)
+        if len(events) == 1:
+            cancelled.wait(1.0)
+            return "slow"
+        return "fast"
+
+    assert caller.call(upstream, cancellable=True) == "fast"
+    assert events[0].is_set() and not events[1].is_set()
+
+
+def test_quota_wait_is_not_timed():
+    caller = make_caller(max_retries=1, min_timeout=0.05, max_timeout=0.05)
+    waits = []
+
+    def wait_for_quota(blocking):
+        waits.append(blocking)
+        time.sleep(0.1)  # longer than the call timeout
+        return True
+
+    assert caller.call(FaultyUpstream(failures=1), acquire=wait_for_quota) == "ok #2"
+    # Once per attempt, retries included
+    assert waits == [True, True]
+
+
+def test_hedge_needs_quota():
+    def make():
+        caller = make_caller(hedge=True, max_timeout=2.0, min_timeout=1.0)
+        for _ in range(10):
+            caller.latency.record(0.01)
+        return caller
+
+    granted = []
+
+    def acquire(blocking):
+        granted.append(blocking)
+        return True
+
+    # The hedge takes its own quota (without waiting for it)...
+    assert make().call(FaultyUpstream(latencies=[0.3, 0.0]), acquire=acquire) == "ok #2"
+    assert granted == [True, False]
+
+    # ...and is not sent when there is none
+    upstream = FaultyUpstream(latencies=[0.3, 0.0])
+    assert make().call(upstream, acquire=lambda blocking: blocking) == "ok #1"
+    assert upstream.calls == 1
+
+
+def test_quota_wait_holds_no_half_open_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    caller = make_caller(max_retries=0, breaker=breaker)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    def acquire(blocking):
+        # Another caller can still take the trial slot while this one waits
+        assert breaker.allow_request()
+        breaker.record_success()
+        return True
+
+    assert caller.call(FaultyUpstream(), acquire=acquire) == "ok #1"
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,195 @@
+"""
+Tests for the API response layer: orjson serialization, negotiated
+compression and version-based conditional GETs on the note endpoints.
+"""
+
+import sys
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.compression import CompressionMiddleware
+from src.api.conditional import etag_matches, http_date
+from src.api.notes_routes import router as notes_router
+from src.auth.dependencies import get_current_user
+from src.db.database import get_session
+from src.db.models import Note, User
+
+BODY = "Fourier series decompose periodic functions. " * 100
+
+
+def make_app():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    async def big():
+        return {"text": BODY}
+
+    @app.get("/small")
+    async def small():
+        return {"text": "short"}
+
+    @app.get("/tagged")
+    async def tagged():
+        return PlainTextResponse(BODY, headers={"ETag": '"abc"'})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+def test_compression_negotiation():
+    with TestClient(make_app()) as client:
+        for encoding in ("gzip", "br"):
+            response = client.get("/big", headers={"Accept-Encoding": encoding})
+            assert response.headers["content-encoding"] == encoding
+            assert response.headers["vary"] == "Accept-Encoding"
+            assert int(response.headers["content-length"]) < len(BODY) / 5
+            assert response.json() == {"text": BODY}  # decoded by the client
+
+        identity = client.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert identity.headers["vary"] == "Accept-Encoding"
+
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+        tagged = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        assert tagged.headers["etag"] == 'W/"abc"'
+
+        streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in streamed.headers
+        assert streamed.text == BODY * 3
+
+
+def test_etag_matching_and_dates():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', 'W/"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert http_date(datetime(2024, 1, 2, 3, 4, 5)) == "Tue, 02 Jan 2024 03:04:05 GMT"
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'responses.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(User(id=1, email="a@example.com", username="a", password_hash="x"))
+            await session.commit()
+            for i in range(3):
+                session.add(
+                    Note(
+                        user_id=1,
+                        video_url="https://youtu.be/x",
+                        video_title=f"Video {i}",
+                        summary_content=BODY,
+                        category="Math",
+                    )
+                )
+            await session.commit()
+
+    asyncio.run(setup())
+
+    async def session_override():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    app.include_router(notes_router)
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, email="a@example.com", username="a", password_hash="x"
+    )
+
+    async def bump(note_id):
+        async with AsyncSession(engine) as session:
+            await session.exec(
+                update(Note).where(Note.id == note_id).values(version=Note.version + 1)
+            )
+            await session.commit()
+
+    try:
+        with TestClient(app) as client:
+            yield client, lambda note_id: asyncio.run(bump(note_id))
+    finally:
+        asyncio.run(engine.dispose())
+
+
+def test_note_conditional_get(client):
+    client, bump = client
+    response = client.get("/notes/1", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.json()["summary_text"] == BODY
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    # The compressed (weak) and identity ETags both revalidate
+    assert client.get("/notes/1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/notes/1", headers={"If-None-Match": etag[2:]}).status_code == 304
+    since = client.get(
+        "/notes/1", headers={"If-Modified-Since": response.headers["last-modified"]}
+    )
+    assert since.status_code == 304
+
+    rendered = client.get("/notes/1/render", params={"format": "html"})
+    assert rendered.headers["etag"] != etag[2:]
+    assert client.get(
+        "/notes/1/render", params={"format": "html"}, headers={"If-None-Match": rendered.headers["etag"]}
+    ).status_code == 304
+
+    bump(1)
+    changed = client.get("/notes/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    assert client.get("/notes/99", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_note_list_conditional_get(client):
+    client, bump = client
+    response = client.get("/notes", params={"limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    etag = response.headers["etag"]
+
+    repeat = client.get("/notes", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["x-next-cursor"] == response.headers["x-next-cursor"]
+
+    # Different query, different representation
+    other = client.get("/notes", params={"limit": 2, "fields": "id"}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.json() == [{"id": 3}, {"id": 2}]
+
+    bump(response.json()[0]["id"])
+    assert client.get("/notes", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 200
+
+    full = client.get("/notes", params={"fields": "id,summary_text"}, headers={"Accept-Encoding": "gzip"})
+    assert full.headers["content-encoding"] == "gzip"
+    assert [n["summary_text"] for n in full.json()] == [BODY] * 3
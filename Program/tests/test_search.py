@@ -0,0 +1,104 @@
+"""
+Tests for full-text note search (SQLite FTS5 backend).
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Note, User
+from src.db.search import decode_cursor, index_search_document, search_notes
+
+NOTES = [
+    (1, "Python decorators explained", "Decorators wrap functions.", "today we talk about python"),
+    (1, "Baking sourdough bread", "Flour, water and a starter.", "knead the dough"),
+    (1, "Intro to Python", "Variables and loops.", "python is a language for decorators too"),
+    (1, "Gardening basics", "Water the plants.", "nothing about code"),
+    (2, "Python decorators for user two", "Decorators again.", "python"),
+]
+
+
+def run(tmp_path, scenario):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            for user_id in (1, 2):
+                session.add(User(id=user_id, email=f"{user_id}@example.com", username="u", password_hash="x"))
+            for user_id, title, body, transcript in NOTES:
+                note = Note(user_id=user_id, video_url="https://youtu.be/x", video_title=title, summary_content=body)
+                session.add(note)
+                await session.flush()
+                await index_search_document(session, note, transcript)
+            await session.commit()
+            return await scenario(session)
+
+    try:
+        return asyncio.run(main())
+    finally:
+        asyncio.run(engine.dispose())
+
+
+def test_ranked_results_with_snippets(tmp_path):
+    hits, next_cursor = run(tmp_path, lambda s: search_notes(s, 1, "python decorators"))
+
+    # Title matches outrank transcript-only matches; user 2 is excluded
+    assert [h["note_id"] for h in hits] == [1, 3]
+    assert hits[0]["score"] > hits[1]["score"]
+    assert "<b>" in hits[0]["snippet"]
+    assert next_cursor is None
+
+
+def test_keyset_pages_cover_all_results(tmp_path):
+    async def scenario(session):
+        pages, cursor = [], None
+        while True:
+            hits, cursor = await search_notes(session, 1, "water", limit=1, cursor=cursor)
+            pages.append([h["note_id"] for h in hits])
+            if cursor is None:
+                return pages
+
+    pages = run(tmp_path, scenario)
+    assert sorted(sum(pages, [])) == [2, 4]
+    assert all(len(page) == 1 for page in pages)
+
+
+def test_reindexing_updates_fts(tmp_path):
+    async def scenario(session):
+        note = await session.get(Note, 4)
+        note.video_title = "Gardening with Rust"
+        await index_search_document(session, note)
+        await session.commit()
+        hits, _ = await search_notes(session, 1, "rust")
+        old, _ = await search_notes(session, 1, "basics")
+        kept, _ = await search_notes(session, 1, "code")
+        return hits, old, kept
+
+    hits, old, kept = run(tmp_path, scenario)
+    assert [h["note_id"] for h in hits] == [4]
+    assert old == []
+    # The transcript is kept when re-indexing without one
+    assert [h["note_id"] for h in kept] == [4]
+
+
+def test_query_without_words_and_bad_cursor(tmp_path):
+    async def scenario(session):
+        return (
+            await search_notes(session, 1, '"*) --'),
+            # FTS5 operators in user input are matched literally, not parsed
+            await search_notes(session, 1, 'python" OR "bread'),
+        )
+
+    assert run(tmp_path, scenario) == (([], None), ([], None))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
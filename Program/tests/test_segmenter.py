@@ -0,0 +1,40 @@
+"""
+Unit tests for transcript cleaning in TranscriptSegmenter.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.summarization.segmenter import TranscriptSegmenter
+
+
+def test_clean_text_removes_fillers_and_keeps_casing():
+    segmenter = TranscriptSegmenter()
+    text = "  um so today we cover NASA.  uh, you know the Apollo   program okay. it was basically great"
+
+    assert segmenter.clean_text(text) == (
+        "So today we cover NASA. The Apollo program. It was great"
+    )
+
+
+def test_clean_text_ignores_partial_matches():
+    segmenter = TranscriptSegmenter()
+
+    assert segmenter.clean_text("likely umbrella rightly") == "Likely umbrella rightly"
+
+
+def test_clean_segments_preserves_boundaries():
+    segmenter = TranscriptSegmenter()
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": " Um hello there."},
+        {"start": 2.0, "end": 4.0, "text": " and Python is fun"},
+        {"start": 4.0, "end": 5.0, "text": " uh"},
+    ]
+
+    cleaned = list(segmenter.clean_segments(segments))
+
+    assert [(s["start"], s["end"]) for s in cleaned] == [(0.0, 2.0), (2.0, 4.0), (4.0, 5.0)]
+    assert [s["text"] for s in cleaned] == ["Hello there.", "And Python is fun", ""]
@@ -0,0 +1,46 @@
+"""
+Tests for the memory-mapped note similarity index.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.recommendation.similarity_index import SimilarityIndex
+
+
+def build(directory):
+    index = SimilarityIndex.rebuild(directory, dim=128)
+    index.add(1, 1, "python functions loops and classes")
+    index.add(2, 1, "bake bread with flour yeast and water")
+    index.add(3, 1, "python classes inheritance and functions")
+    index.add(4, 2, "python functions loops and classes")
+    return index
+
+
+def test_ranks_by_cosine_within_user(tmp_path):
+    index = build(tmp_path)
+
+    ranked = index.most_similar(1, k=2, user_id=1)
+    assert [note_id for note_id, _ in ranked] == [3, 2]
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_persists_and_reloads(tmp_path):
+    build(tmp_path)
+
+    reloaded = SimilarityIndex(tmp_path, dim=128)
+    assert len(reloaded) == 4
+    assert reloaded.most_similar(1, k=1)[0][0] == 4
+
+
+def test_upsert_and_remove(tmp_path):
+    index = build(tmp_path)
+
+    index.add(2, 1, "python functions loops and classes")
+    assert index.most_similar(1, k=1, user_id=1)[0][0] == 2
+    index.remove(2)
+    assert 2 not in index
+    assert [n for n, _ in index.most_similar(1, k=5, user_id=1)] == [3]
@@ -0,0 +1,134 @@
+"""
+Tests for trigger-maintained analytics rollups (SQLite backend).
+"""
+
+import sys
+import asyncio
+from datetime import date, datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.notes_routes import CreateNoteRequest
+from src.db import stats as _stats  # noqa: F401  (registers the triggers)
+from src.db.models import DailyStudyRollup, Note, User, UserLanguageStats, UserStats
+from src.db.stats import category_totals, get_languages, get_user_stats, rebuild_stats, study_time_series
+from src.utils.config import settings
+
+
+def run(tmp_path, scenario):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'stats.db'}")
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            session.add(User(id=1, email="a@example.com", username="a", password_hash="x"))
+            for day, duration, language, category in [
+                (date(2026, 3, 2), 600, "en", "Pending"),   # Monday
+                (date(2026, 3, 2), 300, "en", "Math"),
+                (date(2026, 3, 4), None, "ar", "Math"),
+                (date(2026, 3, 10), 1200, "en", "Physics"),
+            ]:
+                session.add(
+                    Note(
+                        user_id=1,
+                        video_url="https://youtu.be/x",
+                        video_title="t",
+                        video_duration=duration,
+                        language=language,
+                        category=category,
+                        created_at=datetime.combine(day, datetime.min.time()),
+                    )
+                )
+            await session.commit()
+            return await scenario(session)
+
+    try:
+        return asyncio.run(main())
+    finally:
+        asyncio.run(engine.dispose())
+
+
+async def snapshot(session):
+    stats = await session.get(UserStats, 1)
+    await session.refresh(stats)
+    rollups = (await session.exec(select(DailyStudyRollup).where(DailyStudyRollup.notes != 0))).all()
+    languages = (await session.exec(select(UserLanguageStats).where(UserLanguageStats.notes != 0))).all()
+    return (
+        (stats.total_notes, stats.timed_notes, stats.total_study_seconds),
+        sorted((r.day, r.category, r.notes, r.study_seconds) for r in rollups),
+        sorted((l.language, l.notes) for l in languages),
+    )
+
+
+def test_insert_triggers_maintain_totals(tmp_path):
+    async def scenario(session):
+        stats = await get_user_stats(session, 1)
+        return stats, await get_languages(session, 1), await get_user_stats(session, 2)
+
+    stats, languages, empty = run(tmp_path, scenario)
+    assert (stats.total_notes, stats.timed_notes, stats.total_study_seconds) == (4, 3, 2100)
+    assert languages == ["en", "ar"]
+    assert empty.total_notes == 0
+
+
+def test_updates_and_deletes_match_a_rebuild(tmp_path):
+    async def scenario(session):
+        # Bulk recategorization and a deletion, as the background jobs do
+        await session.exec(update(Note).where(Note.category == "Pending").values(category="Math"))
+        await session.exec(update(Note).where(Note.language == "ar").values(version=2))
+        await session.exec(delete(Note).where(Note.category == "Physics"))
+        await session.commit()
+        incremental = await snapshot(session)
+
+        await rebuild_stats(session)
+        await session.commit()
+        return incremental, await snapshot(session)
+
+    incremental, rebuilt = run(tmp_path, scenario)
+    assert incremental == rebuilt
+    assert incremental[0] == (3, 2, 900)
+    assert incremental[1] == [
+        (date(2026, 3, 2), "Math", 2, 900),
+        (date(2026, 3, 4), "Math", 1, 0),
+    ]
+
+
+def test_series_and_categories(tmp_path):
+    async def scenario(session):
+        return (
+            await study_time_series(session, 1, date(2026, 3, 1), date(2026, 3, 4)),
+            await study_time_series(session, 1, date(2026, 3, 2), date(2026, 3, 15), "week"),
+            await category_totals(session, 1),
+            await category_totals(session, 1, start=date(2026, 3, 3)),
+        )
+
+    daily, weekly, categories, recent = run(tmp_path, scenario)
+    assert [(p["period_start"].day, p["notes"], p["study_seconds"]) for p in daily] == [
+        (1, 0, 0), (2, 2, 900), (3, 0, 0), (4, 1, 0),
+    ]
+    assert [(p["period_start"].day, p["notes"], p["study_seconds"]) for p in weekly] == [
+        (2, 3, 900), (9, 1, 1200),
+    ]
+    assert [c["category"] for c in categories] == ["Physics", "Pending", "Math"]
+    assert recent == [
+        {"category": "Physics", "notes": 1, "study_seconds": 1200},
+        {"category": "Math", "notes": 1, "study_seconds": 0},
+    ]
+
+
+def test_note_duration_must_be_in_range():
+    note = dict(video_url="https://youtu.be/x", video_title="t", summary_text="s")
+    assert CreateNoteRequest(**note, video_duration=0).video_duration == 0
+    for duration in (-1, settings.max_video_duration + 1):
+        with pytest.raises(ValidationError):
+            CreateNoteRequest(**note, video_duration=duration)
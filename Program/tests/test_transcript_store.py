@@ -0,0 +1,85 @@
+"""
+Tests for the transcript segment store and moment search.
+"""
+
+import sys
+import json
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_modules.transcription.transcript_store import TranscriptStore
+
+
+def segments(*texts, step=10.0):
+    return [
+        {"id": i, "start": i * step, "end": (i + 1) * step, "text": f" {text} "}
+        for i, text in enumerate(texts)
+    ]
+
+
+def build(directory):
+    store = TranscriptStore(directory)
+    store.add(1, 10, segments("Welcome to the course", "Gradient descent minimizes the loss", "Thanks for watching"))
+    store.add(1, 11, segments("Stochastic gradient descent uses mini batches", "Momentum speeds it up"))
+    store.add(2, 12, segments("Gradient descent for user two"))
+    return store
+
+
+def test_search_returns_timestamped_segments(tmp_path):
+    hits = build(tmp_path).search(1, "stochastic gradient", limit=5)
+
+    assert [(h["note_id"], h["start"]) for h in hits] == [(11, 0.0), (10, 10.0)]
+    assert hits[0]["text"] == "Stochastic gradient descent uses mini batches"
+    assert hits[1]["end"] == 20.0
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_search_is_per_user_and_persistent(tmp_path):
+    build(tmp_path)
+    store = TranscriptStore(tmp_path)
+
+    assert [h["note_id"] for h in store.search(2, "gradient")] == [12]
+    assert store.search(1, "momentum")[0]["text"] == "Momentum speeds it up"
+    assert store.search(1, "unknown words") == []
+    assert store.search(3, "gradient") == []
+
+
+def test_uncommitted_appends_are_discarded(tmp_path):
+    store = build(tmp_path)
+    user_dir = tmp_path / "user_1"
+    # Simulate a crash after appending text but before the header was written
+    with open(user_dir / "text.bin", "ab") as f:
+        f.write(b"garbage")
+
+    store.add(1, 13, segments("Backpropagation computes gradients"))
+
+    header = json.loads((user_dir / "header.json").read_text())
+    assert header["segments"] == 6
+    assert store.search(1, "backpropagation")[0]["text"] == "Backpropagation computes gradients"
+    assert store.search(1, "thanks")[0]["text"] == "Thanks for watching"
+
+
+def test_postings_runs_stay_logarithmic(tmp_path):
+    store = TranscriptStore(tmp_path)
+    for note_id in range(64):
+        store.add(1, note_id, segments(f"topic{note_id} shared words", "more shared words"))
+
+    header = json.loads((tmp_path / "user_1" / "header.json").read_text())
+    assert 1 <= len(header["runs"]) <= 8
+    # Only the live runs are left on disk
+    assert sorted(p.name for p in (tmp_path / "user_1").glob("postings*")) == sorted(header["runs"])
+
+    assert [h["note_id"] for h in store.search(1, "topic37")] == [37]
+    hits = store.search(1, "shared", limit=200)
+    assert len(hits) == 128
+    assert sorted(h["note_id"] for h in hits) == sorted(list(range(64)) * 2)
+
+
+def test_highlight_escapes_transcript_text():
+    from src.api.search_routes import highlight
+
+    assert highlight("a <script> & gradient", "gradient script") == (
+        "a &lt;<b>script</b>&gt; &amp; <b>gradient</b>"
+    )
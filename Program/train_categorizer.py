@@ -0,0 +1,76 @@
+import asyncio
+import argparse
+import random
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.database import async_engine
+from src.db.models import Note
+from src.ai_modules.categorization.categorizer import (
+    PENDING_CATEGORY,
+    UNCATEGORIZED,
+    note_text,
+)
+from src.ai_modules.categorization.local_classifier import HashedTfidfNaiveBayes, evaluate
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def load_labeled_notes():
+    """Notes already categorized by Gemini: (text, category) pairs."""
+    async with AsyncSession(async_engine) as session:
+        statement = select(Note).where(
+            Note.category.is_not(None),
+            Note.category.not_in([UNCATEGORIZED, PENDING_CATEGORY]),
+        )
+        result = await session.exec(statement)
+        return [(note_text(n), n.category) for n in result.all()]
+
+
+async def train(holdout: float, threshold: float, eval_only: bool):
+    print("Loading categorized notes...")
+    rows = await load_labeled_notes()
+    if len(rows) < 10:
+        print(f"❌ Only {len(rows)} categorized notes found, need at least 10 to train.")
+        return
+
+    random.Random(42).shuffle(rows)
+    split = max(1, int(len(rows) * holdout))
+    test_rows, train_rows = rows[:split], rows[split:]
+
+    print(f"Training on {len(train_rows)} notes, evaluating on {len(test_rows)}...")
+    model = HashedTfidfNaiveBayes().fit(*zip(*train_rows))
+    report = evaluate(model, *zip(*test_rows), threshold=threshold)
+
+    print("\n📊 Local classifier vs Gemini labels (held-out notes)")
+    print(f"   Classes:             {len(model.classes)}")
+    print(f"   Accuracy:            {report['accuracy']:.1%}")
+    print(f"   Coverage @ {threshold:.2f}:     {report['coverage']:.1%} (answered without Gemini)")
+    print(f"   Accuracy when used:  {report['confident_accuracy']:.1%}")
+    print(f"   Latency:             {report['mean_latency_us']:.0f} µs mean, {report['p95_latency_us']:.0f} µs p95")
+
+    if eval_only:
+        return
+
+    # Final model uses every labeled note
+    model = HashedTfidfNaiveBayes().fit(*zip(*rows))
+    model.save(settings.category_model_path)
+    print(f"\n✅ Model saved to {settings.category_model_path}")
+    print("   Restart the API to load it (the model is read at startup).")
+    logger.info(f"Local category classifier retrained on {len(rows)} notes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrain the local note category classifier")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of notes used for evaluation")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=settings.category_confidence_threshold,
+        help="Confidence threshold used for the coverage report",
+    )
+    parser.add_argument("--eval-only", action="store_true", help="Report without saving a new model")
+    args = parser.parse_args()
+
+    asyncio.run(train(args.holdout, args.threshold, args.eval_only))
@@ -103,8 +103,22 @@ class ApiService {
   static Future<List<dynamic>> getGeneratedNotes() async {
     try {
       // Changed from /notes/generated to /notes
-      final response = await _dio.get('/notes');
-      return response.data;
+      // Only the fields the dashboard renders; follow X-Next-Cursor pages
+      final notes = <dynamic>[];
+      String? cursor;
+      do {
+        final response = await _dio.get(
+          '/notes',
+          queryParameters: {
+            'fields': 'id,video_title,category,created_at',
+            'limit': 200,
+            if (cursor != null) 'cursor': cursor,
+          },
+        );
+        notes.addAll(response.data);
+        cursor = response.headers.value('x-next-cursor');
+      } while (cursor != null);
+      return notes;
     } catch (e) {
       return [];
     }